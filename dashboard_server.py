@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Elevator 4-channel dashboard + anomaly alert hub
-- 4-way preview grid (ports 5000~5003)
+- 4-way preview grid (single preview process on :5000, /<channel>/video_feed thumb tier; click a tile for the full tier)
 - DeepStream log tailing (fall/fight events)
 - In-browser live alert feed + optional Telegram/webhook alerts
 """
@@ -21,11 +21,13 @@ import requests
 from flask import Flask, jsonify, render_template_string, request
 
 
+PREVIEW_PORT = 5000  # preview_server.py 멀티채널 프로세스
+
 CHANNELS = [
-    {"id": "webcam", "name": "Webcam", "port": 5000, "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-webcam.out.log"},
-    {"id": "rtsp", "name": "RTSP", "port": 5001, "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-rtsp.out.log"},
-    {"id": "video1", "name": "Video 1", "port": 5002, "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-video1.out.log"},
-    {"id": "video2", "name": "Video 2", "port": 5003, "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-video2.out.log"},
+    {"id": "webcam", "name": "Webcam", "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-webcam.out.log"},
+    {"id": "rtsp", "name": "RTSP", "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-rtsp.out.log"},
+    {"id": "video1", "name": "Video 1", "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-video1.out.log"},
+    {"id": "video2", "name": "Video 2", "ds_log": "/home/ppak/projects/elevator/deepstream_pose/logs/elevator-ds-video2.out.log"},
 ]
 
 FALL_RE = re.compile(r"\[쓰러짐 감지\].*신뢰도:\s*([0-9.]+)")
@@ -63,6 +65,9 @@ HTML = """
     .pill.fall { background:#7f1d1d; color:#fecaca; }
     .pill.fight { background:#78350f; color:#fde68a; }
     .hint { font-size:12px; color:#94a3b8; padding:8px 10px; border-top:1px solid #1f2937; }
+    #zoom { display:none; position:fixed; inset:0; background:rgba(0,0,0,.85); flex-direction:column; align-items:center; justify-content:center; z-index:10; cursor:zoom-out; }
+    #zoom img { width:auto; max-width:95vw; height:auto; max-height:88vh; }
+    #zoomTitle { padding:8px; font-weight:700; }
   </style>
 </head>
 <body>
@@ -93,12 +98,19 @@ HTML = """
     </div>
   </div>
 
+  <div id="zoom" onclick="closeZoom()">
+    <div id="zoomTitle"></div>
+    <img id="zoomImg" alt="detail"/>
+  </div>
+
 <script>
 const channels = {{ channels|tojson }};
+const previewPort = {{ preview_port }};
 let lastEventId = 0;
 
-function streamUrl(port){ return `http://${location.hostname}:${port}/video_feed`; }
-function statsUrl(port){ return `http://${location.hostname}:${port}/stats`; }
+// 그리드는 thumb 티어, 타일 클릭 시 full 티어로 상세 보기 (닫으면 구독 해제 → full 인코딩 중단)
+function streamUrl(ch, tier='thumb'){ return `http://${location.hostname}:${previewPort}/${ch.id}/video_feed?tier=${tier}`; }
+function statsUrl(ch){ return `http://${location.hostname}:${previewPort}/${ch.id}/stats`; }
 
 function makeGrid(){
   const grid = document.getElementById('grid');
@@ -111,19 +123,31 @@ function makeGrid(){
         <div><strong>${ch.name}</strong></div>
         <div id="st_${ch.id}" class="warn">확인중...</div>
       </div>
-      <img id="img_${ch.id}" src="${streamUrl(ch.port)}" alt="${ch.name}"/>
-      <div class="stats" id="meta_${ch.id}">port:${ch.port}</div>
+      <img id="img_${ch.id}" src="${streamUrl(ch)}" alt="${ch.name}" onclick="openZoom('${ch.id}')" style="cursor:zoom-in"/>
+      <div class="stats" id="meta_${ch.id}">/${ch.id}</div>
     `;
     grid.appendChild(card);
   });
 }
 
+function openZoom(id){
+  const ch = channels.find(c => c.id === id);
+  document.getElementById('zoomTitle').textContent = ch.name;
+  document.getElementById('zoomImg').src = streamUrl(ch, 'full');
+  document.getElementById('zoom').style.display = 'flex';
+}
+
+function closeZoom(){
+  document.getElementById('zoomImg').src = '';
+  document.getElementById('zoom').style.display = 'none';
+}
+
 async function refreshStatus(){
   for (const ch of channels){
     const stEl = document.getElementById(`st_${ch.id}`);
     const meta = document.getElementById(`meta_${ch.id}`);
     try {
-      const r = await fetch(statsUrl(ch.port), {cache:'no-store'});
+      const r = await fetch(statsUrl(ch), {cache:'no-store'});
       if(!r.ok) throw new Error(`HTTP ${r.status}`);
       const j = await r.json();
       stEl.textContent = 'ONLINE';
@@ -132,7 +156,7 @@ async function refreshStatus(){
     } catch(e){
       stEl.textContent = 'OFFLINE';
       stEl.className = 'bad';
-      meta.textContent = `port:${ch.port} 연결 실패`;
+      meta.textContent = `/${ch.id} 연결 실패`;
     }
   }
 }
@@ -323,7 +347,7 @@ def create_app(hub: AlertHub):
 
     @app.route("/")
     def index():
-        return render_template_string(HTML, channels=CHANNELS)
+        return render_template_string(HTML, channels=CHANNELS, preview_port=PREVIEW_PORT)
 
     @app.route("/api/events")
     def api_events():
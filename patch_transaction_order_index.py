@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Patch script to add (portfolio_id, memo, transaction_date) index to Transaction model
+and create it on the existing database (RealAccountService.sync_transactions 주문번호+체결일 조회용)
+"""
+import re
+import sys
+
+INDEX_NAME = "ix_transactions_portfolio_order_date"
+
+# ============================================
+# Step 1: Update Transaction model
+# ============================================
+transaction_file = 'backend/models/transaction.py'
+with open(transaction_file, 'r', encoding='utf-8') as f:
+    content = f.read()
+
+if INDEX_NAME in content:
+    print('Step 1 스킵: 이미 추가됨')
+elif '__table_args__' in content:
+    print('Step 1 실패: __table_args__가 이미 있음 → 수동으로 Index 추가 필요')
+    sys.exit(1)
+else:
+    m = re.search(r'^(\s*)__tablename__\s*=\s*["\'][^"\']+["\'][^\n]*\n', content, flags=re.M)
+    if not m:
+        print('Step 1 실패: __tablename__ 위치를 찾을 수 없음')
+        sys.exit(1)
+    indent = m.group(1)
+    table_args = (
+        f'{indent}# [v3.6] 거래 동기화: 주문번호(memo)+체결일 조회 (KIS 주문번호는 거래일마다 재사용)\n'
+        f'{indent}__table_args__ = (\n'
+        f'{indent}    Index("{INDEX_NAME}", "portfolio_id", "memo", "transaction_date"),\n'
+        f'{indent})\n'
+    )
+    content = content[:m.end()] + table_args + content[m.end():]
+
+    imp = re.search(r'^from sqlalchemy import ([^\n(]+)$', content, flags=re.M)
+    if imp and 'Index' not in [n.strip() for n in imp.group(1).split(',')]:
+        content = content[:imp.end()] + ', Index' + content[imp.end():]
+    elif not imp:
+        content = 'from sqlalchemy import Index\n' + content
+
+    with open(transaction_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    print('Step 1 완료: Transaction 모델에 %s 인덱스 추가' % INDEX_NAME)
+
+# ============================================
+# Step 2: Create index on existing database
+# (create_all은 기존 테이블에 인덱스를 추가하지 않음)
+# ============================================
+from backend.database import engine
+from backend.models.transaction import Transaction
+
+index = next((i for i in Transaction.__table__.indexes if i.name == INDEX_NAME), None)
+if index is None:
+    print('Step 2 실패: 모델에서 %s 인덱스를 찾을 수 없음' % INDEX_NAME)
+    sys.exit(1)
+index.create(bind=engine, checkfirst=True)
+print('Step 2 완료: DB에 %s 인덱스 생성 (이미 있으면 스킵)' % INDEX_NAME)
@@ -1,31 +1,315 @@
 #!/usr/bin/env python3
 import argparse
+import queue
 import time
 import threading
 import cv2
-from flask import Flask, Response, jsonify
+import numpy as np
+from flask import Flask, Response, jsonify, request
 
 
-class PreviewServer:
-    def __init__(self, source, host='0.0.0.0', port=5000, width=640, jpeg_quality=70):
-        self.source = source
-        self.host = host
-        self.port = port
-        self.width = width
+class StreamClient:
+    """MJPEG 클라이언트별 페이싱/통계
+
+    - 목표 FPS 간격만큼만 전송, 소켓 쓰기가 느리면 그 사이 프레임은 큐잉 없이 건너뜀
+    - write_ms: yield 후 재개까지 시간 (werkzeug가 조각을 소켓에 쓰는 시간)
+    - lag_ms: 프레임 발행 → 전송 시작
+    """
+
+    EWMA = 0.2
+
+    def __init__(self, name, fps):
+        self.name = name
+        self.fps = fps
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.started = time.time()
+        self.sent = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.write_ms = 0.0
+        self.lag_ms = 0.0
+
+    def _ewma(self, old, new):
+        return new if not self.sent else old + self.EWMA * (new - old)
+
+    def record(self, nbytes, lag, write):
+        self.lag_ms = self._ewma(self.lag_ms, lag * 1000)
+        self.write_ms = self._ewma(self.write_ms, write * 1000)
+        self.sent += 1
+        self.bytes += nbytes
+
+    def stats(self):
+        elapsed = max(time.time() - self.started, 1e-6)
+        return {
+            'client': self.name,
+            'target_fps': self.fps,
+            'fps': round(self.sent / elapsed, 2),
+            'kbps': round(self.bytes * 8 / 1000 / elapsed, 1),
+            'sent': self.sent,
+            'skipped': self.skipped,
+            'lag_ms': round(self.lag_ms, 1),
+            'write_ms': round(self.write_ms, 1),
+            'age_sec': round(elapsed, 1),
+        }
+
+
+class FrameBroadcaster:
+    """MJPEG fan-out: 새 프레임을 한 번만 인코딩해 모든 클라이언트가 같은 버퍼를 공유
+
+    - publish(): 리더 스레드에서 호출. 인코딩은 락 밖, 교체(seq 증가)만 락 안
+    - stream(): 클라이언트별 제너레이터. 조건변수로 대기하다 아직 안 보낸 최신 seq만 전송
+      (클라이언트별 목표 FPS로 페이싱, 느린 소켓은 중간 프레임을 건너뜀)
+    - 시청자가 없으면 인코딩 생략
+    """
+
+    BOUNDARY = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+    def __init__(self, jpeg_quality=70, client_fps=15):
         self.jpeg_quality = jpeg_quality
-        self.app = Flask(__name__)
+        self.client_fps = client_fps
+        self.cond = threading.Condition()
+        self.part = None      # 완성된 multipart 조각 (bytes, 불변 → 복사 없이 공유)
+        self.published_at = 0.0
+        self.seq = 0
+        self.clients = {}
+        self.encoded = 0
+        self.closed = False
+
+    def publish(self, frame):
+        if not self.clients:
+            return False
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return False
+        part = self.BOUNDARY + buf.tobytes() + b'\r\n'
+        with self.cond:
+            self.part = part
+            self.published_at = time.monotonic()
+            self.seq += 1
+            self.encoded += 1
+            self.cond.notify_all()
+        return True
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def stream(self, fps=None, name='', timeout=1.0):
+        client = StreamClient(name, fps or self.client_fps)
+        with self.cond:
+            self.clients[id(client)] = client
+        last = 0
+        try:
+            while True:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.seq != last or self.closed, timeout)
+                    if self.closed:
+                        return
+                    seq, part, published = self.seq, self.part, self.published_at
+                if seq == last or part is None:
+                    continue
+                if last:
+                    client.skipped += seq - last - 1
+                last = seq
+                began = time.monotonic()
+                yield part
+                wrote = time.monotonic()
+                client.record(len(part), began - published, wrote - began)
+                # 남은 간격만 대기 (쓰기가 간격보다 길면 바로 최신 프레임으로)
+                rest = client.interval - (wrote - began)
+                if rest > 0:
+                    time.sleep(rest)
+        finally:
+            with self.cond:
+                self.clients.pop(id(client), None)
+
+    def stats(self):
+        with self.cond:
+            clients = list(self.clients.values())
+            stats = {'clients': len(clients), 'seq': self.seq, 'encoded': self.encoded}
+        stats['streams'] = [c.stats() for c in clients]
+        return stats
+
+
+class FrameRing:
+    """미리 할당한 프레임 버퍼 링 (캡처 스레드 → 인코더 무복사 전달)
+
+    - 쓰기: 최신 완성 슬롯/인코더가 읽는 슬롯이 아닌 칸에 직접 resize(dst=)·copyto
+    - 읽기: (슬롯 인덱스, 버전)만 넘기고 인코딩 중에는 락을 잡지 않음
+    - 인코더가 밀리면 최신 슬롯만 교체 (중간 프레임은 버림)
+    """
+
+    def __init__(self, size=3):
+        self.bufs = [None] * max(size, 3)  # 첫 프레임 크기로 지연 할당
+        self.lock = threading.Lock()
+        self.version = 0
+        self.ready = -1       # 최신 완성 슬롯
+        self.reading = -1     # 인코더가 읽는 중인 슬롯
+        self.allocations = 0
+        self.dropped = 0
+
+    def acquire_write(self, shape, dtype):
+        with self.lock:
+            i = next(k for k in range(len(self.bufs)) if k != self.ready and k != self.reading)
+        buf = self.bufs[i]
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self.bufs[i] = np.empty(shape, dtype)
+            self.allocations += 1
+        return i, buf
+
+    def commit(self, i):
+        with self.lock:
+            if self.ready >= 0:
+                self.dropped += 1   # 인코더가 아직 못 가져간 이전 프레임
+            self.ready = i
+            self.version += 1
+
+    def has_ready(self):
+        with self.lock:
+            return self.ready >= 0
+
+    def take(self):
+        """최신 완성 슬롯을 읽기 상태로 (없으면 None)"""
+        with self.lock:
+            if self.ready < 0:
+                return None
+            i, self.ready = self.ready, -1
+            self.reading = i
+            return i, self.version, self.bufs[i]
+
+    def release(self, i):
+        with self.lock:
+            if self.reading == i:
+                self.reading = -1
+
+
+class EncoderPool:
+    """채널·티어 공용 JPEG 인코더 스레드 풀
+
+    - 티어는 새 링 슬롯을 커밋할 때 submit(), 대기 중이거나 인코딩 중이면 중복 투입하지 않음
+      (티어당 동시에 한 작업만 → 읽는 슬롯이 하나로 유지됨)
+    - 인코딩 중 들어온 프레임은 끝난 뒤 최신 슬롯 하나만 다시 투입
+    """
+
+    def __init__(self, workers=2):
+        self.workers = max(1, workers)
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.busy = 0
+        self.jobs = 0
+
+    def start(self):
+        for k in range(self.workers):
+            threading.Thread(target=self._worker, name=f'encoder-{k}', daemon=True).start()
+
+    def stop(self):
+        for _ in range(self.workers):
+            self.queue.put(None)
+
+    def submit(self, tier):
+        with self.lock:
+            if tier in self.pending:
+                return
+            self.pending.add(tier)
+        self.queue.put(tier)
+
+    def _worker(self):
+        while True:
+            tier = self.queue.get()
+            if tier is None:
+                return
+            with self.lock:
+                self.busy += 1
+            try:
+                tier.encode_latest()
+            finally:
+                with self.lock:
+                    self.busy -= 1
+                    self.jobs += 1
+                    self.pending.discard(tier)
+                if tier.ring.has_ready():
+                    self.submit(tier)
+
+    def stats(self):
+        with self.lock:
+            return {'workers': self.workers, 'busy': self.busy, 'queued': len(self.pending) - self.busy,
+                    'jobs': self.jobs}
+
+
+class PreviewTier:
+    """해상도 티어 (thumb: 대시보드 그리드, full: 상세 보기)
+
+    같은 캡처 프레임에서 티어별 폭으로 축소해 링 버퍼에 넣고, 공용 인코더 풀이 인코딩.
+    구독자가 있을 때만, encode_fps 주기로만 인코딩.
+    """
+
+    def __init__(self, name, width, jpeg_quality, encode_fps, client_fps, pool, ring_size=3):
+        self.name = name
+        self.width = width
+        self.encode_fps = encode_fps
+        self.interval = 1.0 / encode_fps if encode_fps and encode_fps > 0 else 0.0
+        self.broadcaster = FrameBroadcaster(jpeg_quality, min(client_fps, encode_fps or client_fps))
+        self.ring = FrameRing(ring_size)
+        self.pool = pool
+        self.last_encode = 0.0
+
+    def stop(self):
+        self.broadcaster.close()
+
+    def offer(self, frame, now):
+        """캡처 스레드: 링 슬롯에 축소/복사만 하고 반환 (인코딩은 인코더 풀)"""
+        if not self.broadcaster.clients or now - self.last_encode < self.interval:
+            return False
+        self.last_encode = now
+        h, w = frame.shape[:2]
+        size = (self.width, int(h * self.width / w)) if self.width and w > self.width else (w, h)
+        i, buf = self.ring.acquire_write((size[1], size[0]) + frame.shape[2:], frame.dtype)
+        if size == (w, h):
+            np.copyto(buf, frame)
+        else:
+            cv2.resize(frame, size, dst=buf, interpolation=cv2.INTER_LINEAR)
+        self.ring.commit(i)
+        self.pool.submit(self)
+        return True
+
+    def encode_latest(self):
+        """인코더 풀 스레드: 최신 슬롯 하나를 인코딩해 발행"""
+        got = self.ring.take()
+        if got is None:
+            return False
+        i, _, buf = got
+        try:
+            return self.broadcaster.publish(buf)
+        finally:
+            self.ring.release(i)
+
+    def stats(self):
+        return {'width': self.width, 'encode_fps': self.encode_fps,
+                'ring_allocations': self.ring.allocations, 'ring_dropped': self.ring.dropped,
+                **self.broadcaster.stats()}
+
+
+class PreviewChannel:
+    """소스 하나 = 캡처 스레드 하나 + 티어(full/thumb)"""
+
+    def __init__(self, name, source, pool, width=640, jpeg_quality=70, client_fps=15,
+                 full_fps=15, thumb_width=320, thumb_quality=60, thumb_fps=8):
+        self.name = name
+        self.source = source
         self.cap = None
-        self.frame = None
         self.running = False
-        self.lock = threading.Lock()
+        self.tiers = {
+            'full': PreviewTier('full', width, jpeg_quality, full_fps, client_fps, pool),
+            'thumb': PreviewTier('thumb', thumb_width, thumb_quality, thumb_fps, client_fps, pool),
+        }
         self.frame_count = 0
         self.start_time = time.time()
 
         src = str(source).lower()
         self.is_live = src.isdigit() or src.startswith(("rtsp://", "rtmp://", "udp://", "http://", "https://"))
 
-        self._setup_routes()
-
     def _open_capture(self):
         src = self.source
         if str(src).isdigit():
@@ -37,13 +321,14 @@ class PreviewServer:
 
     def _reader(self):
         self._open_capture()
+        frame = None  # 캡처 버퍼 재사용 (cap.read(frame))
         while self.running:
             if self.cap is None or not self.cap.isOpened():
                 time.sleep(0.2)
                 self._open_capture()
                 continue
 
-            ok, frame = self.cap.read()
+            ok, frame = self.cap.read(frame)
             if not ok:
                 # 파일 소스는 EOF 도달 시 처음으로 되감기
                 if not self.is_live and self.cap is not None and self.cap.isOpened():
@@ -54,13 +339,10 @@ class PreviewServer:
                 time.sleep(0.02)
                 continue
 
-            if self.width and frame.shape[1] > self.width:
-                h = int(frame.shape[0] * self.width / frame.shape[1])
-                frame = cv2.resize(frame, (self.width, h), interpolation=cv2.INTER_LINEAR)
-
-            with self.lock:
-                self.frame = frame
-                self.frame_count += 1
+            self.frame_count += 1
+            now = time.monotonic()
+            for tier in self.tiers.values():
+                tier.offer(frame, now)
 
             # 파일 재생은 과도한 CPU 사용 방지를 위해 속도 제한
             if self.is_live:
@@ -68,65 +350,142 @@ class PreviewServer:
             else:
                 time.sleep(1/15)
 
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._reader, name='capture-' + self.name, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        for tier in self.tiers.values():
+            tier.stop()
+
+    def stats(self):
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        fps = self.frame_count / elapsed
+        return {'frames': self.frame_count, 'fps': round(fps, 2), 'source': self.source,
+                'tiers': {name: tier.stats() for name, tier in self.tiers.items()}}
+
+
+class PreviewServer:
+    """멀티채널 프리뷰: 채널별 캡처 스레드, 공용 인코더 풀, HTTP 서버 하나
+
+    - /<channel>/video_feed?tier=thumb|full&fps=N, /<channel>/stats
+    - /video_feed: 첫 채널 (단일 소스 호환)
+    - /stats: 전 채널 합산 + 채널별 + 인코더 풀
+    """
+
+    def __init__(self, sources, host='0.0.0.0', port=5000, encoders=2, **channel_opts):
+        self.host = host
+        self.port = port
+        self.app = Flask(__name__)
+        self.pool = EncoderPool(encoders)
+        self.channels = {name: PreviewChannel(name, source, self.pool, **channel_opts)
+                         for name, source in sources.items()}
+        self._setup_routes()
+
+    def _stream(self, channel):
+        # ?tier=thumb|full (기본 full), ?fps=N
+        tier = channel.tiers.get(request.args.get('tier', 'full'))
+        if tier is None:
+            return jsonify({'error': 'unknown tier', 'tiers': list(channel.tiers)}), 404
+        fps = request.args.get('fps', type=float)
+        return Response(tier.broadcaster.stream(fps=fps, name=request.remote_addr),
+                        mimetype='multipart/x-mixed-replace; boundary=frame')
+
+    def _unknown_channel(self):
+        return jsonify({'error': 'unknown channel', 'channels': list(self.channels)}), 404
+
     def _setup_routes(self):
         @self.app.route('/')
         def index():
+            tiles = ''.join(
+                f'<div style="padding:4px"><div>{name}</div>'
+                f'<a href="/{name}/video_feed"><img src="/{name}/video_feed?tier=thumb" style="width:100%;display:block"/></a></div>'
+                for name in self.channels
+            )
             return (
                 '<html><head><title>Elevator Preview</title></head>'
                 '<body style="margin:0;background:#111;color:#eee;font-family:sans-serif">'
                 '<div style="padding:10px">Elevator Preview (DeepStream inference running separately)</div>'
-                '<img src="/video_feed" style="width:100%;height:auto;display:block"/>'
+                '<div style="display:grid;grid-template-columns:repeat(2,1fr)">' + tiles + '</div>'
                 '</body></html>'
             )
 
         @self.app.route('/video_feed')
         def video_feed():
-            def gen():
-                last = None
-                while self.running:
-                    cur = None
-                    with self.lock:
-                        if self.frame is not None:
-                            ok, buf = cv2.imencode('.jpg', self.frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
-                            if ok:
-                                cur = buf.tobytes()
-                                last = cur
-                    if cur is None and last is not None:
-                        cur = last
-                    if cur is not None:
-                        yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + cur + b'\r\n')
-                    time.sleep(0.03)
-
-            return Response(gen(), mimetype='multipart/x-mixed-replace; boundary=frame')
+            return self._stream(next(iter(self.channels.values())))
+
+        @self.app.route('/<name>/video_feed')
+        def channel_feed(name):
+            channel = self.channels.get(name)
+            return self._stream(channel) if channel else self._unknown_channel()
+
+        @self.app.route('/<name>/stats')
+        def channel_stats(name):
+            channel = self.channels.get(name)
+            return jsonify(channel.stats()) if channel else self._unknown_channel()
 
         @self.app.route('/stats')
         def stats():
-            elapsed = max(time.time() - self.start_time, 1e-6)
-            fps = self.frame_count / elapsed
-            return jsonify({'frames': self.frame_count, 'fps': round(fps, 2), 'source': self.source})
+            channels = {name: ch.stats() for name, ch in self.channels.items()}
+            return jsonify({
+                'frames': sum(c['frames'] for c in channels.values()),
+                'fps': round(sum(c['fps'] for c in channels.values()), 2),
+                'clients': sum(t['clients'] for c in channels.values() for t in c['tiers'].values()),
+                'encoded': sum(t['encoded'] for c in channels.values() for t in c['tiers'].values()),
+                'encoder_pool': self.pool.stats(),
+                'channels': channels,
+            })
 
     def run(self):
-        self.running = True
-        t = threading.Thread(target=self._reader, daemon=True)
-        t.start()
+        self.pool.start()
+        for channel in self.channels.values():
+            channel.start()
         self.app.run(host=self.host, port=self.port, debug=False, threaded=True, use_reloader=False)
 
 
+def _parse_channel(value):
+    name, sep, source = value.partition('=')
+    if not sep or not name or not source:
+        raise argparse.ArgumentTypeError(f'NAME=SOURCE 형식이어야 함: {value}')
+    return name, source
+
+
 def main():
-    p = argparse.ArgumentParser(description='Low-latency preview server')
-    p.add_argument('--source', required=True)
+    p = argparse.ArgumentParser(description='Low-latency multi-channel preview server')
+    p.add_argument('--channel', action='append', type=_parse_channel, default=[], metavar='NAME=SOURCE',
+                   help='채널 추가 (반복 가능, /NAME/video_feed 로 제공)')
+    p.add_argument('--source', help='단일 채널 (--channel main=SOURCE 와 동일)')
     p.add_argument('--host', default='0.0.0.0')
     p.add_argument('--port', type=int, default=5000)
-    p.add_argument('--width', type=int, default=640)
-    p.add_argument('--jpeg-quality', type=int, default=70)
+    p.add_argument('--width', type=int, default=640, help='full 티어 폭')
+    p.add_argument('--jpeg-quality', type=int, default=70, help='full 티어 JPEG 품질')
+    p.add_argument('--full-fps', type=float, default=15, help='full 티어 인코딩 FPS 상한')
+    p.add_argument('--thumb-width', type=int, default=320)
+    p.add_argument('--thumb-quality', type=int, default=60)
+    p.add_argument('--thumb-fps', type=float, default=8, help='thumb 티어 인코딩 FPS 상한')
+    p.add_argument('--client-fps', type=float, default=15, help='클라이언트별 기본 전송 FPS (/video_feed?fps=N 으로 변경)')
+    p.add_argument('--encoders', type=int, default=2, help='전 채널 공용 인코더 스레드 수')
     args = p.parse_args()
 
+    sources = dict(args.channel)
+    if args.source:
+        sources.setdefault('main', args.source)
+    if not sources:
+        p.error('--channel NAME=SOURCE 또는 --source 가 필요함')
+
     PreviewServer(
-        source=args.source,
+        sources,
         host=args.host,
         port=args.port,
+        encoders=args.encoders,
         width=args.width,
         jpeg_quality=args.jpeg_quality,
+        client_fps=args.client_fps,
+        full_fps=args.full_fps,
+        thumb_width=args.thumb_width,
+        thumb_quality=args.thumb_quality,
+        thumb_fps=args.thumb_fps,
     ).run()
 
 
@@ -14,6 +14,17 @@ VIDEO2='/home/ppak/projects/elevator/elve2.mp4'
 systemctl --user disable --now elevator.service >/dev/null 2>&1 || true
 systemctl --user disable --now elevator-preview.service >/dev/null 2>&1 || true
 
+# 채널별 프리뷰 서비스는 단일 멀티채널 프로세스로 통합
+for svc in \
+  elevator-preview-webcam.service \
+  elevator-preview-rtsp.service \
+  elevator-preview-video1.service \
+  elevator-preview-video2.service
+  do
+    systemctl --user disable --now "$svc" >/dev/null 2>&1 || true
+    rm -f "$UNIT_DIR/$svc"
+  done
+
 write_ds_unit () {
   local name="$1"
   local source="$2"
@@ -40,11 +51,10 @@ EOF
 
 write_preview_unit () {
   local name="$1"
-  local source="$2"
-  local port="$3"
+  local port="$2"
   cat > "$UNIT_DIR/$name" <<EOF
 [Unit]
-Description=Elevator preview channel: $name
+Description=Elevator preview (4 channels): $name
 After=network-online.target
 Wants=network-online.target
 
@@ -53,7 +63,7 @@ Type=simple
 WorkingDirectory=/home/ppak/projects/elevator
 Environment=PYTHONUNBUFFERED=1
 Environment=OPENCV_FFMPEG_CAPTURE_OPTIONS=rtsp_transport;udp|fflags;nobuffer|flags;low_delay|max_delay;500000|reorder_queue_size;0
-ExecStart=/home/ppak/projects/elevator/venv/bin/python /home/ppak/projects/elevator/preview_server.py --source $source --port $port --width 640 --jpeg-quality 65
+ExecStart=/home/ppak/projects/elevator/venv/bin/python /home/ppak/projects/elevator/preview_server.py --port $port --width 640 --jpeg-quality 65 --encoders 4 --channel webcam=0 --channel rtsp=$RTSP_URL --channel video1=$VIDEO1 --channel video2=$VIDEO2
 Restart=always
 RestartSec=3
 StandardOutput=append:/home/ppak/projects/elevator/logs/${name%.service}.out.log
@@ -70,11 +80,8 @@ write_ds_unit "elevator-ds-rtsp.service" "$RTSP_URL"
 write_ds_unit "elevator-ds-video1.service" "$VIDEO1"
 write_ds_unit "elevator-ds-video2.service" "$VIDEO2"
 
-# Preview 4채널 (포트 분리)
-write_preview_unit "elevator-preview-webcam.service" "0" "5000"
-write_preview_unit "elevator-preview-rtsp.service" "$RTSP_URL" "5001"
-write_preview_unit "elevator-preview-video1.service" "$VIDEO1" "5002"
-write_preview_unit "elevator-preview-video2.service" "$VIDEO2" "5003"
+# Preview 4채널 (단일 프로세스, :5000/<채널>/video_feed)
+write_preview_unit "elevator-preview-4ch.service" "5000"
 
 systemctl --user daemon-reload
 
@@ -83,10 +90,7 @@ for svc in \
   elevator-ds-rtsp.service \
   elevator-ds-video1.service \
   elevator-ds-video2.service \
-  elevator-preview-webcam.service \
-  elevator-preview-rtsp.service \
-  elevator-preview-video1.service \
-  elevator-preview-video2.service
+  elevator-preview-4ch.service
   do
     systemctl --user enable --now "$svc" >/dev/null 2>&1 || true
   done
@@ -99,10 +103,7 @@ for svc in \
   elevator-ds-rtsp.service \
   elevator-ds-video1.service \
   elevator-ds-video2.service \
-  elevator-preview-webcam.service \
-  elevator-preview-rtsp.service \
-  elevator-preview-video1.service \
-  elevator-preview-video2.service
+  elevator-preview-4ch.service
   do
     state=$(systemctl --user is-active "$svc" 2>/dev/null || true)
     enabled=$(systemctl --user is-enabled "$svc" 2>/dev/null || true)
@@ -110,4 +111,4 @@ for svc in \
   done
 
 echo "=== PORT CHECK ==="
-ss -ltn | egrep ':5000|:5001|:5002|:5003' || true
+ss -ltn | egrep ':5000|:7000' || true
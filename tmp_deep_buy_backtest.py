@@ -0,0 +1,538 @@
+"""
+딥바이 전략 오프라인 백테스트
+
+기록된 틱/분봉(CSV: ts,code,price[,volume] 또는 틱 레코더 일자 세그먼트)을 재생해 파라미터 조합별 성과를 계산한다.
+  ts: epoch 초 또는 "YYYY-mm-dd HH:MM:SS"
+
+엔진
+  - exact : SimpleDeepBuyStrategy 판단 코드(_evaluate_tick, _run_cycle)를 그대로 재생.
+            주문은 가상 브로커가 즉시 체결, 쿨다운 시계도 재생 시각을 따른다.
+  - vector: 핵심 규칙(평단/매도가 기준 낙폭매수, 트레일링 분할매도, 고정 +2% 매도)을
+            NumPy 배열로 옮겨 파라미터 조합 K개를 한 번에 계산. 종목별 프로세스 병렬.
+            (삼성 신고가 1주 매도, 개미떨구기는 생략 / 현금은 종목별 균등 배분 근사)
+            → 후보를 vector로 좁히고 exact로 확인
+
+사용 예:
+  python -m backend.services.deep_buy_backtest ticks.csv \\
+      --grid TRAILING_TRIGGER=0.03,0.04,0.05 --grid TRAILING_SELL_STEP=0.003,0.005 --processes 4
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from backend.services.kis_simulator import BUY_FEE, SELL_TAX, KisSimulator
+
+logger = logging.getLogger(__name__)
+
+# 스윕 가능한 파라미터 (SimpleDeepBuyStrategy 클래스 속성명)
+SWEEP_PARAMS = (
+    "BUY_DROP_PCT",
+    "BUY_DROP_PCT_SELL_REF",
+    "TRAILING_TRIGGER",
+    "TRAILING_SELL_START",
+    "TRAILING_SELL_STEP",
+    "SELL_RISE_PCT",
+)
+
+Ticks = Dict[str, Tuple[np.ndarray, np.ndarray]]  # 종목코드 -> (ts, price), ts 오름차순
+
+
+# === 데이터 로드 ===
+def _parse_ts(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y%m%d %H%M%S", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError("시각 형식 오류: %s" % value)
+
+
+def _load_segment(path: str, rows: Dict[str, List[Tuple[float, float]]]):
+    """틱 레코더 일자 세그먼트 로드 (종목 인덱스로 컬럼 직접 조회)"""
+    from backend.services.tick_recorder import TickSegment
+
+    with TickSegment(path) as seg:
+        ts = np.frombuffer(seg.column("ts"), dtype="<f8")
+        price = np.frombuffer(seg.column("price"), dtype="<f8")
+        idx = None  # 종목이 없는 세그먼트(빈 날/회전 직후)에서도 del 가능하도록
+        for code in seg.codes:
+            idx = np.frombuffer(seg.rows_for(code), dtype="<u4")
+            if len(idx):
+                rows.setdefault(code, []).extend(zip(ts[idx].tolist(), price[idx].tolist()))
+        del ts, price, idx  # mmap 닫기 전 버퍼 참조 해제
+
+
+def load_ticks(paths: List[str]) -> Ticks:
+    """틱 로드 (CSV 파일 또는 틱 레코더 세그먼트 디렉토리, 여러 개 병합 후 종목별 시각 정렬)"""
+    rows: Dict[str, List[Tuple[float, float]]] = {}
+    for path in paths:
+        if os.path.isdir(path):
+            _load_segment(path, rows)
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() in ("ts", "time", "timestamp"):
+                    continue
+                code = row[1].strip()
+                price = float(row[2])
+                if price > 0:
+                    rows.setdefault(code, []).append((_parse_ts(row[0].strip()), price))
+
+    ticks = {}
+    for code, items in rows.items():
+        arr = np.asarray(items, dtype=np.float64)
+        order = np.argsort(arr[:, 0], kind="stable")
+        ticks[code] = (arr[order, 0], arr[order, 1])
+    return ticks
+
+
+@lru_cache(maxsize=1)
+def strategy_defaults() -> Dict:
+    """전략 기본 파라미터 (클래스 속성에서 읽음)"""
+    from backend.services.simple_deep_buy import SimpleDeepBuyStrategy as S
+    params = {name: float(getattr(S, name)) for name in SWEEP_PARAMS}
+    params.update({
+        "CHECK_INTERVAL": S.CHECK_INTERVAL,
+        "MARKET_OPEN": tuple(S.MARKET_OPEN),
+        "MARKET_CLOSE": tuple(S.MARKET_CLOSE),
+        "SAMSUNG_CODES": tuple(S.SAMSUNG_CODES),
+        "SAMSUNG_MIN_HOLD_QTY": S.SAMSUNG_MIN_HOLD_QTY,
+    })
+    return params
+
+
+def cycle_slots(start: float, end: float, interval_sec: int,
+                market_open: Tuple[int, int], market_close: Tuple[int, int]) -> np.ndarray:
+    """장중 사이클 시각 (interval 정렬, 평일 market_open~market_close)"""
+    first = (int(start) // interval_sec + 1) * interval_sec
+    slots = []
+    for t in range(first, int(end) + 1, interval_sec):
+        dt = datetime.fromtimestamp(t)
+        hm = (dt.hour, dt.minute)
+        if dt.weekday() < 5 and market_open <= hm <= market_close:
+            slots.append(t)
+    return np.asarray(slots, dtype=np.float64)
+
+
+def _summarize(initial: float, final: float, curve: List[float], traded: float,
+               buys: int, sells: int) -> Dict:
+    equity = np.asarray(list(curve) + [final], dtype=np.float64)
+    peak = np.maximum.accumulate(np.concatenate(([initial], equity)))[1:]
+    drawdown = float(np.max((peak - equity) / peak)) if len(equity) else 0.0
+    return {
+        "pnl": final - initial,
+        "return_pct": (final - initial) / initial * 100 if initial else 0.0,
+        "turnover": traded / initial if initial else 0.0,
+        "max_drawdown_pct": drawdown * 100,
+        "buys": buys,
+        "sells": sells,
+    }
+
+
+# === exact 엔진: 가상 브로커 + 전략 서브클래스 ===
+class BacktestBroker(KisSimulator):
+    """가상 브로커 (지연·슬리피지 없는 KisSimulator → 시장가 즉시 체결)"""
+
+    def __init__(self, cash: float, positions: Dict[str, Tuple[int, float]], names: Dict[str, str] = None):
+        super().__init__(cash, positions, names)
+
+
+@lru_cache(maxsize=1)
+def _strategy_class():
+    """외부 부수효과(DB/알림/브로드캐스트)를 끈 전략 서브클래스"""
+    from backend.services.simple_deep_buy import SimpleDeepBuyStrategy, _OrderIntent
+
+    class BacktestStrategy(SimpleDeepBuyStrategy):
+        def __init__(self, broker: BacktestBroker, clock):
+            self._bt_broker = broker
+            super().__init__()
+            self._clock = clock
+            self.ledger: List[Dict] = []
+
+        def _load_initial_state(self):
+            self.kis = self._bt_broker
+            self.update_holdings_cache()
+
+        def load_all_targets_from_db(self):
+            pass
+
+        def _get_quote(self, code):
+            return self.kis.get_stock_quote(code)
+
+        async def _fetch_quote_snapshot(self, codes):
+            return {code: q for code in codes for q in [self.kis.get_stock_quote(code)] if q}
+
+        def _fill_now(self, intent, side_code):
+            # 파이프라인 대신 즉시 체결 → 같은 틱 안에서 on_done 반영
+            try:
+                intent.order_no = self.kis.send_order(intent.code, intent.qty, 0, side_code, "01")["order_no"]
+                intent.filled_qty, intent.fill_price, intent.status = intent.qty, self.kis.prices[intent.code], "filled"
+            except Exception as e:
+                intent.status, intent.error = "rejected", str(e)
+            intent.on_done(intent)
+            return True
+
+        def _submit_sell(self, code, name, qty, ref_price, kind, message):
+            with self._sell_lock:
+                if code in self._selling_codes:
+                    return False
+                self._selling_codes.add(code)
+            return self._fill_now(_OrderIntent(code, name, "SELL", qty, ref_price, kind, message, self._on_sell_done), "1")
+
+        def _submit_buy(self, code, name, qty, ref_price, reason):
+            with self._sell_lock:
+                if code in self._buying_codes:
+                    return False
+                self._buying_codes.add(code)
+            return self._fill_now(_OrderIntent(code, name, "BUY", qty, ref_price, reason, "", self._on_buy_done), "2")
+
+        def _save_transaction(self, code, name, tx_type, qty, price, order_no=None):
+            self.ledger.append({"ts": self._clock(), "code": code, "type": tx_type, "qty": qty, "price": price})
+
+        def _send_notification_sync(self, message):
+            pass
+
+        async def _send_notification(self, message):
+            pass
+
+        def _broadcast_portfolio_sync(self):
+            pass
+
+        async def _broadcast_holdings_update(self):
+            pass
+
+    return BacktestStrategy
+
+
+def replay(ticks: Ticks, params: Dict = None, mode: str = "trailing",
+           cash: float = 10_000_000, initial_qty: int = 100) -> Dict:
+    """전략 판단 코드로 틱 재생 (종목별 initial_qty주를 첫 가격에 보유한 상태에서 시작)"""
+    logging.getLogger("backend.services.simple_deep_buy").setLevel(logging.WARNING)
+    codes = sorted(ticks)
+    ts = np.concatenate([ticks[c][0] for c in codes])
+    prices = np.concatenate([ticks[c][1] for c in codes])
+    code_idx = np.concatenate([np.full(len(ticks[c][0]), i) for i, c in enumerate(codes)])
+    order = np.argsort(ts, kind="stable")
+    ts, prices, code_idx = ts[order], prices[order], code_idx[order]
+
+    broker = BacktestBroker(cash, {c: (initial_qty, float(ticks[c][1][0])) for c in codes})
+    now = [float(ts[0])]
+    strategy = _strategy_class()(broker, clock=lambda: now[0])
+    for name, value in (params or {}).items():
+        setattr(strategy, name, value)
+    strategy.SELL_COOLDOWN_SEC = strategy.CHECK_INTERVAL * 60
+    strategy._sell_mode = mode
+    strategy._compile_tick_records()
+
+    initial = broker.equity()
+    defaults = strategy_defaults()
+    slots = cycle_slots(ts[0], ts[-1], strategy.CHECK_INTERVAL * 60,
+                        defaults["MARKET_OPEN"], defaults["MARKET_CLOSE"])
+    curve: List[float] = []
+    next_slot = 0
+    loop = asyncio.new_event_loop()
+    try:
+        for t, p, i in zip(ts.tolist(), prices.tolist(), code_idx.tolist()):
+            while next_slot < len(slots) and t >= slots[next_slot]:
+                now[0] = float(slots[next_slot])
+                loop.run_until_complete(strategy._scheduled_cycle(datetime.fromtimestamp(now[0])))
+                curve.append(broker.equity())
+                next_slot += 1
+            now[0] = t
+            broker.set_price(codes[i], p)
+            strategy._evaluate_tick(codes[i], p)
+    finally:
+        loop.close()
+
+    buys = sum(1 for tx in strategy.ledger if tx["type"] == "BUY")
+    result = _summarize(initial, broker.equity(), curve, broker.traded, buys, len(strategy.ledger) - buys)
+    result["params"] = dict(params or {})
+    return result
+
+
+# === vector 엔진: 파라미터 조합 K개를 배열로 동시 계산 ===
+def _calc_qty(holding: np.ndarray, pct: np.ndarray, is_sell: bool) -> np.ndarray:
+    """SimpleDeepBuyStrategy._calc_quantity 벡터판"""
+    ratio = np.minimum(0.3, np.maximum(0.1, np.abs(pct * 100) * 0.1))
+    qty = np.maximum(1, np.round(holding * ratio)).astype(np.int64)
+    if is_sell:
+        qty = np.where(holding <= 30, 1, qty)
+    return qty
+
+
+class VectorBook:
+    """단일 종목 × 파라미터 K개 상태 배열 (틱/사이클 단위 증분 갱신)
+
+    오프라인 sweep과 실시간 섀도 평가(SimpleDeepBuyStrategy 섀도 모드)가 같은 규칙을 쓴다.
+    grid 값은 모두 길이 K 배열 (SWEEP_PARAMS).
+    """
+
+    def __init__(self, grid: Dict[str, np.ndarray], price: float, qty: int, cash: float,
+                 mode: str = "trailing", cooldown_sec: float = 600, min_hold: int = 0,
+                 avg_price: float = None, last_sell: float = 0.0, last_buy: float = 0.0):
+        k = len(next(iter(grid.values())))
+        self.k = k
+        self.mode = mode
+        self.cooldown_sec = cooldown_sec
+        self.min_hold = max(0, min_hold)
+        self.bd, self.bds = grid["BUY_DROP_PCT"], grid["BUY_DROP_PCT_SELL_REF"]
+        self.trigger = grid["TRAILING_TRIGGER"]
+        self.start, self.step = grid["TRAILING_SELL_START"], grid["TRAILING_SELL_STEP"]
+        self.rise = grid["SELL_RISE_PCT"]
+
+        self.initial = float(cash) + qty * float(price)
+        self.price = float(price)
+        self.qty = np.full(k, qty, dtype=np.int64)
+        self.avg = np.full(k, float(avg_price or price))
+        self.cash = np.full(k, float(cash))
+        self.last_sell = np.full(k, float(last_sell or 0))
+        self.last_buy = np.full(k, float(last_buy or 0))
+        self.last_sell_t = np.full(k, -np.inf)
+        self.block = np.zeros(k, dtype=np.int64)
+        self.active = np.zeros(k, dtype=bool)
+        self.peak = np.zeros(k)
+        self.level = np.zeros(k, dtype=np.int64)
+        self.traded = np.zeros(k)
+        self.buys = np.zeros(k, dtype=np.int64)
+        self.sells = np.zeros(k, dtype=np.int64)
+
+    def equity(self, price: float = None) -> np.ndarray:
+        return self.cash + self.qty * (self.price if price is None else price)
+
+    def _should_buy(self, p: float, tick: bool) -> np.ndarray:
+        avg, last_sell, last_buy = self.avg, self.last_sell, self.last_buy
+        has_sell = last_sell > 0
+        ref = np.where(has_sell, last_sell, avg)
+        ok = (ref - p) / ref >= np.where(has_sell, self.bds, self.bd)
+        ok &= ~(has_sell & (p > avg) & ((p - avg) / avg <= 0.002))
+        lb_block = (last_buy > 0) & (p >= last_buy) & (np.abs(avg - last_buy) / avg <= 0.015)
+        if not tick:
+            lb_block &= ~has_sell  # 사이클은 평단가 기준일 때만 직전매수 블록
+        return ok & ~lb_block & (self.qty > 0)
+
+    def _sell(self, mask: np.ndarray, sq: np.ndarray, p: float) -> np.ndarray:
+        qty = self.qty
+        mask = mask & (qty > 0)
+        if self.min_hold:
+            room = qty - self.min_hold
+            mask = mask & (room > 0)
+            sq = np.minimum(sq, room)
+        sq = np.where(mask, np.minimum(sq, qty), 0)
+        qty -= sq
+        self.cash += sq * p * (1 - SELL_TAX)
+        self.traded += sq * p
+        self.sells += mask
+        self.last_sell[:] = np.where(mask, p, self.last_sell)
+        return mask
+
+    def _trailing_sell(self, mask: np.ndarray, p: float):
+        peak = self.peak
+        drop = (peak - p) / np.where(peak > 0, peak, 1.0)
+        cur_level = np.floor(drop / self.step).astype(np.int64)
+        cand = mask & (peak > 0) & (drop >= self.start) & (cur_level > self.level)
+        cand &= (p - self.avg) / self.avg >= 0.005
+        sq = np.maximum(1, np.round(self.qty * np.minimum(0.3, drop * 10))).astype(np.int64)
+        self._sell(cand, sq, p)
+        self.level[:] = np.where(cand, cur_level, self.level)
+
+    def tick(self, p: float):
+        """실시간 틱 (trailing 모드만 동작)"""
+        self.price = p
+        if self.mode != "trailing":
+            return
+        active, peak, level = self.active, self.peak, self.level
+        trig = p >= self.avg * (1 + self.trigger)
+        new = trig & ~active
+        higher = trig & active & (p > peak)
+        hold = trig & active & ~higher
+        reset = new | higher
+        active |= new
+        peak[:] = np.where(reset, p, peak)
+        level[:] = np.where(reset, 0, level)
+        if hold.any():
+            self._trailing_sell(hold & ~self._should_buy(p, tick=True), p)
+        off = ~trig & active & (p < self.avg * 1.005)
+        active &= ~off
+        peak[:] = np.where(off, 0, peak)
+        level[:] = np.where(off, 0, level)
+
+    def cycle(self, now: float, p: float = None):
+        """정시 사이클 (매수 + fixed 매도 / trailing 백업 체크)"""
+        p = self.price if p is None else p
+        qty, avg = self.qty, self.avg
+        sb = self._should_buy(p, tick=False)
+        profit = (p - avg) / avg
+        no_buy = (qty > 0) & ~sb & (now - self.last_sell_t >= self.cooldown_sec)
+        if self.mode == "trailing":
+            self._trailing_sell(no_buy & self.active, p)
+        else:
+            block = self.block
+            cand = no_buy & (profit >= self.rise)
+            blocked = cand & (self.last_sell > 0) & (p <= self.last_sell)
+            block[:] = np.where(blocked, block + 1, block)
+            release = blocked & (block >= 3)
+            self.last_sell[:] = np.where(release, 0, self.last_sell)
+            block[:] = np.where(release, 0, block)
+            done = self._sell(cand & (~blocked | release), _calc_qty(qty, profit, is_sell=True), p)
+            block[:] = np.where(done, 0, block)
+            self.last_sell_t[:] = np.where(done, now, self.last_sell_t)
+
+        # 매수 (평단가 대비 낙폭 비례, 수익 중이면 50%, 자금 부족 시 1주)
+        bq = _calc_qty(qty, np.maximum(0, (avg - p) / avg), is_sell=False)
+        bq = np.where(p > avg, np.maximum(1, np.round(bq * 0.5)).astype(np.int64), bq)
+        full = sb & (self.cash >= p * bq * 1.001)
+        one = sb & ~full & (bq > 1) & (self.cash >= p * 1.001)
+        q = np.where(full, bq, np.where(one, 1, 0))
+        bought = q > 0
+        value = q * p
+        avg[:] = np.where(bought, (avg * qty + value) / np.maximum(qty + q, 1), avg)
+        qty += q
+        self.cash -= value * (1 + BUY_FEE)
+        self.traded += value
+        self.buys += bought
+        self.last_buy[:] = np.where(bought, p, self.last_buy)
+
+
+def simulate_symbol(code: str, ts: np.ndarray, prices: np.ndarray, grid: Dict[str, np.ndarray],
+                    slots: np.ndarray, mode: str, cash: float, initial_qty: int,
+                    cooldown_sec: float, min_hold: int) -> Dict:
+    """단일 종목, 파라미터 K개 동시 시뮬레이션"""
+    book = VectorBook(grid, float(prices[0]), initial_qty, cash, mode, cooldown_sec, min_hold)
+    curve = np.empty((len(slots), book.k))
+    slot_i = 0
+    first_t = float(ts[0])
+    for t, p in zip(ts.tolist(), prices.tolist()):
+        while slot_i < len(slots) and t >= slots[slot_i]:
+            if slots[slot_i] >= first_t:
+                book.cycle(slots[slot_i])
+            curve[slot_i] = book.equity()
+            slot_i += 1
+        book.tick(p)
+    final = book.equity()
+    curve[slot_i:] = final
+    return {
+        "code": code,
+        "initial": book.initial,
+        "final": final,
+        "curve": curve,
+        "traded": book.traded,
+        "buys": book.buys,
+        "sells": book.sells,
+    }
+
+
+def expand_grid(grid: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    names = [n for n in SWEEP_PARAMS if n in grid]
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError("스윕 불가 파라미터: %s" % ", ".join(sorted(unknown)))
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def sweep(ticks: Ticks, grid: Dict[str, List[float]], mode: str = "trailing", engine: str = "vector",
+          processes: int = None, cash: float = 10_000_000, initial_qty: int = 100) -> List[Dict]:
+    """파라미터 그리드 평가 (pnl 내림차순)
+
+    vector: 현금은 종목 수로 균등 배분해 종목별 독립 계산 후 합산
+    exact : 조합마다 replay() 실행 (프로세스 병렬)
+    """
+    combos = expand_grid(grid)
+    defaults = strategy_defaults()
+    processes = processes or os.cpu_count() or 1
+
+    if engine == "exact":
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(replay, ticks, combo, mode, cash, initial_qty) for combo in combos]
+            results = [f.result() for f in futures]
+        return sorted(results, key=lambda r: r["pnl"], reverse=True)
+
+    arrays = {name: np.asarray([c.get(name, defaults[name]) for c in combos], dtype=np.float64)
+              for name in SWEEP_PARAMS}
+    start = min(float(t[0]) for t, _ in ticks.values())
+    end = max(float(t[-1]) for t, _ in ticks.values())
+    interval = defaults["CHECK_INTERVAL"] * 60
+    slots = cycle_slots(start, end, interval, defaults["MARKET_OPEN"], defaults["MARKET_CLOSE"])
+    per_symbol_cash = cash / len(ticks)
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(simulate_symbol, code, t, p, arrays, slots, mode, per_symbol_cash, initial_qty,
+                        interval, defaults["SAMSUNG_MIN_HOLD_QTY"] if code in defaults["SAMSUNG_CODES"] else 0)
+            for code, (t, p) in ticks.items()
+        ]
+        parts = [f.result() for f in futures]
+
+    initial = sum(part["initial"] for part in parts)
+    final = sum(part["final"] for part in parts)
+    curve = sum(part["curve"] for part in parts)
+    traded = sum(part["traded"] for part in parts)
+    buys = sum(part["buys"] for part in parts)
+    sells = sum(part["sells"] for part in parts)
+
+    results = []
+    for i, combo in enumerate(combos):
+        result = _summarize(initial, float(final[i]), curve[:, i].tolist(), float(traded[i]),
+                            int(buys[i]), int(sells[i]))
+        result["params"] = combo
+        results.append(result)
+    return sorted(results, key=lambda r: r["pnl"], reverse=True)
+
+
+def _parse_grid(items: List[str]) -> Dict[str, List[float]]:
+    grid = {}
+    for item in items or []:
+        name, _, values = item.partition("=")
+        grid[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="딥바이 전략 오프라인 백테스트")
+    parser.add_argument("data", nargs="+", help="틱 CSV 파일 (ts,code,price[,volume]) 또는 세그먼트 디렉토리")
+    parser.add_argument("--grid", action="append", metavar="NAME=v1,v2", help="스윕 파라미터 (반복 지정)")
+    parser.add_argument("--mode", choices=("trailing", "fixed"), default="trailing")
+    parser.add_argument("--engine", choices=("vector", "exact"), default="vector")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cash", type=float, default=10_000_000)
+    parser.add_argument("--qty", type=int, default=100, help="종목별 초기 보유수량")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", help="전체 결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ticks = load_ticks(args.data)
+    if not ticks:
+        parser.error("틱 데이터 없음")
+    logger.info("틱 로드: %d종목, %d건", len(ticks), sum(len(t) for t, _ in ticks.values()))
+
+    results = sweep(ticks, _parse_grid(args.grid), mode=args.mode, engine=args.engine,
+                    processes=args.processes, cash=args.cash, initial_qty=args.qty)
+
+    for r in results[:args.top]:
+        params = " ".join("%s=%g" % kv for kv in r["params"].items()) or "(기본값)"
+        print("%+12s원 %+7.2f%%  MDD %5.2f%%  회전율 %5.2f  매수 %4d 매도 %4d  %s" % (
+            format(int(r["pnl"]), ","), r["return_pct"], r["max_drawdown_pct"],
+            r["turnover"], r["buys"], r["sells"], params))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
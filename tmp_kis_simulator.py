@@ -0,0 +1,418 @@
+"""
+KIS 브로커 인터페이스 + 결정적 로컬 시뮬레이터
+
+전략(SimpleDeepBuyStrategy), RealAccountService가 쓰는 KIS 호출을 BrokerAPI로 정리하고,
+같은 인터페이스를 가격 경로 위에서 흉내 내는 KisSimulator를 제공한다.
+  - 주문은 지연(latency_ms ± jitter_ms) 후 그 시점 가격에 슬리피지를 얹어 체결
+  - 매도가능수량/주문가능금액은 미체결 주문만큼 차감 (KIS와 같은 거부 메시지)
+  - 시계는 재생 중인 틱 시각(SimClock) → 같은 주문열·seed면 같은 체결 (브로커는 결정적)
+    전략 스레드(메일박스/주문 파이프라인) 타이밍은 실제처럼 비결정적 → 경합 재현·처리량 측정용
+
+오프라인 부하 테스트 (전략 전체 스택: 틱 메일박스, 주문 파이프라인, 저널):
+  python -m backend.services.kis_simulator ticks.csv --speed 100 --latency-ms 80 --slippage-bps 5
+  (틱: CSV ts,code,price[,volume] 또는 틱 레코더 일자 세그먼트 디렉터리)
+"""
+
+import argparse
+import asyncio
+import csv
+import heapq
+import json
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUY_FEE = 0.00015   # 매수 수수료
+SELL_TAX = 0.0018   # 매도 수수료 + 거래세
+
+Tick = Tuple[float, str, float]  # (ts, code, price)
+
+
+class BrokerAPI(ABC):
+    """KIS API 중 매매 스택이 쓰는 부분 (kis_api_service와 같은 이름·반환 형식)
+
+    추상 메서드를 다 구현하지 않은 브로커는 생성 시점에 TypeError
+    """
+
+    @abstractmethod
+    def get_account_balance(self) -> Optional[Dict]:
+        """{"holdings": [{stock_code, stock_name, quantity, avg_price}], "orderable_cash", "total_asset"}"""
+
+    @abstractmethod
+    def get_holdings(self) -> Optional[List[Dict]]:
+        """[{stock_code, stock_name, quantity, average_price, total_cost, current_price}]"""
+
+    @abstractmethod
+    def get_stock_quote(self, code: str) -> Optional[Dict]:
+        """{current_price, execution_strength, buy_volume, sell_volume}"""
+
+    @abstractmethod
+    def send_order(self, code: str, qty: int, price: float, side: str, order_type: str) -> Optional[Dict]:
+        """side: "1" 매도, "2" 매수 / price 0 = 시장가. Returns: {"order_no"} (거부 시 예외)"""
+
+    @abstractmethod
+    def get_transactions(self) -> Optional[List[Dict]]:
+        """[{id(주문번호), stock_code, stock_name, type, quantity, price, total_amount, tax, commission,
+        transaction_date("%Y%m%d %H%M%S")}]"""
+
+    def broadcast_portfolio_update(self):
+        pass
+
+
+class SimClock:
+    """재생 시각 (epoch 초). 피드가 advance()로만 전진"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, ts: float):
+        if ts > self._now:
+            self._now = float(ts)
+
+
+class KisSimulator(BrokerAPI):
+    """가격 경로 기반 KIS 시뮬레이터 (스레드 안전, seed 고정 시 결정적)"""
+
+    def __init__(self, cash: float, positions: Dict[str, Tuple[int, float]] = None,
+                 names: Dict[str, str] = None, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 slippage_bps: float = 0.0, seed: int = 0, clock: SimClock = None):
+        self.cash = float(cash)
+        self.positions = {code: [int(q), float(p)] for code, (q, p) in (positions or {}).items()}
+        self.names = names or {}
+        self.prices: Dict[str, float] = {code: p for code, (_, p) in (positions or {}).items()}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slippage_bps = slippage_bps
+        self.clock = clock or SimClock()
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._pending: List[tuple] = []  # heap (체결 시각, 주문번호, 주문)
+        self._order_no = 0
+        self.fills: List[Dict] = []
+        self.traded = 0.0
+        self.orders = 0
+        self.rejects: Dict[str, int] = {}
+        self.cancelled = 0
+
+    # === 가격 경로 ===
+    def set_price(self, code: str, price: float, ts: float = None):
+        """틱 반영 (ts가 있으면 시계 전진 → 도래한 주문 체결)"""
+        with self._lock:
+            if ts is not None:
+                self.clock.advance(ts)
+            self.prices[code] = price
+            self._settle()
+
+    def advance(self, ts: float):
+        with self._lock:
+            self.clock.advance(ts)
+            self._settle()
+
+    def equity(self) -> float:
+        with self._lock:
+            return self.cash + sum(q * self.prices.get(code, p) for code, (q, p) in self.positions.items())
+
+    # === BrokerAPI ===
+    def get_account_balance(self) -> Dict:
+        with self._lock:
+            self._settle()
+            holdings = [
+                {"stock_code": code, "stock_name": self.names.get(code, code), "quantity": q, "avg_price": p}
+                for code, (q, p) in self.positions.items() if q > 0
+            ]
+            return {"holdings": holdings, "orderable_cash": self._orderable_cash(), "total_asset": self.equity()}
+
+    def get_holdings(self) -> List[Dict]:
+        with self._lock:
+            self._settle()
+            return [
+                {"stock_code": code, "stock_name": self.names.get(code, code), "quantity": q,
+                 "average_price": p, "total_cost": q * p, "current_price": self.prices.get(code, p)}
+                for code, (q, p) in self.positions.items() if q > 0
+            ]
+
+    def get_stock_quote(self, code: str) -> Optional[Dict]:
+        price = self.prices.get(code)
+        if not price:
+            return None
+        return {"current_price": price, "execution_strength": 0, "buy_volume": 0, "sell_volume": 0}
+
+    def send_order(self, code: str, qty: int, price: float, side: str, order_type: str) -> Dict:
+        with self._lock:
+            self._settle()
+            self.orders += 1
+            market = self.prices.get(code)
+            if not market:
+                self._reject("no_price", "시세 없음")
+            if side == "1":
+                if qty > self._sellable(code):
+                    self._reject("sell_qty", "매도가능수량을 초과했습니다")
+            elif (price or market) * qty * (1 + BUY_FEE) > self._orderable_cash():
+                self._reject("cash", "주문가능금액을 초과했습니다")
+
+            self._order_no += 1
+            order = {"order_no": str(self._order_no), "code": code, "qty": int(qty), "price": float(price or 0),
+                     "side": side, "order_type": order_type, "sent_at": self.clock.time()}
+            delay = max(0.0, self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+                                                 if self.jitter_ms else 0.0)) / 1000
+            heapq.heappush(self._pending, (order["sent_at"] + delay, self._order_no, order))
+            if delay <= 0:
+                self._settle()
+            return {"order_no": order["order_no"]}
+
+    def get_transactions(self) -> List[Dict]:
+        with self._lock:
+            self._settle()
+            return list(self.fills)
+
+    # === 내부 ===
+    def _reject(self, reason: str, message: str):
+        self.rejects[reason] = self.rejects.get(reason, 0) + 1
+        raise Exception(message)
+
+    def _pending_orders(self, side: str, code: str = None) -> Iterable[Dict]:
+        return (o for _, _, o in self._pending if o["side"] == side and (code is None or o["code"] == code))
+
+    def _sellable(self, code: str) -> int:
+        held = self.positions.get(code, [0, 0.0])[0]
+        return held - sum(o["qty"] for o in self._pending_orders("1", code))
+
+    def _orderable_cash(self) -> float:
+        reserved = sum((o["price"] or self.prices.get(o["code"], 0)) * o["qty"] * (1 + BUY_FEE)
+                       for o in self._pending_orders("2"))
+        return self.cash - reserved
+
+    def _settle(self):
+        """체결 시각이 도래한 주문 체결 (호출측이 락 보유)"""
+        now = self.clock.time()
+        while self._pending and self._pending[0][0] <= now:
+            _, _, order = heapq.heappop(self._pending)
+            self._fill(order)
+
+    def _fill(self, order: Dict):
+        code, qty, side = order["code"], order["qty"], order["side"]
+        slip = self.slippage_bps / 10_000
+        market = self.prices[code]
+        fill_price = market * (1 + slip) if side == "2" else market * (1 - slip)
+        # 지정가: 불리한 방향으로 넘어가면 미체결 취소 (IOC 취급)
+        if order["price"] > 0:
+            if (side == "2" and fill_price > order["price"]) or (side == "1" and fill_price < order["price"]):
+                self.cancelled += 1
+                return
+        value = fill_price * qty
+        pos = self.positions.setdefault(code, [0, fill_price])
+        if side == "2":
+            commission, tax = value * BUY_FEE, 0.0
+            pos[1] = (pos[0] * pos[1] + value) / (pos[0] + qty)
+            pos[0] += qty
+            self.cash -= value + commission
+        else:
+            commission, tax = 0.0, value * SELL_TAX
+            pos[0] -= qty
+            self.cash += value - tax
+        self.traded += value
+        self.fills.append({
+            "id": order["order_no"], "stock_code": code, "stock_name": self.names.get(code, code),
+            "type": "BUY" if side == "2" else "SELL", "side": side, "quantity": qty, "price": fill_price,
+            "total_amount": value, "tax": tax, "commission": commission,
+            "transaction_date": datetime.fromtimestamp(self.clock.time()).strftime("%Y%m%d %H%M%S"),
+        })
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "orders": self.orders,
+                "fills": len(self.fills),
+                "pending": len(self._pending),
+                "cancelled": self.cancelled,
+                "rejects": dict(self.rejects),
+                "traded": round(self.traded),
+                "equity": round(self.equity()),
+            }
+
+
+# === 틱 로드 / 재생 ===
+def load_path(paths: List[str]) -> List[Tick]:
+    """CSV(ts,code,price[,volume]) 또는 틱 레코더 세그먼트 → 시각순 (ts, code, price)"""
+    ticks: List[Tick] = []
+    for path in paths:
+        if os.path.isdir(path):
+            from backend.services.tick_recorder import TickSegment
+            with TickSegment(path) as seg:
+                ticks.extend((ts, code, price) for ts, code, price, _ in seg.iter_ticks())
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row or row[0] == "ts":
+                    continue
+                ts = row[0]
+                try:
+                    ts = float(ts)
+                except ValueError:
+                    ts = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").timestamp()
+                ticks.append((ts, row[1].zfill(6), float(row[2])))
+    ticks.sort(key=lambda t: t[0])
+    return ticks
+
+
+def run_feed(sim: KisSimulator, ticks: List[Tick], on_tick: Callable[[str, float], None],
+             speed: float = 100.0, on_time: Callable[[float], None] = None) -> Dict:
+    """
+    틱을 시뮬레이터 시계·가격에 반영하고 on_tick(code, price) 호출 (speed배속, 0 이하면 대기 없이)
+    on_time(ts): 틱 직전마다 호출 (사이클 슬롯 구동 등)
+    Returns: 처리량·지연 통계
+    """
+    started = time.monotonic()
+    first_ts = ticks[0][0] if ticks else 0.0
+    max_lag = 0.0
+    for ts, code, price in ticks:
+        if speed > 0:
+            delay = (ts - first_ts) / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+        if on_time:
+            on_time(ts)
+        sim.set_price(code, price, ts)
+        on_tick(code, price)
+    wall = time.monotonic() - started
+    return {
+        "ticks": len(ticks),
+        "wall_sec": round(wall, 3),
+        "ticks_per_sec": round(len(ticks) / wall, 1) if wall > 0 else None,
+        "sim_sec": round(ticks[-1][0] - first_ts, 1) if ticks else 0,
+        "max_lag_ms": round(max_lag * 1000, 1),
+    }
+
+
+class _NullNotifier:
+    @staticmethod
+    async def send_message(message: str):
+        pass
+
+
+def _no_db():
+    raise RuntimeError("시뮬레이터: DB 미사용")
+
+
+class RealAccountStub:
+    """부하 테스트용: 보유 diff 구독을 받기만 하는 RealAccountService 대용"""
+
+    @staticmethod
+    def broker():
+        return None
+
+    @staticmethod
+    def subscribe_holdings(callback):
+        pass
+
+    @staticmethod
+    def unsubscribe_holdings(callback):
+        pass
+
+
+def load_test(ticks: List[Tick], speed: float = 100.0, cash: float = 10_000_000, initial_qty: int = 100,
+              latency_ms: float = 50.0, jitter_ms: float = 0.0, slippage_bps: float = 0.0,
+              seed: int = 0, mode: str = "trailing", drain_sec: float = 5.0) -> Dict:
+    """
+    실제 전략 스택(틱 메일박스 워커, 주문 파이프라인, 저널)을 시뮬레이터에 연결해 틱 재생
+    사이클은 재생 시각 기준 CHECK_INTERVAL 슬롯마다 피드 스레드에서 실행
+    """
+    from backend.services.simple_deep_buy import DEEP_BUY_DATA_DIR, SimpleDeepBuyStrategy, _Services
+
+    class _SimStrategy(SimpleDeepBuyStrategy):
+        """DB 접근(대상 종목 로드, 저널 커밋)만 끈 전략 - 주문·틱 경로는 그대로"""
+
+        def load_all_targets_from_db(self):
+            pass
+
+        def _commit_journal_batch(self, entries):
+            return 0
+
+    first = {}
+    for _, code, price in ticks:
+        first.setdefault(code, price)
+    clock = SimClock(ticks[0][0] if ticks else time.time())
+    sim = KisSimulator(cash, {c: (initial_qty, p) for c, p in first.items()}, latency_ms=latency_ms,
+                       jitter_ms=jitter_ms, slippage_bps=slippage_bps, seed=seed, clock=clock)
+    services = _Services(kis=sim, session_factory=_no_db, notifier=_NullNotifier,
+                         real_account=RealAccountStub)
+    # 이전 실행의 저널/상태 복원 방지 (같은 seed면 같은 결과)
+    name = "sim-%d" % seed
+    shutil.rmtree(os.path.join(DEEP_BUY_DATA_DIR, name), ignore_errors=True)
+    strategy = _SimStrategy(services=services, name=name)
+    strategy._clock = clock.time
+    strategy.kis = sim
+    strategy._sell_mode = mode
+    strategy.update_holdings_cache()
+    strategy._tick_mailbox.start()
+    strategy._orders.start()
+    strategy._notifier.start()
+
+    interval = strategy.CHECK_INTERVAL * 60
+    next_cycle = [(int(clock.time()) // interval + 1) * interval]
+    loop = asyncio.new_event_loop()
+
+    def on_time(ts: float):
+        while ts >= next_cycle[0]:
+            clock.advance(next_cycle[0])
+            loop.run_until_complete(strategy._run_cycle(datetime.fromtimestamp(next_cycle[0])))
+            next_cycle[0] += interval
+
+    try:
+        feed = run_feed(sim, ticks, strategy.on_realtime_price, speed, on_time)
+        deadline = time.monotonic() + drain_sec
+        while time.monotonic() < deadline:
+            orders = strategy._orders.get_stats()
+            if not orders["queued"] and not orders["inflight"]:
+                break
+            sim.advance(clock.time() + 1)
+            time.sleep(0.05)
+    finally:
+        loop.close()
+        strategy.stop()
+
+    return {
+        "feed": feed,
+        "broker": sim.get_stats(),
+        "orders": {k: v for k, v in strategy._orders.get_stats().items() if k not in ("inflight", "recent")},
+        "tick_mailbox": strategy._tick_mailbox.get_stats(),
+        "metrics": strategy._metrics.summary(),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="KIS 시뮬레이터 부하 테스트")
+    parser.add_argument("paths", nargs="+", help="틱 CSV 파일 또는 틱 레코더 일자 디렉터리")
+    parser.add_argument("--speed", type=float, default=100.0, help="재생 배속 (0 = 대기 없이)")
+    parser.add_argument("--cash", type=float, default=10_000_000)
+    parser.add_argument("--qty", type=int, default=100, help="종목별 초기 보유 수량")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", default="trailing", choices=("trailing", "fixed"))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+    ticks = load_path(args.paths)
+    result = load_test(ticks, speed=args.speed, cash=args.cash, initial_qty=args.qty,
+                       latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                       slippage_bps=args.slippage_bps, seed=args.seed, mode=args.mode)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """
 실전투자 계좌 서비스 (API <-> DB 동기화)
 """
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from backend.models.portfolio import Portfolio
@@ -10,6 +10,8 @@ from backend.models.transaction import Transaction
 from backend.services.kis_api_service import kis_api_service
 from backend.config.trading_config import TradingConfig
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,27 @@ class RealAccountService:
 
     REAL_PORTFOLIO_NAME = "실전투자 계좌"
 
+    # 브로커 (None이면 kis_api_service, 부하 테스트 시 kis_simulator.KisSimulator 주입)
+    _broker = None
+
+    # 거래 동기화 하이워터마크 (portfolio_id -> 마지막 반영 체결 시각)
+    _tx_watermark: Dict[int, Optional[datetime]] = {}
+
+    # 보유 종목 대조 상태 (portfolio_id -> (API 스냅샷 해시, 대조 시각, 유예 종목 존재))
+    HOLDINGS_RESYNC_SEC = 60  # 해시가 같아도 이 간격마다 DB와 재대조 (외부 변경 대비)
+    _holdings_snapshot: Dict[int, tuple] = {}
+    _holdings_lock = threading.Lock()
+    _holdings_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @staticmethod
+    def broker():
+        return RealAccountService._broker or kis_api_service
+
+    @staticmethod
+    def use_broker(broker):
+        """KIS 대신 쓸 BrokerAPI 구현 지정 (None이면 kis_api_service로 복귀)"""
+        RealAccountService._broker = broker
+
     @staticmethod
     def get_or_create_real_portfolio(db: Session) -> Portfolio:
         """
@@ -42,161 +65,330 @@ class RealAccountService:
 
         return portfolio
 
+    @staticmethod
+    def subscribe_holdings(callback: Callable[[Dict[str, Any]], None]):
+        """보유 종목 변경(diff) 이벤트 구독 - sync_holdings가 실제로 DB를 바꾼 경우에만 호출됨"""
+        if callback not in RealAccountService._holdings_listeners:
+            RealAccountService._holdings_listeners.append(callback)
+
+    @staticmethod
+    def unsubscribe_holdings(callback: Callable[[Dict[str, Any]], None]):
+        """보유 종목 diff 이벤트 구독 해제"""
+        if callback in RealAccountService._holdings_listeners:
+            RealAccountService._holdings_listeners.remove(callback)
+
+    @staticmethod
+    def invalidate_holdings_snapshot(portfolio_id: Optional[int] = None):
+        """다음 sync_holdings에서 스냅샷 해시와 무관하게 대조하도록 (DB를 직접 바꾼 경우)"""
+        with RealAccountService._holdings_lock:
+            if portfolio_id is None:
+                RealAccountService._holdings_snapshot.clear()
+            else:
+                RealAccountService._holdings_snapshot.pop(portfolio_id, None)
+
+    @staticmethod
+    def _holdings_hash(api_holdings: List[Dict[str, Any]]) -> int:
+        """대조에 쓰이는 필드만으로 API 스냅샷 해시"""
+        return hash(tuple(sorted(
+            (h["stock_code"], h["quantity"], round(float(h["average_price"]), 2),
+             round(float(h["total_cost"]), 2), h["stock_name"])
+            for h in api_holdings
+        )))
+
+    @staticmethod
+    def _diff_holdings(api_map: Dict[str, Dict[str, Any]], db_rows: list, now: datetime) -> Dict[str, Any]:
+        """
+        API 스냅샷과 DB 보유 종목의 집합 단위 diff
+        - inserts: API에만 있음 / updates: 수량·평단·매입액 변경 / deletes: DB에만 있음
+        - deferred: DB에만 있지만 매수 10분 이내라 유지 (API 미반영 가능성)
+        """
+        today_str = now.strftime("%Y%m%d")
+        db_codes = {}
+        updates, deletes, deferred = [], [], []
+        upserted: Dict[str, Dict[str, Any]] = {}
+        removed: List[str] = []
+
+        for row_id, stock_code, qty, avg, total, buy_date in db_rows:
+            db_codes[stock_code] = row_id
+            api_h = api_map.get(stock_code)
+
+            if api_h:
+                # 기존 종목: 수량이나 평단가가 변경되었는지 확인
+                if ((qty or 0) != api_h["quantity"] or
+                    abs((avg or 0) - api_h["average_price"]) > 1 or
+                    abs((total or 0) - api_h["total_cost"]) > 1):
+                    updates.append({
+                        "id": row_id,
+                        "quantity": api_h["quantity"],
+                        "avg_price": api_h["average_price"],
+                        "total_invested": api_h["total_cost"],  # 매입금액 업데이트
+                        "stock_name": api_h["stock_name"],
+                        "updated_at": now,
+                    })
+                    upserted[stock_code] = api_h
+                    logger.info(f"[Sync] {stock_code} 업데이트: Qty={api_h['quantity']}, "
+                                f"Avg={api_h['average_price']}, Total={api_h['total_cost']}")
+                continue
+
+            # API에 없는 종목: 수량이 0 이상인데 API에 없다면 매도된 것
+            if (qty or 0) > 0:
+                # [NEW] 오늘 매수한 종목은 API 미반영 상태일 수 있으므로 삭제 방지 (Safe-guard)
+                # [CHANGE] 당일 매수라도 10분이 지났으면 API 신뢰 (매도했을 수 있음)
+                if (buy_date and buy_date.strftime("%Y%m%d") == today_str and
+                        (now - buy_date).total_seconds() / 60 < 10):
+                    logger.info(f"[Sync] {stock_code} API 미발견 + 매수 10분 내 -> 유지")
+                    deferred.append(stock_code)
+                    continue
+                logger.info(f"[Sync] {stock_code} 전량 매도 감지(또는 10분 경과) -> 삭제")
+            else:
+                # 수량이 0 이하고 API에도 없으면 삭제 (Clean up)
+                logger.info(f"[Sync] {stock_code} 수량 0 & API 미발견 -> 삭제 (Cleanup)")
+            deletes.append(row_id)
+            removed.append(stock_code)
+
+        inserts = []
+        for stock_code, api_h in api_map.items():
+            if stock_code in db_codes:
+                continue
+            inserts.append({
+                "stock_code": stock_code,
+                "stock_name": api_h["stock_name"],
+                "quantity": api_h["quantity"],
+                "avg_price": api_h["average_price"],
+                "total_invested": api_h["total_cost"],  # 매입금액 저장
+                "highest_price": api_h["current_price"],  # 초기 최고가는 현재가
+                "buy_date": now,
+                "created_at": now,
+                "updated_at": now,
+            })
+            upserted[stock_code] = api_h
+            logger.info(f"[Sync] {stock_code} 신규 추가 (매입액: {api_h['total_cost']})")
+
+        return {
+            "inserts": inserts, "updates": updates, "deletes": deletes,
+            "deferred": deferred, "upserted": upserted, "removed": removed,
+        }
+
     @staticmethod
     def sync_holdings(db: Session, portfolio_id: int) -> List[Dict[str, Any]]:
         """
-        API 보유 종목을 DB와 동기화
+        API 보유 종목을 DB와 동기화 (diff 기반 일괄 반영)
+        - API 스냅샷 해시가 직전 대조 때와 같으면 DB 접근 생략
+          (매수 10분 유예 종목이 있거나 HOLDINGS_RESYNC_SEC 경과 시에는 다시 대조)
         - API에 있는 종목: DB에 없으면 추가, 있으면 업데이트 (수량, 평단 등)
         - API에 없는 종목: DB에서 삭제 (전량 매도 처리된 것으로 간주)
+        - insert/update/delete를 한 트랜잭션에서 bulk로 반영 후 diff 이벤트 발행
         - *중요*: 기존 DB의 highest_price, buy_date 등은 유지
         """
         try:
             # 1. API 보유 종목 조회
-            api_holdings = kis_api_service.get_holdings()
+            api_holdings = RealAccountService.broker().get_holdings()
             
             if api_holdings is None:
                 # [CHANGE] 동기화 실패 시 예외 발생 (기존 데이터 표시 방지)
                 raise Exception("KIS API 보유 종목 조회 실패 (Sync Failed)")
 
-            api_map = {h["stock_code"]: h for h in api_holdings}
-
-            # 2. DB 보유 종목 조회
-            db_holdings = db.query(Holding).filter(
-                Holding.portfolio_id == portfolio_id
-            ).all()
-            db_map = {h.stock_code: h for h in db_holdings}
-
-            # 3. 동기화 로직
-            # 3-1. API에 있는 종목 (Insert or Update)
-            for stock_code, api_h in api_map.items():
-                db_h = db_map.get(stock_code)
-                
-                if db_h:
-                    # 기존 종목 업데이트
-                    # 수량이나 평단가가 변경되었는지 확인
-                    db_qty = db_h.quantity or 0
-                    db_avg = db_h.avg_price or 0
-                    db_total = db_h.total_invested or 0
-                    
-                    if (db_qty != api_h["quantity"] or 
-                        abs(db_avg - api_h["average_price"]) > 1 or
-                        abs(db_total - api_h["total_cost"]) > 1):
-                        
-                        db_h.quantity = api_h["quantity"]
-                        db_h.avg_price = api_h["average_price"]
-                        db_h.total_invested = api_h["total_cost"] # 매입금액 업데이트
-                        db_h.stock_name = api_h["stock_name"]
-                        db_h.updated_at = datetime.now()
-                        
-                        logger.info(f"[Sync] {stock_code} 업데이트: Qty={db_h.quantity}, Avg={db_h.avg_price}, Total={db_h.total_invested}")
-                else:
-                    # 신규 종목 추가
-                    new_h = Holding(
-                        portfolio_id=portfolio_id,
-                        stock_code=stock_code,
-                        stock_name=api_h["stock_name"],
-                        quantity=api_h["quantity"],
-                        avg_price=api_h["average_price"],
-                        total_invested=api_h["total_cost"], # 매입금액 저장
-                        highest_price=api_h["current_price"], # 초기 최고가는 현재가
-                        buy_date=datetime.now(), 
-                        created_at=datetime.now(),
-                        updated_at=datetime.now()
-                    )
-                    db.add(new_h)
-                    logger.info(f"[Sync] {stock_code} 신규 추가 (매입액: {new_h.total_invested})")
-
-            # 3-2. API에 없는 종목 (Delete)
-            # 수량이 0 이상인데 API에 없다면 매도된 것
-            for stock_code, db_h in db_map.items():
-                if stock_code not in api_map:
-                    if db_h.quantity > 0:
-                        # [NEW] 오늘 매수한 종목은 API 미반영 상태일 수 있으므로 삭제 방지 (Safe-guard)
-                        is_bought_today = False
-                        if db_h.buy_date:
-                            today_str = datetime.now().strftime("%Y%m%d")
-                            buy_date_str = db_h.buy_date.strftime("%Y%m%d")
-                            # [CHANGE] 당일 매수라도 10분이 지났으면 API 신뢰 (매도했을 수 있음)
-                            minutes_diff = (datetime.now() - db_h.buy_date).total_seconds() / 60
-                            if today_str == buy_date_str and minutes_diff < 10:
-                                is_bought_today = True
-                        
-                        if is_bought_today:
-                            logger.info(f"[Sync] {stock_code} API 미발견 + 매수 10분 내 -> 유지")
-                        else:
-                            logger.info(f"[Sync] {stock_code} 전량 매도 감지(또는 10분 경과) -> 삭제")
-                            db.delete(db_h)
-                    else:
-                        # 수량이 0 이하고 API에도 없으면 삭제 (Clean up)
-                        logger.info(f"[Sync] {stock_code} 수량 0 & API 미발견 -> 삭제 (Cleanup)")
-                        db.delete(db_h)
+            snapshot = RealAccountService._holdings_hash(api_holdings)
+            mono = time.monotonic()
+
+            with RealAccountService._holdings_lock:
+                last = RealAccountService._holdings_snapshot.get(portfolio_id)
+                if (last and last[0] == snapshot and not last[2] and
+                        mono - last[1] < RealAccountService.HOLDINGS_RESYNC_SEC):
+                    return api_holdings
+
+                api_map = {h["stock_code"]: h for h in api_holdings}
+
+                # 2. DB 보유 종목 조회 (대조에 필요한 컬럼만)
+                db_rows = db.query(
+                    Holding.id, Holding.stock_code, Holding.quantity,
+                    Holding.avg_price, Holding.total_invested, Holding.buy_date
+                ).filter(Holding.portfolio_id == portfolio_id).all()
+
+                # 3. diff 계산 후 한 트랜잭션으로 일괄 반영
+                diff = RealAccountService._diff_holdings(api_map, db_rows, datetime.now())
+                if diff["inserts"]:
+                    for row in diff["inserts"]:
+                        row["portfolio_id"] = portfolio_id
+                    db.bulk_insert_mappings(Holding, diff["inserts"])
+                if diff["updates"]:
+                    db.bulk_update_mappings(Holding, diff["updates"])
+                if diff["deletes"]:
+                    db.query(Holding).filter(
+                        Holding.id.in_(diff["deletes"])
+                    ).delete(synchronize_session=False)
+                db.commit()
+
+                RealAccountService._holdings_snapshot[portfolio_id] = (snapshot, mono, bool(diff["deferred"]))
+
+            # 4. 변경분 이벤트 발행 (구독자는 전체 재조회 대신 증분 반영)
+            if diff["upserted"] or diff["removed"]:
+                RealAccountService._publish_holdings_diff({
+                    "portfolio_id": portfolio_id,
+                    "upserted": diff["upserted"],
+                    "removed": diff["removed"],
+                })
 
-            db.commit()
-            
-            # 4. 최신 DB 데이터 반환 (+현재가 등 API 정보 병합 필요할 수도 있지만, 여기선 Sync만 담당)
             # 데이터 리턴은 별도 조회 로직에서 수행 권장
             return api_holdings
 
         except Exception as e:
             logger.error(f"보유 종목 동기화 실패: {e}")
             db.rollback()
+            RealAccountService.invalidate_holdings_snapshot(portfolio_id)
             return []
 
     @staticmethod
-    def sync_transactions(db: Session, portfolio_id: int):
+    def _publish_holdings_diff(diff: Dict[str, Any]):
+        for callback in list(RealAccountService._holdings_listeners):
+            try:
+                callback(diff)
+            except Exception as e:
+                logger.warning(f"[Sync] 보유 종목 diff 구독자 처리 실패: {e}")
+
+    @staticmethod
+    def _order_memo(ord_no: str) -> str:
+        """주문번호 조회 키 (sync_transactions가 기록하는 memo 형식 그대로)"""
+        return f"주문번호: {ord_no}"
+
+    @classmethod
+    def _get_tx_watermark(cls, db: Session, portfolio_id: int) -> Optional[datetime]:
+        """동기화 하이워터마크 (마지막으로 반영된 체결 시각). 최초 1회만 DB에서 로드"""
+        if portfolio_id not in cls._tx_watermark:
+            from sqlalchemy import func
+            cls._tx_watermark[portfolio_id] = db.query(
+                func.max(Transaction.transaction_date)
+            ).filter(Transaction.portfolio_id == portfolio_id).scalar()
+        return cls._tx_watermark[portfolio_id]
+
+    @staticmethod
+    def _resolve_strategies(db: Session, portfolio_id: int, codes: List[str]) -> Dict[str, str]:
+        """
+        신규 체결 종목들의 strategy를 일괄 조회
+        우선순위: Holding.strategy -> 딥바이 대상 종목 -> 최근 매수 기록 -> "standard"
         """
-        API 체결 내역을 DB에 동기화
-        - 주문번호(ord_no)를 기준으로 중복 방지 (Memo 필드 활용)
+        from sqlalchemy import func
+        from backend.services.samsung_deep_buy_service import SamsungDeepBuyService
+
+        resolved: Dict[str, str] = {}
+
+        # 1. 현재 Holding (1쿼리)
+        for code, strategy in db.query(Holding.stock_code, Holding.strategy).filter(
+            Holding.portfolio_id == portfolio_id,
+            Holding.stock_code.in_(codes)
+        ):
+            if strategy:
+                resolved[code] = strategy
+
+        # 2. 딥바이 대상 종목
+        pending = []
+        for code in codes:
+            if code in resolved:
+                continue
+            if SamsungDeepBuyService.is_target_stock(code):
+                resolved[code] = SamsungDeepBuyService.STRATEGY_NAME
+                logger.info(f"[Sync] 딥바이 종목 감지: {code} → strategy={resolved[code]}")
+            else:
+                pending.append(code)
+
+        # 3. 종목별 최근 매수 기록 (ROW_NUMBER 윈도우, 1쿼리)
+        if pending:
+            ranked = db.query(
+                Transaction.stock_code,
+                Transaction.strategy,
+                func.row_number().over(
+                    partition_by=Transaction.stock_code,
+                    order_by=Transaction.transaction_date.desc(),
+                ).label("rn"),
+            ).filter(
+                Transaction.portfolio_id == portfolio_id,
+                Transaction.stock_code.in_(pending),
+                Transaction.transaction_type == "BUY"
+            ).subquery()
+            for code, strategy in db.query(ranked.c.stock_code, ranked.c.strategy).filter(ranked.c.rn == 1):
+                if strategy:
+                    resolved[code] = strategy
+                    logger.info(f"[Sync] 최근 매수 기록에서 strategy 조회: {code} → strategy={strategy}")
+
+        return resolved
+
+    @classmethod
+    def sync_transactions(cls, db: Session, portfolio_id: int):
+        """
+        API 체결 내역을 DB에 동기화 (증분)
+        - 하이워터마크(마지막 반영 체결 시각)의 당일 이전 체결은 건너뜀 (당일 체결은 누적될 수 있음)
+        - (체결일, 주문번호)를 기준으로 중복 방지: memo "주문번호: N" 정확 일치 + 같은 날 체결만
+          (KIS 주문번호는 매 거래일 새로 시작 → 다른 날의 같은 번호는 별개 주문)
         - 같은 주문번호에 대해 수량/가격이 변경되면 업데이트 (체결 누적)
+        - 신규 체결의 strategy는 배치 단위로 일괄 조회
         """
         try:
             # 1. API 체결 내역 조회 (최근 30일 등)
-            api_txns = kis_api_service.get_transactions()
+            api_txns = RealAccountService.broker().get_transactions()
             if not api_txns:
                 return
 
-            # 2. DB에 이미 있는 내역 조회 (최근 200건)
-            recent_db_txns = db.query(Transaction).filter(
-                Transaction.portfolio_id == portfolio_id
-            ).order_by(Transaction.transaction_date.desc()).limit(200).all()
-            
-            # 주문번호 -> 트랜잭션 매핑
-            # DB의 Memo에 "주문번호: 12345" 형식이 있다고 가정
-            db_order_map = {}
-            for t in recent_db_txns:
-                if t.memo and "주문번호: " in t.memo:
-                    try:
-                        # "주문번호: 000123" -> "000123" 추출
-                        ord_no = t.memo.split("주문번호: ")[1].strip().split()[0]
-                        db_order_map[ord_no] = t
-                    except:
-                        pass
+            watermark = cls._get_tx_watermark(db, portfolio_id)
+            floor = watermark.replace(hour=0, minute=0, second=0, microsecond=0) if watermark else None
 
-            count_new = 0
-            count_update = 0
-            
+            # 2. 워터마크 이후 체결만 대상으로 ((체결일, 주문번호) -> (API 내역, 체결시각))
+            batch: Dict[tuple, Any] = {}
             for tx in api_txns:
                 # API의 ord_no (주문번호)를 Key로 사용
                 # API ord_no는 숫자일 수도, 문자열일 수도 있음. 문자열로 통일.
                 ord_no = str(tx.get("id")) # get_transactions에서 id에 ord_no를 넣었음
-                
+
                 # 없는 경우 Skip (주문번호가 없으면 식별 불가)
                 if not ord_no or ord_no == "0":
                     continue
 
-                if ord_no in db_order_map:
+                tx_date = datetime.strptime(tx["transaction_date"], "%Y%m%d %H%M%S")
+                if floor and tx_date < floor:
+                    continue
+                batch[(tx_date.date(), ord_no)] = (tx, tx_date)
+
+            if not batch:
+                return
+
+            # 3. 해당 주문번호·기간의 DB 내역만 조회 (이력 크기와 무관, 인덱스는 patch_transaction_order_index.py), 같은 날 체결만 매칭
+            db_order_map = {}
+            memo_keys = {cls._order_memo(o): o for _, o in batch}
+            day_floor = datetime.combine(min(d for d, _ in batch), datetime.min.time())
+            for t in db.query(Transaction).filter(
+                Transaction.portfolio_id == portfolio_id,
+                Transaction.memo.in_(list(memo_keys)),
+                Transaction.transaction_date >= day_floor
+            ):
+                key = (t.transaction_date.date(), memo_keys[t.memo])
+                if key in batch:
+                    db_order_map[key] = t
+
+            # 4. 신규 체결 종목의 strategy 일괄 조회
+            new_codes = sorted({tx["stock_code"] for k, (tx, _) in batch.items() if k not in db_order_map})
+            strategies = cls._resolve_strategies(db, portfolio_id, new_codes) if new_codes else {}
+
+            count_new = 0
+            count_update = 0
+            newest = watermark
+
+            for key, (tx, tx_date) in batch.items():
+                ord_no = key[1]
+                if newest is None or tx_date > newest:
+                    newest = tx_date
+
+                if key in db_order_map:
                     # 기존 내역 존재: 업데이트 확인
-                    existing_txn = db_order_map[ord_no]
-                    
+                    existing_txn = db_order_map[key]
+
                     # 수량이 늘어났거나 (추가 체결), 가격이 변했으면 업데이트
-                    if (existing_txn.quantity != tx["quantity"] or 
+                    if (existing_txn.quantity != tx["quantity"] or
                         existing_txn.price != tx["price"] or
                         existing_txn.total_amount != tx["total_amount"]):
-                        
+
                         logger.info(f"[Sync] Update Transaction: {tx['stock_name']} ({ord_no}) "
                                     f"Qty {existing_txn.quantity}->{tx['quantity']}, "
                                     f"Price {existing_txn.price}->{tx['price']}")
-                        
+
                         existing_txn.quantity = tx["quantity"]
                         existing_txn.price = tx["price"]
                         existing_txn.total_amount = tx["total_amount"]
@@ -208,36 +400,11 @@ class RealAccountService:
                     # 신규 내역 추가
                     logger.info(f"[Sync] New Transaction: {tx['stock_name']} ({ord_no}) Qty {tx['quantity']}")
 
-                    # [FIX] Holding에서 strategy 조회 (매도 시점의 strategy 정확히 추적)
-                    txn_strategy = "standard"  # 기본값
-                    
-                    # 1. 현재 Holding에서 strategy 조회
-                    holding = db.query(Holding).filter(
-                        Holding.portfolio_id == portfolio_id,
-                        Holding.stock_code == tx["stock_code"]
-                    ).first()
-                    
-                    if holding and holding.strategy:
-                        txn_strategy = holding.strategy
-                    else:
-                        # 2. Holding이 없거나 strategy가 없으면, 딥바이 종목 목록 확인
-                        from backend.services.samsung_deep_buy_service import SamsungDeepBuyService
-                        if SamsungDeepBuyService.is_target_stock(tx["stock_code"]):
-                            txn_strategy = SamsungDeepBuyService.STRATEGY_NAME
-                            logger.info(f"[Sync] 딥바이 종목 감지: {tx['stock_name']} → strategy={txn_strategy}")
-                        else:
-                            # 3. 최근 매수 기록에서 strategy 조회 (매도 전 매수 기록 확인)
-                            recent_buy = db.query(Transaction).filter(
-                                Transaction.portfolio_id == portfolio_id,
-                                Transaction.stock_code == tx["stock_code"],
-                                Transaction.transaction_type == "BUY"
-                            ).order_by(Transaction.transaction_date.desc()).first()
-                            
-                            if recent_buy and recent_buy.strategy:
-                                txn_strategy = recent_buy.strategy
-                                logger.info(f"[Sync] 최근 매수 기록에서 strategy 조회: {tx['stock_name']} → strategy={txn_strategy}")
-                            else:
-                                logger.warning(f"[Sync] strategy를 찾을 수 없음: {tx['stock_name']} → 기본값 'standard' 사용")
+                    # [FIX] 매도 시점의 strategy 정확히 추적 (일괄 조회 결과 사용)
+                    txn_strategy = strategies.get(tx["stock_code"])
+                    if not txn_strategy:
+                        txn_strategy = "standard"  # 기본값
+                        logger.warning(f"[Sync] strategy를 찾을 수 없음: {tx['stock_name']} → 기본값 'standard' 사용")
 
                     new_txn = Transaction(
                         portfolio_id=portfolio_id,
@@ -249,18 +416,22 @@ class RealAccountService:
                         total_amount=tx["total_amount"],
                         fee=tx["commission"],
                         tax=tx["tax"],
-                        transaction_date=datetime.strptime(tx["transaction_date"], "%Y%m%d %H%M%S"),
-                        memo=f"주문번호: {ord_no}",
+                        transaction_date=tx_date,
+                        memo=cls._order_memo(ord_no),
                         strategy=txn_strategy,  # [FIX] strategy 추가
                         created_at=datetime.now()
                     )
                     db.add(new_txn)
+                    db_order_map[key] = new_txn
                     count_new += 1
-            
+
             if count_new > 0 or count_update > 0:
                 db.commit()
                 logger.info(f"[Sync] 거래 완료: 신규 {count_new}건, 업데이트 {count_update}건")
 
+            # 커밋(또는 변경 없음) 이후에만 워터마크 전진
+            cls._tx_watermark[portfolio_id] = newest
+
         except Exception as e:
             logger.error(f"거래 내역 동기화 실패: {e}")
             db.rollback()
@@ -323,6 +494,8 @@ class RealAccountService:
                     db.add(new_h)
                     is_newly_created = True
                 db.commit()
+                # 선점 기록한 Holding이 다음 sync_holdings에서 반드시 대조되도록
+                RealAccountService.invalidate_holdings_snapshot(portfolio_id)
                 logger.info(f"매수 전략({strategy}) DB 저장 완료: {stock_name}")
 
             except Exception as h_e:
@@ -330,7 +503,7 @@ class RealAccountService:
 
             # 2. KIS 매수 주문 전송
             try:
-                result = kis_api_service.send_order(stock_code, quantity, price, "2", order_type)
+                result = RealAccountService.broker().send_order(stock_code, quantity, price, "2", order_type)
 
                 if not result:
                     raise Exception("API 매수 주문 실패 (응답 없음)")
@@ -360,7 +533,7 @@ class RealAccountService:
                     )
                     try:
                         fallback_qty = 1
-                        fallback_result = kis_api_service.send_order(stock_code, fallback_qty, price, "2", order_type)
+                        fallback_result = RealAccountService.broker().send_order(stock_code, fallback_qty, price, "2", order_type)
 
                         if not fallback_result:
                             raise Exception("API 매수 주문 실패 (1주 fallback 응답 없음)")
@@ -452,7 +625,7 @@ class RealAccountService:
                             "message": f"비정상 가격으로 매도 차단 (평단가 대비 {price_ratio:.1f}배)"
                         }
 
-            result = kis_api_service.send_order(stock_code, quantity, price, "1", order_type)
+            result = RealAccountService.broker().send_order(stock_code, quantity, price, "1", order_type)
 
             if not result:
                 return {"success": False, "message": "API 매도 주문 실패"}
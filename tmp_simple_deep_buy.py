@@ -12,18 +12,1588 @@
 """
 
 import asyncio
+import functools
+import importlib
+import json
 import logging
+import mmap
+import os
+import queue
+import struct
 import threading
 import time
+from bisect import bisect_left, bisect_right
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Tuple
 
 logger = logging.getLogger(__name__)
 
 from backend.services.blacklist import is_blacklisted
+from backend.services.tick_recorder import TickRecorder
 
 SellMode = Literal["trailing", "fixed", "virtual"]
 
+# 로컬 데이터 (거래 저널 등) 저장 위치
+DEEP_BUY_DATA_DIR = os.getenv("DEEP_BUY_DATA_DIR", "data/deep_buy")
+
+
+class _Services:
+    """외부 서비스 레지스트리 (최초 사용 시 1회 import 후 캐시, 생성자 주입값은 그대로 사용)
+
+    - kis: KIS API 클라이언트
+    - session_factory: DB 세션 팩토리
+    - notifier: 알림 서비스 (async send_message(text))
+    - real_account: 실전계좌 동기화 서비스 (보유 종목 diff 이벤트 구독)
+    - broadcast: 잔고 변경 WebSocket 브로드캐스트 (async, backend.main)
+    """
+    _IMPORTS = {
+        "kis": ("backend.services.kis_api_service", "kis_api_service"),
+        "session_factory": ("backend.database", "SessionLocal"),
+        "notifier": ("backend.services.telegram_service", "TelegramService"),
+        "real_account": ("backend.services.real_account_service", "RealAccountService"),
+        "broadcast": ("backend.main", "broadcast_portfolio_update"),
+    }
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(self._IMPORTS)
+        if unknown:
+            raise ValueError(f"Unknown services: {sorted(unknown)}")
+        self._resolved: Dict[str, object] = dict(overrides)
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        service = self._resolved.get(name)
+        if service is not None:
+            return service
+        module_name, attr = self._IMPORTS[name]
+        with self._lock:
+            if self._resolved.get(name) is None:
+                self._resolved[name] = getattr(importlib.import_module(module_name), attr)
+            return self._resolved[name]
+
+    def resolve(self):
+        """전체 미리 해석 (start()에서 호출, 실패한 항목은 다음 사용 시 재시도)"""
+        for name in self._IMPORTS:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning("[딥바이v3.6] 서비스 해석 실패 (%s): %s", name, e)
+
+    @property
+    def kis(self):
+        return self.get("kis")
+
+    @property
+    def session_factory(self):
+        return self.get("session_factory")
+
+    @property
+    def notifier(self):
+        return self.get("notifier")
+
+    @property
+    def real_account(self):
+        return self.get("real_account")
+
+    @property
+    def broadcast(self):
+        return self.get("broadcast")
+
+
+class _NotificationSender:
+    """알림 전송 전용 스레드 (이벤트 루프 1개 재사용, 큐 순서대로 전송)
+
+    호출측은 큐에 넣고 즉시 반환 → 매도/사이클 경로에서 루프 생성·전송 대기 없음.
+    """
+
+    def __init__(self, get_notifier, prefix: str = "", maxsize: int = 1000):
+        self._get_notifier = get_notifier
+        self._prefix = prefix
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.running = False
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+        threading.Thread(target=self._run, name="deepbuy-notify", daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+        self._queue.put(None)
+
+    def send(self, message: str):
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put_nowait(self._prefix + message)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("[딥바이v3.6] 알림 큐 가득 참 → 폐기: %s", message[:50])
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            while True:
+                message = self._queue.get()
+                if message is None:
+                    return
+                try:
+                    loop.run_until_complete(self._get_notifier().send_message(message))
+                    self.sent += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning("[딥바이v3.6] 알림 실패: %s", e)
+        finally:
+            loop.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+class _PortfolioBroadcaster:
+    """잔고 변경 브로드캐스트 병합기 (debounce + delta)
+
+    - notify(): 변경 표시만 하고 즉시 반환. window_sec 안의 알림은 1회 전송으로 병합
+    - 직전 전송 스냅샷과 비교해 바뀐 종목만 delta 메시지로 (seq 1씩 증가, base_seq = 직전 seq)
+    - 구독자는 seq 누락 감지 시 resync(last_seq) → 보관 중인 delta 재전송 또는 전체 스냅샷
+    - delta 구독자가 없으면 기존 전체 브로드캐스트(full_push)를 병합 주기당 1회 호출
+    - delta 구독자가 있어도 전체 브로드캐스트는 full_interval_sec마다 유지 (delta에 없는 현금/평가액/손익용)
+      간격 안에 생략된 전체 전송은 간격이 지나면 보냄 (마지막 변경이 누락되지 않도록)
+    - 구독 콜백은 브로드캐스터 스레드에서 호출됨 (웹 계층이 자기 이벤트 루프로 넘길 것)
+    - delta/resync는 현재 프로세스 내 구독 전용: WebSocket 대시보드는 전체 브로드캐스트만 받음
+    """
+
+    def __init__(self, snapshot_fn, full_push, window_sec: float = 0.3, history: int = 256,
+                 full_interval_sec: float = 5.0):
+        self._snapshot_fn = snapshot_fn
+        self._full_push = full_push
+        self._window_sec = window_sec
+        self._full_interval_sec = full_interval_sec
+        self._last_full = 0.0
+        self._full_pending = False
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._listeners: List = []
+        self._last: Dict[str, Dict] = {}
+        self._seq = 0
+        self._history: deque = deque(maxlen=history)
+        self.running = False
+        self.notified = 0
+        self.coalesced = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.full_pushes = 0
+        self.resyncs = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+        threading.Thread(target=self._run, name="deepbuy-broadcast", daemon=True).start()
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def notify(self):
+        if not self.running:
+            self.start()
+        with self._cond:
+            self.notified += 1
+            if self._dirty:
+                self.coalesced += 1
+                return
+            self._dirty = True
+            self._cond.notify()
+
+    def subscribe(self, callback):
+        with self._cond:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._cond:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def resync(self, last_seq: Optional[int] = None) -> List[Dict]:
+        """누락 복구: last_seq 이후 delta가 모두 남아 있으면 그것들, 아니면 전체 스냅샷 1건"""
+        with self._cond:
+            self.resyncs += 1
+            if (last_seq is not None and self._history and
+                    self._history[0]["base_seq"] <= last_seq <= self._seq):
+                return [m for m in self._history if m["seq"] > last_seq]
+            return [{"type": "portfolio_snapshot", "seq": self._seq, "holdings": dict(self._last)}]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.running and not self._dirty:
+                    if not self._full_pending:
+                        self._cond.wait()
+                        continue
+                    wait = self._last_full + self._full_interval_sec - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if not self.running:
+                    return
+                dirty = self._dirty
+            try:
+                if dirty:
+                    time.sleep(self._window_sec)  # 창 동안 들어온 알림은 이번 전송에 병합
+                    with self._cond:
+                        self._dirty = False
+                    self._flush()
+                else:
+                    self._push_full()  # 간격 때문에 미뤄둔 전체 전송
+            except Exception as e:
+                logger.warning("[딥바이v3.6] 브로드캐스트 실패: %s", e)
+
+    def _flush(self):
+        snapshot = self._snapshot_fn()
+        with self._cond:
+            listeners = list(self._listeners)
+            upserted = {code: h for code, h in snapshot.items() if self._last.get(code) != h}
+            removed = [code for code in self._last if code not in snapshot]
+            message = None
+            if upserted or removed:
+                self._seq += 1
+                message = {"type": "portfolio_delta", "seq": self._seq, "base_seq": self._seq - 1,
+                           "upserted": upserted, "removed": removed}
+                self._history.append(message)
+                self._last = snapshot
+                self.deltas += 1
+            else:
+                self.unchanged += 1
+
+        if message is not None:
+            for callback in listeners:
+                try:
+                    callback(message)
+                except Exception as e:
+                    logger.warning("[딥바이v3.6] 잔고 delta 구독자 처리 실패: %s", e)
+        # 전체 브로드캐스트 (현금/평가액 등 포함): 구독자 없으면 병합 주기당 1회, 있으면 full_interval_sec마다
+        if not listeners or time.monotonic() - self._last_full >= self._full_interval_sec:
+            self._push_full()
+        else:
+            with self._cond:
+                self._full_pending = True
+
+    def _push_full(self):
+        with self._cond:
+            self._full_pending = False
+            self._last_full = time.monotonic()
+        self._full_push()
+        self.full_pushes += 1
+        logger.info("[딥바이v3.6] 📡 잔고 변경 브로드캐스트 전송")
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "running": self.running,
+                "seq": self._seq,
+                "subscribers": len(self._listeners),
+                "notified": self.notified,
+                "coalesced": self.coalesced,
+                "deltas": self.deltas,
+                "unchanged": self.unchanged,
+                "full_pushes": self.full_pushes,
+                "resyncs": self.resyncs,
+            }
+
+
+class _TickRecord:
+    """종목별 실시간 틱 판정 레코드 (임계가 사전계산)
+
+    holdings_cache / last_sell_prices / last_buy_prices / 모드 변경 시에만 재계산.
+    on_realtime_price는 락/딕셔너리 생성 없이 가격 비교만 수행한다.
+    """
+    __slots__ = (
+        "code", "name", "qty", "avg_price", "state",
+        "active", "peak_price", "sell_price",
+        "trigger_price", "deactivate_price",
+        "buy_ref_price", "buy_ref_label", "buy_price", "gap_price",
+        "last_buy_price", "last_buy_gap", "last_buy_block_price",
+        "ladder",
+    )
+
+    def __init__(self, code: str, name: str, qty: int, avg_price: float):
+        self.code = code
+        self.name = name
+        self.qty = qty
+        self.avg_price = avg_price
+        self.state: Optional[Dict] = None
+        self.active = False
+        self.peak_price = 0.0
+        self.sell_price = 0.0
+        self.trigger_price = 0.0
+        self.deactivate_price = 0.0
+        self.buy_ref_price = 0.0
+        self.buy_ref_label = "평단가"
+        self.buy_price = 0.0
+        self.gap_price = 0.0
+        self.last_buy_price = 0.0
+        self.last_buy_gap = 0.0
+        self.last_buy_block_price = float("inf")
+        self.ladder: Optional["_SellLadder"] = None
+
+
+class _SellLadder:
+    """고점 기준 트레일링 분할매도 사다리 (레벨별 트리거가·수량 사전계산)
+
+    고점 갱신 / 보유수량 변경 시에만 재생성, 틱마다는 이진 탐색 1회.
+    가격은 얕은 레벨 → 깊은 레벨 순(내림차순), _keys는 bisect용 음수 오름차순.
+    """
+    __slots__ = ("peak", "qty", "levels", "drops", "prices", "qtys", "_keys")
+
+    MAX_RUNGS = 100
+
+    def __init__(self, peak: float, qty: int, start: float, step: float,
+                 floor_price: float = 0.0, max_sell: Optional[int] = None):
+        self.peak = peak
+        self.qty = qty
+        self.levels: List[int] = []
+        self.drops: List[float] = []
+        self.prices: List[float] = []
+        self.qtys: List[int] = []
+        level = 0
+        while len(self.levels) < self.MAX_RUNGS:
+            level += 1
+            drop = max(start, level * step)
+            reached = max(level, int(drop / step))  # 시작 하락폭이 여러 레벨을 덮으면 한 칸으로
+            if self.levels and reached <= self.levels[-1]:
+                continue
+            price = peak * (1 - drop)
+            if price < floor_price:
+                break
+            # 매도 수량: 하락폭 비례 (고점 대비 -1% → 보유의 10%, 최대 30%)
+            sell_qty = max(1, round(qty * min(0.3, drop * 10)))
+            if max_sell is not None:
+                sell_qty = max(0, min(sell_qty, max_sell))
+            self.levels.append(reached)
+            self.drops.append(drop)
+            self.prices.append(price)
+            self.qtys.append(sell_qty)
+        self._keys = [-p for p in self.prices]
+
+    def reached(self, price: float) -> int:
+        """현재가가 도달한 가장 깊은 칸 인덱스 (없으면 -1)"""
+        return bisect_right(self._keys, -price) - 1
+
+    def next_index(self, last_level: int) -> int:
+        """last_level 이후 첫 미매도 칸 인덱스 (없으면 len)"""
+        return bisect_right(self.levels, last_level)
+
+    def rows(self, last_level: int = 0) -> List[Dict]:
+        nxt = self.next_index(last_level)
+        return [
+            {"level": lv, "drop_pct": round(d * 100, 2), "price": round(p), "qty": q,
+             "sold": lv <= last_level, "next": i == nxt}
+            for i, (lv, d, p, q) in enumerate(zip(self.levels, self.drops, self.prices, self.qtys))
+        ]
+
+
+class _TickMailbox:
+    """종목별 최신가 우선(latest price wins) 틱 메일박스 + 소규모 워커 풀
+
+    - 종목당 대기 슬롯 1개: 평가 전 새 틱이 오면 이전 틱은 폐기(coalesced)
+    - 한 종목은 동시에 한 워커만 평가 (평가 중 들어온 틱은 슬롯에서 대기)
+    - 주문 호출로 한 종목이 막혀도 다른 종목은 나머지 워커가 처리
+    """
+
+    def __init__(self, handler, workers: int = 4):
+        self._handler = handler
+        self._workers = workers
+        self._cond = threading.Condition()
+        self._latest: Dict[str, tuple] = {}   # 종목 -> (미평가 최신가, 수신 시각 perf_counter)
+        self._ready = deque()                  # 평가 대기 종목 (중복 없음)
+        self._busy: set = set()                # 평가 중 종목
+        self._threads: List[threading.Thread] = []
+        self.running = False
+        self.received = 0
+        self.processed = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+        self._threads = [
+            threading.Thread(target=self._worker, name="deepbuy-tick-%d" % i, daemon=True)
+            for i in range(self._workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self.dropped += len(self._latest)
+            self._latest.clear()
+            self._ready.clear()
+            self._cond.notify_all()
+        self._threads = []
+
+    def submit(self, code: str, price: float, arrived: float = None):
+        with self._cond:
+            self.received += 1
+            if not self.running:
+                self.dropped += 1
+                return
+            if code in self._latest:
+                self.coalesced += 1
+                self._latest[code] = (price, arrived)
+                return
+            self._latest[code] = (price, arrived)
+            if code not in self._busy:
+                self._ready.append(code)
+                self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self.running and not self._ready:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                code = self._ready.popleft()
+                price, arrived = self._latest.pop(code)
+                self._busy.add(code)
+            try:
+                self._handler(code, price, arrived)
+            except Exception as e:
+                logger.error("[틱메일박스] 처리 오류 (%s): %s", code, e)
+            finally:
+                with self._cond:
+                    self.processed += 1
+                    self._busy.discard(code)
+                    if code in self._latest:
+                        self._ready.append(code)
+                        self._cond.notify()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "running": self.running,
+                "workers": self._workers,
+                "received": self.received,
+                "processed": self.processed,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "pending": len(self._latest),
+                "busy": len(self._busy),
+            }
+
+
+class _QuoteCache:
+    """종목별 단기(TTL) 시세 캐시 + 동일 종목 동시 조회 병합(single-flight)
+
+    개미떨구기 점수, 사이클, 트레일링 매도 경로가 같은 초에 같은 종목을
+    조회해도 KIS 호출은 1회만 나가도록 한다.
+    """
+
+    def __init__(self, fetch, ttl: float = 1.0, wait_timeout: float = 5.0):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}           # 종목 -> (monotonic 조회시각, quote)
+        self._inflight: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def get(self, code: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            event = self._inflight.get(code)
+            leader = event is None
+            if leader:
+                event = threading.Event()
+                self._inflight[code] = event
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            # 선행 조회가 실패/시간 초과하면 남아 있는 만료 시세를 새 시세처럼 돌려주지 않음
+            event.wait(self._wait_timeout)
+            with self._lock:
+                entry = self._entries.get(code)
+            return entry[1] if entry and time.monotonic() - entry[0] < self.ttl else None
+
+        quote = None
+        try:
+            quote = self._fetch(code)
+            return quote
+        finally:
+            with self._lock:
+                if quote:
+                    self._entries[code] = (time.monotonic(), quote)
+                self._inflight.pop(code, None)
+            event.set()
+
+    def invalidate(self, code: str = None):
+        with self._lock:
+            if code:
+                self._entries.pop(code, None)
+            else:
+                self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                "ttl_sec": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "hit_rate": round((self.hits + self.shared) / lookups, 3) if lookups else 0.0,
+                "cached": len(self._entries),
+            }
+
+
+class _LatencyHistogram:
+    """고정 로그 버킷(1-2-5) 지연 히스토그램 (ms 단위, 기록 O(log B), 메모리 고정)
+
+    락 없이 기록하므로 동시 기록 시 드물게 카운트가 누락될 수 있다 (모니터링 용도).
+    """
+
+    BOUNDS_MS = tuple(m * 10.0 ** e for e in range(-3, 6) for m in (1, 2, 5))  # 1µs ~ 500초
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float):
+        self._counts[bisect_left(self.BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, pct: float) -> float:
+        """버킷 상한 기준 백분위 (ms)"""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100.0
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if n and seen >= rank:
+                return min(self.BOUNDS_MS[i], self.max_ms) if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class _HotPathMetrics:
+    """핫패스 계측 (단계별 지연, 락 대기, 틱→주문 지연)
+
+    기록 1회 = perf_counter 2회 + 버킷 bisect 1회 (수 µs) → 운영에서도 상시 켜둠.
+    """
+
+    def __init__(self):
+        self._hists: Dict[str, _LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.enabled = True
+        self.since = time.time()
+
+    def hist(self, name: str) -> _LatencyHistogram:
+        h = self._hists.get(name)
+        if h is None:
+            with self._lock:
+                h = self._hists.setdefault(name, _LatencyHistogram())
+        return h
+
+    def record(self, name: str, value_ms: float):
+        if self.enabled:
+            self.hist(name).record(value_ms)
+
+    def reset(self):
+        with self._lock:
+            for h in self._hists.values():
+                h.reset()
+            self.since = time.time()
+
+    def snapshot(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "since": datetime.fromtimestamp(self.since).strftime("%Y-%m-%d %H:%M:%S"),
+            "stages": {name: h.snapshot() for name, h in sorted(self._hists.items())},
+        }
+
+    def summary(self) -> str:
+        """로그용 한 줄 요약 (단계 n p50/p99/max ms)"""
+        return " | ".join(
+            "%s n=%d %.3g/%.3g/%.3g" % (name, h.count, h.percentile(50), h.percentile(99), h.max_ms)
+            for name, h in sorted(self._hists.items()) if h.count
+        )
+
+
+def _timed(stage: str):
+    """메서드 소요시간을 self._metrics의 stage 히스토그램에 기록 (sync/async 모두)"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    self._metrics.record(stage, (time.perf_counter() - started) * 1000)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._metrics.record(stage, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorator
+
+
+class _TimedLock:
+    """대기시간을 기록하는 Lock 래퍼 (threading.Lock과 같은 사용법)"""
+    __slots__ = ("_lock", "_wait")
+
+    def __init__(self, wait_hist: _LatencyHistogram):
+        self._lock = threading.Lock()
+        self._wait = wait_hist
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self._wait.record(0.0)
+            return True
+        if not blocking:
+            return False
+        started = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        self._wait.record((time.perf_counter() - started) * 1000)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+class _ScheduledJob:
+    __slots__ = (
+        "name", "interval", "func", "market_hours", "overlap",
+        "next_due", "task", "pending_due", "runs", "skipped", "merged", "errors",
+        "lag", "duration",
+    )
+
+    def __init__(self, name: str, interval: int, func, market_hours: bool, overlap: str):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.market_hours = market_hours
+        self.overlap = overlap
+        self.next_due: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        self.pending_due: Optional[datetime] = None
+        self.runs = 0
+        self.skipped = 0
+        self.merged = 0
+        self.errors = 0
+        self.lag = _LatencyHistogram()
+        self.duration = _LatencyHistogram()
+
+
+class _CycleScheduler:
+    """마감시각(deadline) 기반 주기 작업 스케줄러 (5초 폴링 대체)
+
+    - 작업별 다음 실행 시각을 자정 기준 interval 정렬 슬롯으로 계산 (장 시간 외 슬롯은 다음 장 시작으로 점프)
+    - 가장 가까운 마감시각까지 한 번에 대기 → 정시 실행, 지연(lag)/소요시간 히스토그램 기록
+    - 이전 실행이 끝나기 전 다음 슬롯 도래 시: overlap="skip" 은 건너뜀, "merge" 는 종료 직후 1회로 병합
+    """
+
+    FIRE_GRACE_SEC = 5  # 시작 시 직전 슬롯이 이 시간 이내면 즉시 실행 (기존 now.second < 5 동작)
+
+    def __init__(self, is_open, next_open):
+        self._is_open = is_open
+        self._next_open = next_open
+        self._jobs: List[_ScheduledJob] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.running = False
+
+    def add_job(self, name: str, interval_sec: int, func, market_hours: bool = True, overlap: str = "skip"):
+        """주기 작업 등록 (func: async def func(due: datetime))"""
+        if overlap not in ("skip", "merge"):
+            raise ValueError(f"Invalid overlap policy: {overlap}")
+        job = _ScheduledJob(name, interval_sec, func, market_hours, overlap)
+        now = datetime.now()
+        job.next_due = self._next_slot(job, now - timedelta(seconds=self.FIRE_GRACE_SEC))
+        self._jobs.append(job)
+        self._notify()
+        return job
+
+    def has_job(self, name: str) -> bool:
+        return any(job.name == name for job in self._jobs)
+
+    def _align(self, after: datetime, interval: int) -> datetime:
+        """after 이후(초과) 첫 interval 정렬 슬롯"""
+        midnight = after.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (after - midnight).total_seconds()
+        return midnight + timedelta(seconds=(int(elapsed // interval) + 1) * interval)
+
+    def _next_slot(self, job: _ScheduledJob, after: datetime) -> datetime:
+        slot = self._align(after, job.interval)
+        if job.market_hours:
+            for _ in range(14):
+                if self._is_open(slot):
+                    break
+                slot = self._align(self._next_open(slot) - timedelta(microseconds=1), job.interval)
+        return slot
+
+    def _notify(self):
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.running = True
+        while self.running:
+            now = datetime.now()
+            for job in self._jobs:
+                if job.next_due <= now:
+                    self._fire(job, now)
+            
+            delay = 60.0
+            if self._jobs:
+                delay = (min(j.next_due for j in self._jobs) - datetime.now()).total_seconds()
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self.running = False
+        self._notify()
+
+    def _fire(self, job: _ScheduledJob, now: datetime):
+        due = job.next_due
+        job.next_due = self._next_slot(job, now)
+        
+        if job.task and not job.task.done():
+            if job.overlap == "merge":
+                job.merged += 1
+                job.pending_due = due
+                logger.info("[스케줄러] %s 이전 실행 중 → %s 슬롯 병합", job.name, due.strftime("%H:%M:%S"))
+            else:
+                job.skipped += 1
+                logger.warning("[스케줄러] %s 이전 실행 중 → %s 슬롯 스킵", job.name, due.strftime("%H:%M:%S"))
+            return
+        
+        job.lag.record((now - due).total_seconds() * 1000)
+        job.task = asyncio.create_task(self._run_job(job, due))
+
+    async def _run_job(self, job: _ScheduledJob, due: datetime):
+        while True:
+            started = time.monotonic()
+            try:
+                await job.func(due)
+            except Exception as e:
+                job.errors += 1
+                logger.error("[스케줄러] %s 실행 오류: %s", job.name, e)
+            job.runs += 1
+            job.duration.record((time.monotonic() - started) * 1000)
+            
+            if job.pending_due is None or not self.running:
+                return
+            due, job.pending_due = job.pending_due, None
+            job.lag.record((datetime.now() - due).total_seconds() * 1000)
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "jobs": {
+                job.name: {
+                    "interval_sec": job.interval,
+                    "overlap": job.overlap,
+                    "next_due": job.next_due.strftime("%Y-%m-%d %H:%M:%S") if job.next_due else None,
+                    "in_progress": bool(job.task and not job.task.done()),
+                    "runs": job.runs,
+                    "skipped": job.skipped,
+                    "merged": job.merged,
+                    "errors": job.errors,
+                    "lag": job.lag.snapshot(),
+                    "duration": job.duration.snapshot(),
+                }
+                for job in self._jobs
+            },
+        }
+
+class _OrderIntent:
+    """주문 의도 (큐 → 제출 → 체결 확인까지 추적)"""
+    __slots__ = (
+        "code", "name", "side", "qty", "ref_price", "kind", "message", "on_done",
+        "status", "order_no", "filled_qty", "fill_price", "error",
+        "created_at", "submitted_at", "done_at", "tick_at",
+    )
+
+    def __init__(self, code: str, name: str, side: str, qty: int, ref_price: float,
+                 kind: str, message: str, on_done):
+        self.code = code
+        self.name = name
+        self.side = side            # "SELL" / "BUY"
+        self.qty = qty
+        self.ref_price = ref_price  # 주문 판단 시점 가격
+        self.kind = kind            # trailing / fixed / peak ...
+        self.message = message      # 체결 확인 시 전송할 알림
+        self.on_done = on_done
+        self.status = "queued"      # queued → submitted → filled / unconfirmed / rejected
+        self.order_no: Optional[str] = None
+        self.filled_qty = 0
+        self.fill_price = 0.0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.submitted_at = 0.0
+        self.done_at = 0.0
+        self.tick_at: Optional[float] = None  # 주문을 유발한 틱 수신 시각 (perf_counter)
+
+
+class _OrderPipeline:
+    """비동기 주문 파이프라인
+
+    - 제출 스레드 N개가 큐의 주문 의도를 시장가로 전송 (동시 제출 수 제한)
+    - 확인 스레드가 체결 내역(get_transactions)을 폴링해 주문번호별 체결 확인
+    - 확인 제한시간 초과 시 "unconfirmed"로 종료 (호출측은 캐시를 건드리지 않고 잔고로 재확인)
+    - 틱/사이클 스레드는 큐에 넣고 즉시 반환, 결과는 intent.on_done 콜백으로 전달
+    """
+
+    def __init__(self, get_kis, workers: int = 2, poll_sec: float = 1.0, timeout_sec: float = 30.0,
+                 metrics: Optional[_HotPathMetrics] = None):
+        self._get_kis = get_kis
+        self._metrics = metrics or _HotPathMetrics()
+        self._workers = workers
+        self._poll_sec = poll_sec
+        self._timeout_sec = timeout_sec
+        self._queue: "queue.Queue[Optional[_OrderIntent]]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._inflight: Dict[str, _OrderIntent] = {}   # 주문번호 -> 주문
+        self._recent = deque(maxlen=50)
+        self.running = False
+        self.submitted = 0
+        self.filled = 0
+        self.unconfirmed = 0
+        self.rejected = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+        for i in range(self._workers):
+            threading.Thread(target=self._submit_worker, name="deepbuy-order-%d" % i, daemon=True).start()
+        threading.Thread(target=self._confirm_worker, name="deepbuy-order-confirm", daemon=True).start()
+
+    def stop(self):
+        with self._cond:
+            if not self.running:
+                return
+            self.running = False
+            self._cond.notify_all()
+        for _ in range(self._workers):
+            self._queue.put(None)
+
+    def submit(self, intent: _OrderIntent) -> _OrderIntent:
+        if not self.running:
+            self.start()
+        self._queue.put(intent)
+        return intent
+
+    def _submit_worker(self):
+        while True:
+            intent = self._queue.get()
+            if intent is None:
+                return
+            result = None
+            started = time.perf_counter()
+            try:
+                side_code = "1" if intent.side == "SELL" else "2"
+                result = self._get_kis().send_order(intent.code, intent.qty, 0, side_code, "01")  # 시장가
+            except Exception as e:
+                intent.error = str(e)
+            intent.submitted_at = time.time()
+            sent = time.perf_counter()
+            self._metrics.record("order_send", (sent - started) * 1000)
+            if intent.tick_at is not None:
+                self._metrics.record("tick_to_order", (sent - intent.tick_at) * 1000)
+            
+            if result and result.get("order_no"):
+                intent.order_no = str(result["order_no"])
+                intent.status = "submitted"
+                with self._cond:
+                    self.submitted += 1
+                    self._inflight[intent.order_no] = intent
+                    self._cond.notify_all()
+            else:
+                intent.status = "rejected"
+                intent.error = intent.error or str(result)
+                self._finish(intent)
+
+    def _confirm_worker(self):
+        while True:
+            with self._cond:
+                while self.running and not self._inflight:
+                    self._cond.wait()
+                if not self.running:
+                    return
+            time.sleep(self._poll_sec)
+            
+            try:
+                txns = self._get_kis().get_transactions() or []
+            except Exception as e:
+                logger.warning("[주문] 체결 내역 조회 실패: %s", e)
+                txns = []
+            fills = {str(tx.get("id")): tx for tx in txns}
+            
+            now = time.time()
+            with self._cond:
+                pending = list(self._inflight.values())
+            for intent in pending:
+                tx = fills.get(intent.order_no)
+                filled_qty = int(tx.get("quantity", 0)) if tx else 0
+                if filled_qty >= intent.qty:
+                    intent.status = "filled"
+                elif now - intent.submitted_at >= self._timeout_sec:
+                    # 부분 체결은 체결분만 반영, 미확인은 호출측 판단
+                    intent.status = "filled" if filled_qty > 0 else "unconfirmed"
+                else:
+                    continue
+                intent.filled_qty = filled_qty
+                intent.fill_price = float(tx.get("price", 0)) if tx else 0.0
+                with self._cond:
+                    self._inflight.pop(intent.order_no, None)
+                self._finish(intent)
+
+    def _finish(self, intent: _OrderIntent):
+        intent.done_at = time.time()
+        with self._cond:
+            if intent.status == "filled":
+                self.filled += 1
+            elif intent.status == "unconfirmed":
+                self.unconfirmed += 1
+            else:
+                self.rejected += 1
+            self._recent.append(intent)
+        try:
+            intent.on_done(intent)
+        except Exception as e:
+            logger.error("[주문] 완료 처리 오류 (%s): %s", intent.name, e)
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        with self._cond:
+            return {
+                "running": self.running,
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "filled": self.filled,
+                "unconfirmed": self.unconfirmed,
+                "rejected": self.rejected,
+                "inflight": [
+                    {"code": i.code, "name": i.name, "side": i.side, "qty": i.qty,
+                     "order_no": i.order_no, "age_sec": round(now - i.submitted_at, 1)}
+                    for i in self._inflight.values()
+                ],
+                "recent": [
+                    {"code": i.code, "name": i.name, "side": i.side, "kind": i.kind, "qty": i.qty,
+                     "filled_qty": i.filled_qty, "fill_price": i.fill_price, "status": i.status,
+                     "order_no": i.order_no, "latency_sec": round(i.done_at - i.created_at, 3)}
+                    for i in list(self._recent)[-10:]
+                ],
+            }
+
+class _TransactionJournal:
+    """거래 기록 write-behind 저널
+
+    - append(): 로컬 추가전용 로그(JSON Lines)에 쓰고 fsync 후 즉시 반환
+    - 백그라운드 writer가 모아서 DB에 일괄 커밋 (commit_batch), 성공 시 체크포인트(바이트 오프셋) 기록
+    - 재시작 시 체크포인트 이후 항목을 다시 커밋 (주문번호 기준 멱등이라 중복 없음)
+    """
+
+    def __init__(self, path: str, commit_batch, batch_size: int = 50,
+                 flush_sec: float = 0.5, rotate_bytes: int = 1 << 20):
+        self.path = path
+        self._ckpt_path = path + ".ckpt"
+        self._commit_batch = commit_batch
+        self._batch_size = batch_size
+        self._flush_sec = flush_sec
+        self._rotate_bytes = rotate_bytes
+        self._lock = threading.Lock()       # 파일 append/rotate 직렬화
+        self._cond = threading.Condition()
+        self._pending: List[tuple] = []     # (entry, 저널 끝 오프셋)
+        self._committed_offset = 0
+        self.running = False
+        self.appended = 0
+        self.committed = 0
+        self.duplicates = 0
+        self.failures = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._recover()
+        threading.Thread(target=self._writer, name="deepbuy-tx-journal", daemon=True).start()
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def append(self, entry: Dict):
+        """저널에 기록 (fsync) 후 DB 커밋 대기열에 추가"""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                end = f.tell()
+            with self._cond:
+                self.appended += 1
+                self._pending.append((entry, end))
+                self._cond.notify()
+
+    def _recover(self):
+        """체크포인트 이후 미커밋 항목 재적재"""
+        try:
+            with open(self._ckpt_path) as f:
+                self._committed_offset = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            self._committed_offset = 0
+        if not os.path.exists(self.path):
+            return
+        
+        recovered = []
+        with open(self.path, "rb") as f:
+            f.seek(self._committed_offset)
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # 마지막 줄 쓰기 도중 중단된 경우
+                try:
+                    recovered.append((json.loads(line), f.tell()))
+                except ValueError:
+                    logger.warning("[저널] 손상된 항목 스킵: %r", line[:80])
+        if recovered:
+            logger.info("[저널] 미커밋 거래 %d건 복구 → DB 재커밋", len(recovered))
+            with self._cond:
+                self._pending[:0] = recovered
+
+    def _writer(self):
+        backoff = 1.0
+        while True:
+            with self._cond:
+                while self.running and not self._pending:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            time.sleep(self._flush_sec)  # 짧게 모아서 커밋
+            with self._cond:
+                batch = self._pending[:self._batch_size]
+            
+            try:
+                dup = self._commit_batch([entry for entry, _ in batch])
+            except Exception as e:
+                self.failures += 1
+                logger.error("[저널] DB 커밋 실패 (%d건, %.0f초 후 재시도): %s", len(batch), backoff, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 1.0
+            
+            with self._cond:
+                del self._pending[:len(batch)]
+                self.committed += len(batch) - (dup or 0)
+                self.duplicates += dup or 0
+                self._committed_offset = batch[-1][1]
+                drained = not self._pending
+            self._checkpoint(drained)
+
+    def _checkpoint(self, drained: bool):
+        with self._lock:
+            # 모두 커밋됐고 저널이 커졌으면 비우고 오프셋 0부터 다시
+            if drained and self._committed_offset >= self._rotate_bytes:
+                with self._cond:
+                    if not self._pending:
+                        open(self.path, "wb").close()
+                        self._committed_offset = 0
+            tmp = self._ckpt_path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(str(self._committed_offset))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._ckpt_path)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "path": self.path,
+                "appended": self.appended,
+                "committed": self.committed,
+                "duplicates": self.duplicates,
+                "failures": self.failures,
+                "pending": len(self._pending),
+            }
+
+class _SymbolState:
+    """종목별 영속 상태 레코드 (스냅샷/변경로그의 고정폭 1행)"""
+    __slots__ = (
+        "code", "has_trailing", "active", "waiting_for_recovery",
+        "peak_price", "stop_price", "stop_hit_time", "last_peak_sell_price",
+        "last_sold_drop_level", "last_sell_time", "sell_block_count",
+    )
+    # code, flags, peak, stop, stop_hit_time, last_peak_sell, last_sell_time, drop_level, block_count
+    STRUCT = struct.Struct("<8sBdddddii")
+
+    def __init__(self, code: str):
+        self.code = code
+        self.has_trailing = False
+        self.active = False
+        self.waiting_for_recovery = False
+        self.peak_price = 0.0
+        self.stop_price = 0.0
+        self.stop_hit_time = 0.0
+        self.last_peak_sell_price = 0.0
+        self.last_sold_drop_level = 0
+        self.last_sell_time = 0.0
+        self.sell_block_count = 0
+
+    @classmethod
+    def capture(cls, code: str, state: Optional[Dict], last_sell_time: float, block_count: int) -> "_SymbolState":
+        rec = cls(code)
+        if state is not None:
+            hit = state.get("stop_hit_time")
+            rec.has_trailing = True
+            rec.active = bool(state.get("active"))
+            rec.waiting_for_recovery = bool(state.get("waiting_for_recovery"))
+            rec.peak_price = float(state.get("peak_price") or 0)
+            rec.stop_price = float(state.get("stop_price") or 0)
+            rec.stop_hit_time = hit.timestamp() if isinstance(hit, datetime) else float(hit or 0)
+            rec.last_peak_sell_price = float(state.get("last_peak_sell_price") or 0)
+            rec.last_sold_drop_level = int(state.get("last_sold_drop_level") or 0)
+        rec.last_sell_time = float(last_sell_time or 0)
+        rec.sell_block_count = int(block_count or 0)
+        return rec
+
+    def pack(self) -> bytes:
+        flags = self.has_trailing | (self.active << 1) | (self.waiting_for_recovery << 2)
+        return self.STRUCT.pack(self.code.encode("ascii")[:8], flags, self.peak_price, self.stop_price,
+                                self.stop_hit_time, self.last_peak_sell_price, self.last_sell_time,
+                                self.last_sold_drop_level, self.sell_block_count)
+
+    @classmethod
+    def unpack(cls, values: tuple) -> "_SymbolState":
+        code, flags, peak, stop, hit, peak_sell, sell_time, level, blocks = values
+        rec = cls(code.rstrip(b"\0").decode("ascii"))
+        rec.has_trailing = bool(flags & 1)
+        rec.active = bool(flags & 2)
+        rec.waiting_for_recovery = bool(flags & 4)
+        rec.peak_price, rec.stop_price, rec.stop_hit_time = peak, stop, hit
+        rec.last_peak_sell_price, rec.last_sell_time = peak_sell, sell_time
+        rec.last_sold_drop_level, rec.sell_block_count = level, blocks
+        return rec
+
+    def to_state(self, default: Dict) -> Dict:
+        state = default
+        state["active"] = self.active
+        state["peak_price"] = self.peak_price
+        state["stop_price"] = self.stop_price
+        state["stop_hit_time"] = datetime.fromtimestamp(self.stop_hit_time) if self.stop_hit_time else None
+        state["waiting_for_recovery"] = self.waiting_for_recovery
+        state["last_peak_sell_price"] = self.last_peak_sell_price
+        state["last_sold_drop_level"] = self.last_sold_drop_level
+        return state
+
+
+class _StateStore:
+    """트레일링/쿨다운/매도대기 상태 저장소 (재시작 시 DB 없이 복원)
+
+    - 백그라운드 스레드가 flush_sec마다 현재 상태를 종목별 레코드로 떠서 직전 기록과 다른 것만
+      변경로그에 append (fsync). 콜백 경로에는 추가 비용 없음
+    - 변경로그가 snapshot_bytes를 넘으면 전체 스냅샷(고정폭 레코드 배열)을 새로 쓰고 로그를 비움
+    - load(): 스냅샷 mmap → 레코드 일괄 해제 → 변경로그 재적용
+    """
+    _MAGIC = b"DBST0001"
+    _HEADER = struct.Struct("<8sII")   # magic, 레코드 수, 매도대기 JSON 길이
+    _FRAME = struct.Struct("<BI")      # 종류, 길이
+    _KIND_STATE, _KIND_DELETE, _KIND_PENDING = 1, 2, 3
+
+    def __init__(self, path: str, read_state, flush_sec: float = 1.0, snapshot_bytes: int = 256 << 10):
+        self.path = path
+        self._log_path = path + ".log"
+        self._read_state = read_state      # () -> (trailing_state, last_sell_time, sell_block_count, pending_sells)
+        self._flush_sec = flush_sec
+        self._snapshot_bytes = snapshot_bytes
+        self._records: Dict[str, bytes] = {}   # 마지막으로 기록한 종목별 레코드
+        self._pending_json = b"{}"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.running = False
+        self.changes = 0
+        self.snapshots = 0
+        self.load_ms = 0.0
+
+    def load(self) -> Tuple[Dict[str, _SymbolState], Dict]:
+        """스냅샷 + 변경로그 복원. Returns: ({종목코드: 레코드}, 매도대기)"""
+        started = time.monotonic()
+        records: Dict[str, _SymbolState] = {}
+        pending: Dict = {}
+        size = _SymbolState.STRUCT.size
+        try:
+            with open(self.path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    magic, count, pending_len = self._HEADER.unpack_from(mm, 0)
+                    if magic == self._MAGIC:
+                        start = self._HEADER.size
+                        body = mm[start:start + count * size]
+                        for values in _SymbolState.STRUCT.iter_unpack(body):
+                            rec = _SymbolState.unpack(values)
+                            records[rec.code] = rec
+                        start += count * size
+                        pending = json.loads(mm[start:start + pending_len] or b"{}")
+        except (FileNotFoundError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning("[상태저장] 스냅샷 손상 → 변경로그만 적용: %s", e)
+        
+        try:
+            with open(self._log_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        pos = 0
+        while pos + self._FRAME.size <= len(data):
+            kind, length = self._FRAME.unpack_from(data, pos)
+            payload = data[pos + self._FRAME.size:pos + self._FRAME.size + length]
+            if len(payload) < length:
+                break  # 마지막 프레임 쓰기 도중 중단
+            pos += self._FRAME.size + length
+            if kind == self._KIND_STATE:
+                rec = _SymbolState.unpack(_SymbolState.STRUCT.unpack(payload))
+                records[rec.code] = rec
+            elif kind == self._KIND_DELETE:
+                records.pop(payload.decode("ascii"), None)
+            elif kind == self._KIND_PENDING:
+                pending = json.loads(payload)
+        
+        self._records = {code: rec.pack() for code, rec in records.items()}
+        self._pending_json = json.dumps(pending, ensure_ascii=False, default=str, sort_keys=True).encode("utf-8")
+        self.load_ms = (time.monotonic() - started) * 1000
+        return records, pending
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.running = True
+        self._stop.clear()
+        threading.Thread(target=self._run, name="deepbuy-state-store", daemon=True).start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self._flush_sec):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("[상태저장] 기록 실패: %s", e)
+
+    def _capture(self) -> Tuple[Dict[str, bytes], bytes]:
+        trailing, sell_times, blocks, pending = (dict(d) for d in self._read_state())
+        records = {}
+        for code in set(trailing) | set(sell_times) | set(blocks):
+            state = trailing.get(code)
+            records[code] = _SymbolState.capture(code, dict(state) if state is not None else None,
+                                                 sell_times.get(code, 0), blocks.get(code, 0)).pack()
+        pending_json = json.dumps(pending, ensure_ascii=False, default=str, sort_keys=True).encode("utf-8")
+        return records, pending_json
+
+    def flush(self):
+        """직전 기록 대비 바뀐 종목만 변경로그에 추가"""
+        with self._lock:
+            records, pending_json = self._capture()
+            frames = []
+            for code, packed in records.items():
+                if self._records.get(code) != packed:
+                    frames.append(self._FRAME.pack(self._KIND_STATE, len(packed)) + packed)
+            for code in self._records.keys() - records.keys():
+                frames.append(self._FRAME.pack(self._KIND_DELETE, len(code)) + code.encode("ascii"))
+            if pending_json != self._pending_json:
+                frames.append(self._FRAME.pack(self._KIND_PENDING, len(pending_json)) + pending_json)
+            if not frames:
+                return
+            
+            with open(self._log_path, "ab") as f:
+                f.write(b"".join(frames))
+                f.flush()
+                os.fsync(f.fileno())
+                log_size = f.tell()
+            self._records, self._pending_json = records, pending_json
+            self.changes += len(frames)
+            if log_size >= self._snapshot_bytes:
+                self._snapshot()
+
+    def _snapshot(self):
+        """전체 스냅샷 기록 (tmp → fsync → rename) 후 변경로그 비움"""
+        body = b"".join(self._records.values())
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._HEADER.pack(self._MAGIC, len(self._records), len(self._pending_json)))
+            f.write(body)
+            f.write(self._pending_json)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        open(self._log_path, "wb").close()
+        self.snapshots += 1
+
+    def get_stats(self) -> Dict:
+        try:
+            log_bytes = os.path.getsize(self._log_path)
+        except OSError:
+            log_bytes = 0
+        return {
+            "path": self.path,
+            "symbols": len(self._records),
+            "changes": self.changes,
+            "snapshots": self.snapshots,
+            "log_bytes": log_bytes,
+            "load_ms": round(self.load_ms, 2),
+        }
+
+class _ShadowEvaluator:
+    """섀도 파라미터 평가 (virtual 모드 일반화)
+
+    라이브 틱/사이클을 그대로 받아 파라미터 조합 K개의 가상 매매를 종목별 VectorBook
+    (deep_buy_backtest, NumPy)으로 동시에 계산 → 틱 1건 = K개 배열 연산 1회.
+    주문은 내지 않고 당일 가상 손익만 집계 (0번 조합 = 현재 라이브 설정).
+    """
+
+    def __init__(self, strategy: "SimpleDeepBuyStrategy", max_queue: int = 100_000):
+        self._strategy = strategy
+        self._max_queue = max_queue
+        self._configs: List[Dict] = []
+        self._grid = None
+        self._book_cls = None
+        self._books: Dict[str, object] = {}
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()   # books (틱 스레드 ↔ 사이클/리포트)
+        self.day: Optional[str] = None
+        self.running = False
+        self.ticks = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._grid is not None
+
+    def configure(self, grid: Dict[str, List[float]]) -> List[Dict]:
+        """파라미터 그리드 설정 (빈 그리드면 비활성화). Returns: 평가 조합 목록"""
+        if not grid:
+            with self._lock:
+                self._grid, self._configs, self._books = None, [], {}
+            return []
+        try:
+            import numpy as np
+            from backend.services.deep_buy_backtest import SWEEP_PARAMS, VectorBook, expand_grid
+        except ImportError as e:
+            logger.warning("[섀도] 비활성화 (의존성 없음): %s", e)
+            return []
+        
+        live = {name: float(getattr(self._strategy, name)) for name in SWEEP_PARAMS}
+        configs = [live] + [dict(live, **combo) for combo in expand_grid(grid)]
+        arrays = {name: np.asarray([c[name] for c in configs], dtype=np.float64) for name in SWEEP_PARAMS}
+        with self._lock:
+            self._configs, self._grid, self._book_cls = configs, arrays, VectorBook
+            self._books = {}
+        logger.info("[섀도] 평가 조합 %d개 (라이브 포함)", len(configs))
+        return configs
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        threading.Thread(target=self._worker, name="deepbuy-shadow", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def on_tick(self, code: str, price: float):
+        if not self.running or self._grid is None:
+            return
+        if len(self._queue) >= self._max_queue:
+            self.dropped += 1
+            return
+        self._queue.append((code, price, self._strategy._clock()))  # 틱 도착 시각 (전략 시계 기준)
+        self._wake.set()
+
+    def _worker(self):
+        while self.running:
+            self._wake.wait()
+            self._wake.clear()
+            while self._queue:
+                code, price, ts = self._queue.popleft()
+                try:
+                    with self._lock:
+                        book = self._book(code, price, ts)
+                        if book is not None:
+                            book.tick(price)
+                            self.ticks += 1
+                except Exception as e:
+                    logger.error("[섀도] 틱 처리 오류 (%s): %s", code, e)
+
+    def _roll_day(self, now: datetime):
+        day = now.strftime("%Y-%m-%d")
+        if day != self.day:
+            if self._books:
+                logger.info("[섀도] %s 마감: %s", self.day, self.summary())
+            self._books = {}
+            self.day = day
+
+    def _book(self, code: str, price: float, ts: float):
+        """종목 북 (당일 첫 틱에 라이브 보유/매도가 기준으로 생성, 일자 전환은 틱 시각 기준)"""
+        if self._grid is None:
+            return None
+        self._roll_day(datetime.fromtimestamp(ts))
+        book = self._books.get(code)
+        if book is None:
+            s = self._strategy
+            holding = s.holdings_cache.get(code)
+            if not holding:
+                return None
+            cash = s.SHADOW_CASH / max(1, len(s.holdings_cache))
+            mode = s.get_mode(code)
+            min_hold = s.SAMSUNG_MIN_HOLD_QTY if code in s.SAMSUNG_CODES else 0
+            book = self._book_cls(self._grid, price, holding["qty"], cash,
+                                  mode="trailing" if mode == "trailing" else "fixed",
+                                  cooldown_sec=s.SELL_COOLDOWN_SEC, min_hold=min_hold,
+                                  avg_price=holding["avg_price"],
+                                  last_sell=s.last_sell_prices.get(code, 0),
+                                  last_buy=s.last_buy_prices.get(code, 0))
+            self._books[code] = book
+        return book
+
+    def on_cycle(self, due: datetime):
+        if self._grid is None:
+            return
+        with self._lock:
+            self._roll_day(due)
+            for book in self._books.values():
+                book.cycle(due.timestamp())
+
+    def report(self) -> Dict:
+        """조합별 당일 가상 손익 (pnl 내림차순)"""
+        with self._lock:
+            books = list(self._books.values())
+            configs = list(self._configs)
+        if not books:
+            return {"enabled": self.enabled, "day": self.day, "symbols": 0, "configs": [], "best": None}
+        initial = sum(b.initial for b in books)
+        pnl = sum(b.equity() - b.initial for b in books)
+        traded = sum(b.traded for b in books)
+        buys = sum(b.buys for b in books)
+        sells = sum(b.sells for b in books)
+        rows = [
+            {
+                "label": "live" if i == 0 else "#%d" % i,
+                "params": configs[i],
+                "pnl": round(float(pnl[i])),
+                "return_pct": round(float(pnl[i]) / initial * 100, 3) if initial else 0.0,
+                "turnover": round(float(traded[i]) / initial, 3) if initial else 0.0,
+                "buys": int(buys[i]),
+                "sells": int(sells[i]),
+            }
+            for i in range(len(configs))
+        ]
+        rows.sort(key=lambda r: r["pnl"], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "day": self.day,
+            "symbols": len(books),
+            "ticks": self.ticks,
+            "dropped": self.dropped,
+            "configs": rows,
+            "best": rows[0],
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        best = report["best"]
+        if not best:
+            return "데이터 없음"
+        live = next(r for r in report["configs"] if r["label"] == "live")
+        diff = {k: v for k, v in best["params"].items() if v != live["params"].get(k)}
+        return "최고 %s %s원 (%+.2f%%) %s / 라이브 %s원 (%+.2f%%)" % (
+            best["label"], format(best["pnl"], ","), best["return_pct"], diff or "",
+            format(live["pnl"], ","), live["return_pct"])
+
 
 class SimpleDeepBuyStrategy:
     """단순 딥바이 전략 with 모드 스위칭"""
@@ -32,6 +1602,19 @@ class SimpleDeepBuyStrategy:
     BUY_DROP_PCT = 0.01           # 1% 하락 시 매수 (평단가 기준)
     BUY_DROP_PCT_SELL_REF = 0.015 # 1.5% 하락 시 매수 (매도가 기준)
     CHECK_INTERVAL = 10           # 매수 체크 간격 (분)
+    MARKET_OPEN = (9, 0)          # 장 시작 (시, 분)
+    MARKET_CLOSE = (15, 20)       # 사이클 마지막 시각 (시, 분)
+    TICK_WORKERS = 4              # 실시간 틱 평가 워커 수
+    QUOTE_CONCURRENCY = 5         # 사이클 시세 동시 조회 수 (KIS 초당 호출 제한 고려)
+    QUOTE_CACHE_TTL_SEC = 1.0     # 시세 캐시 유효시간 (초)
+    ORDER_WORKERS = 2             # 동시 주문 제출 수
+    ORDER_CONFIRM_TIMEOUT_SEC = 30  # 체결 확인 제한시간 (초)
+    METRICS_LOG_SEC = 300         # 핫패스 계측 요약 로그 간격 (초)
+    BROADCAST_WINDOW_SEC = 0.3    # 잔고 브로드캐스트 병합 창 (초)
+    BROADCAST_FULL_SEC = 5.0      # delta 구독 중에도 전체 브로드캐스트 유지 주기 (초)
+    SHADOW_GRID: Dict[str, List[float]] = {}  # 섀도 평가 그리드 {"TRAILING_TRIGGER": [0.03, 0.05], ...} (비면 start()에서 DEEP_BUY_SHADOW_GRID 사용)
+    SHADOW_CASH = 10_000_000      # 섀도 가상 현금 (보유 종목 수로 균등 배분)
+    RECORD_TICKS = os.getenv("DEEP_BUY_RECORD_TICKS", "1") == "1"  # 실시간 틱 세그먼트 기록
     
     # === 트레일링 스톱 설정 (trailing 모드) ===
     TRAILING_TRIGGER = 0.04       # +4.0% 수익 시 트레일링 시작
@@ -57,10 +1640,36 @@ class SimpleDeepBuyStrategy:
     # === 매도가 기준 재매수 설정 ===
     REBUY_FROM_SELL_PCT = 0.03    # 매도가 대비 -3% 하락 시 재매수
     
-    def __init__(self):
+    def __init__(self, services: _Services = None, name: str = "default",
+                 params: Dict = None, quote_cache: "_QuoteCache" = None):
+        """
+        services: 외부 서비스 주입 (계좌별 KIS 클라이언트 등)
+        name: 인스턴스 이름 (default 외에는 data/deep_buy/{name}/ 에 저널·상태 분리)
+        params: 클래스 설정값 덮어쓰기 (예: {"TRAILING_TRIGGER": 0.05})
+        quote_cache: 다른 인스턴스와 공유할 시세 캐시 (StrategyRunner)
+        """
+        for key, value in (params or {}).items():
+            if not key.isupper() or not hasattr(type(self), key):
+                raise ValueError(f"Unknown strategy parameter: {key}")
+            setattr(self, key, value)
+        self.name = name
+        self._data_dir = DEEP_BUY_DATA_DIR if name == "default" else os.path.join(DEEP_BUY_DATA_DIR, name)
         self.running = False
         self.kis = None
         
+        # 외부 서비스 (KIS/DB/알림/브로드캐스트) - 호출마다 import 하지 않음
+        self._services = services or _Services()
+        prefix = "[딥바이v3.6] " if name == "default" else "[딥바이v3.6:%s] " % name
+        self._notifier = _NotificationSender(lambda: self._services.notifier, prefix=prefix)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # 앱 이벤트 루프 (start()에서 캡처)
+        self._broadcaster = _PortfolioBroadcaster(self._portfolio_snapshot, self._push_full_portfolio,
+                                                  window_sec=self.BROADCAST_WINDOW_SEC,
+                                                  full_interval_sec=self.BROADCAST_FULL_SEC)
+        
+        # 핫패스 계측 (get_status()["metrics"], METRICS_LOG_SEC마다 로그)
+        self._metrics = _HotPathMetrics()
+        self._tick_ctx = threading.local()  # 평가 중인 틱 수신 시각 (틱→주문 지연용)
+        
         # 🛑 전종목 매매 정지 (킬스위치)
         self._trading_halted = False
         self._dip_buy_enabled = False  # 낙폭매수(신규종목) ON/OFF — 기본 OFF (재기동 시 신규매수 방지)
@@ -70,17 +1679,45 @@ class SimpleDeepBuyStrategy:
         
         # 🔄 매도 모드 (런타임 변경 가능)
         self._sell_mode: SellMode = "trailing"
-        self._mode_lock = threading.Lock()
+        self._mode_lock = _TimedLock(self._metrics.hist("lock_wait.mode_lock"))
         
         # 트레일링 상태
         self.trailing_state: Dict[str, Dict] = {}
         
         # 보유 캐시
         self.holdings_cache: Dict[str, Dict] = {}
-        
+
+        # 실시간 틱 판정 레코드 (trailing 대상 종목만, 통째로 교체)
+        self._tick_records: Dict[str, _TickRecord] = {}
+
+        # 실시간 틱 메일박스 (start() 이후 활성, 그 전에는 콜백에서 직접 평가)
+        self._tick_mailbox = _TickMailbox(self._evaluate_tick, workers=self.TICK_WORKERS)
+
+        # 실시간 틱 기록 (재현/백테스트용, start()에서 시작)
+        self._tick_recorder = TickRecorder(os.path.join(DEEP_BUY_DATA_DIR, "ticks"))
+
+        # 섀도 파라미터 평가 (SHADOW_GRID 설정 시, 주문 없이 가상 손익만)
+        self._shadow = _ShadowEvaluator(self)
+
+        # 사이클 스케줄러 (start()에서 실행)
+        self._scheduler = _CycleScheduler(self._is_market_hours, self._next_market_open)
+
+        # 시세 캐시 (개미떨구기/사이클/트레일링 공용)
+        self._quote_cache = quote_cache or _QuoteCache(lambda code: self.kis.get_stock_quote(code),
+                                                       ttl=self.QUOTE_CACHE_TTL_SEC)
+
         # 매도 락
-        self._sell_lock = threading.Lock()
+        self._sell_lock = _TimedLock(self._metrics.hist("lock_wait.sell_lock"))
         self._selling_codes: set = set()
+        self._buying_codes: set = set()    # 매수 주문 진행 중 종목 (_sell_lock으로 보호)
+        
+        # 주문 파이프라인 (매수/매도 주문은 큐로 넘기고 체결 확인 후 캐시 반영)
+        self._orders = _OrderPipeline(self._get_kis, workers=self.ORDER_WORKERS,
+                                      timeout_sec=self.ORDER_CONFIRM_TIMEOUT_SEC, metrics=self._metrics)
+        
+        # 거래 기록 저널 (로컬 fsync 후 백그라운드 DB 일괄 커밋)
+        self._journal = _TransactionJournal(os.path.join(self._data_dir, "tx_journal.jsonl"),
+                                            self._commit_journal_batch)
         
         # 매도 대기 목록
         self.pending_sells: Dict[str, Dict] = {}
@@ -95,15 +1732,49 @@ class SimpleDeepBuyStrategy:
         # [FIX 2026-02-23] 종목별 매도 쿨다운 (연속 매도 방지)
         self._last_sell_time: Dict[str, float] = {}  # stock_code -> timestamp
         self.SELL_COOLDOWN_SEC = self.CHECK_INTERVAL * 60  # 매도 쿨다운(체크 간격과 동일)
-        self._load_stock_modes_from_db()
-        self._load_last_sell_prices_from_db()
-        self._load_last_sell_times_from_db()
+        self._clock = time.time  # 쿨다운 기준 시계 (백테스트에서 교체)
+        
+        # 상태 저장소 (트레일링 고점/매도 레벨, 쿨다운, 블록 횟수, 매도 대기 → 재시작 시 복원)
+        self._state_store = _StateStore(
+            os.path.join(self._data_dir, "state.bin"),
+            lambda: (self.trailing_state, self._last_sell_time, self.sell_block_count, self.pending_sells),
+        )
+        
+        self._load_initial_state()
+    
+    def _load_initial_state(self):
+        """저널 복구 + DB 초기 로드 + 보유 캐시 (백테스트에서는 오버라이드)"""
+        self._journal.start()
+        self._warm_up_from_db()
+        self._restore_state()
+        self._state_store.start()
         
         # 서버 시작 시 즉시 캐시 초기화 (실시간 콜백 대응)
-        self._load_last_buy_prices_from_db()
         self.update_holdings_cache()
         logger.info("[딥바이] 초기 holdings_cache 로드: %d개", len(self.holdings_cache))
     
+    def _restore_state(self):
+        """상태 저장소 복원 (DB 로드값보다 우선, 매도시각은 더 최근 값)"""
+        try:
+            records, pending = self._state_store.load()
+        except Exception as e:
+            logger.warning("[상태저장] 복원 실패: %s", e)
+            return
+        
+        for code, rec in records.items():
+            if rec.has_trailing:
+                self.trailing_state[code] = rec.to_state(self._create_default_state())
+            if rec.last_sell_time > self._last_sell_time.get(code, 0):
+                self._last_sell_time[code] = rec.last_sell_time
+            if rec.sell_block_count:
+                self.sell_block_count[code] = rec.sell_block_count
+        self.pending_sells.update(pending)
+        
+        if records or pending:
+            active = sum(1 for rec in records.values() if rec.active)
+            logger.info("[상태저장] 복원: %d종목 (활성 트레일링 %d, 매도대기 %d) %.1fms",
+                       len(records), active, len(pending), self._state_store.load_ms)
+    
     # === 모드 관리 API ===
     def get_mode(self, code: str = None) -> SellMode:
         """매도 모드 조회 (종목별 또는 글로벌)"""
@@ -126,7 +1797,8 @@ class SimpleDeepBuyStrategy:
                 
                 # DB에 저장
                 self._save_stock_mode_to_db(code, mode)
-                
+                self._recompile_tick(code)
+
                 return {"success": True, "code": code, "old_mode": old_mode, "new_mode": mode}
             else:
                 # 글로벌 모드 변경
@@ -138,7 +1810,8 @@ class SimpleDeepBuyStrategy:
                     logger.info("[딥바이] 글로벌 모드: %s → %s (트레일링 초기화)", old_mode, mode)
                 else:
                     logger.info("[딥바이] 글로벌 모드: %s → %s", old_mode, mode)
-                
+                self._compile_tick_records()
+
                 return {"success": True, "old_mode": old_mode, "new_mode": mode}
     
     def clear_stock_mode(self, code: str) -> Dict:
@@ -147,6 +1820,7 @@ class SimpleDeepBuyStrategy:
             if code in self.stock_sell_modes:
                 old_mode = self.stock_sell_modes.pop(code)
                 self._save_stock_mode_to_db(code, None)  # DB에서도 삭제
+                self._recompile_tick(code)
                 return {"success": True, "code": code, "removed_mode": old_mode}
             return {"success": False, "message": f"{code} 종목별 모드 없음"}
     
@@ -155,112 +1829,89 @@ class SimpleDeepBuyStrategy:
         with self._mode_lock:
             return self.stock_sell_modes.copy()
     
-    def _load_stock_modes_from_db(self):
-        """DB에서 종목별 매도 모드 로드"""
+    def _warm_up_from_db(self):
+        """시작 시 DB 일괄 로드 (세션 1개, 종목별 반복 조회 없음)
+
+        - 종목별 매도 모드 (DeepBuyTarget)
+        - 보유 종목별 마지막 매도가/매도시각, 직전 매수가 (Transaction 윈도우 쿼리 1회)
+        """
         try:
-            from backend.database import SessionLocal
+            from sqlalchemy import func
             from backend.models.deep_buy_target import DeepBuyTarget
+            from backend.models.transaction import Transaction
+            from backend.models.holding import Holding
             
-            db = SessionLocal()
+            db = self._services.session_factory()
             try:
-                targets = db.query(DeepBuyTarget).filter(
+                # 1. 종목별 매도 모드
+                targets = db.query(DeepBuyTarget.stock_code, DeepBuyTarget.sell_mode).filter(
                     DeepBuyTarget.is_active == True,
                     DeepBuyTarget.sell_mode != None
                 ).all()
-                
-                for t in targets:
-                    if t.sell_mode in ("trailing", "fixed"):
-                        self.stock_sell_modes[t.stock_code] = t.sell_mode
-                
+                for stock_code, sell_mode in targets:
+                    if sell_mode in ("trailing", "fixed"):
+                        self.stock_sell_modes[stock_code] = sell_mode
                 if self.stock_sell_modes:
                     logger.info("[딥바이] DB에서 종목별 모드 로드: %s", self.stock_sell_modes)
-            finally:
-                db.close()
-        except Exception as e:
-            logger.warning("[딥바이] 종목별 모드 로드 실패: %s", e)
-    
-    def _load_last_sell_prices_from_db(self):
-        """DB에서 최근 매도가 로드 (마지막 매수 이후 매도가만 참조)"""
-        try:
-            from backend.database import SessionLocal
-            from backend.models.transaction import Transaction
-            from backend.models.holding import Holding
-            
-            db = SessionLocal()
-            try:
-                # 1. 현재 보유 중인 종목 조회
-                holdings = db.query(Holding).filter(Holding.quantity > 0).all()
-                held_codes = {h.stock_code for h in holdings}
                 
+                # 2. 현재 보유 중인 종목
+                held_codes = {
+                    code for (code,) in db.query(Holding.stock_code).filter(Holding.quantity > 0).distinct()
+                }
                 if not held_codes:
-                    logger.info("[딥바이] 보유 종목 없음 - 매도가 로드 스킵")
+                    logger.info("[딥바이] 보유 종목 없음 - 매도가/매수가 로드 스킵")
                     return
                 
-                # 2. 각 보유 종목의 마지막 매수/매도 비교 후 매도가 로드
-                for code in held_codes:
-                    last_sell = db.query(Transaction).filter(
-                        Transaction.stock_code == code,
-                        Transaction.transaction_type == "SELL"
-                    ).order_by(Transaction.transaction_date.desc()).first()
-                    
-                    last_buy = db.query(Transaction).filter(
-                        Transaction.stock_code == code,
-                        Transaction.transaction_type == "BUY"
-                    ).order_by(Transaction.transaction_date.desc()).first()
-                    
-                    if last_sell:
+                # 3. 종목·매매구분별 최신 거래 1건 (ROW_NUMBER 윈도우)
+                ranked = db.query(
+                    Transaction.stock_code,
+                    Transaction.transaction_type,
+                    Transaction.price,
+                    Transaction.transaction_date,
+                    func.row_number().over(
+                        partition_by=(Transaction.stock_code, Transaction.transaction_type),
+                        order_by=Transaction.transaction_date.desc(),
+                    ).label("rn"),
+                ).filter(
+                    Transaction.stock_code.in_(held_codes),
+                    Transaction.transaction_type.in_(("BUY", "SELL")),
+                ).subquery()
+                latest = db.query(
+                    ranked.c.stock_code, ranked.c.transaction_type,
+                    ranked.c.price, ranked.c.transaction_date,
+                ).filter(ranked.c.rn == 1).all()
+                
+                for code, tx_type, price, tx_date in latest:
+                    if tx_type == "SELL":
                         # [FIX 2026-02-26] 매도가는 항상 로드 (추가매수해도 매도 기준 유지)
-                        self.last_sell_prices[code] = last_sell.price
-                        logger.debug("[딥바이] %s 매도가 로드: %s (체결일: %s)", 
-                                    code, last_sell.price, last_sell.transaction_date)
+                        self.last_sell_prices[code] = price
+                        if tx_date:
+                            # 재시작 직후 연속매도 방지
+                            self._last_sell_time[code] = tx_date.timestamp()
+                    else:
+                        self.last_buy_prices[code] = price
                 
                 if self.last_sell_prices:
                     logger.info("[딥바이] 매도가 로드 완료: %s", self.last_sell_prices)
                 else:
                     logger.info("[딥바이] 매도 기록 없음 (또는 모두 새 포지션)")
-            finally:
-                db.close()
-        except Exception as e:
-            logger.warning("[딥바이] 최근 매도가 로드 실패: %s", e)
-
-    def _load_last_sell_times_from_db(self):
-        """DB에서 최근 매도 시각 로드 (재시작 직후 연속매도 방지)"""
-        try:
-            from backend.database import SessionLocal
-            from backend.models.transaction import Transaction
-            from backend.models.holding import Holding
-
-            db = SessionLocal()
-            try:
-                holdings = db.query(Holding).filter(Holding.quantity > 0).all()
-                held_codes = {h.stock_code for h in holdings}
-                if not held_codes:
-                    return
-
-                for code in held_codes:
-                    last_sell = db.query(Transaction).filter(
-                        Transaction.stock_code == code,
-                        Transaction.transaction_type == "SELL"
-                    ).order_by(Transaction.transaction_date.desc()).first()
-
-                    if last_sell and last_sell.transaction_date:
-                        self._last_sell_time[code] = last_sell.transaction_date.timestamp()
-
                 if self._last_sell_time:
                     logger.info("[딥바이] 최근 매도시각 로드 완료: %s", {k:int(v) for k,v in self._last_sell_time.items()})
+                if self.last_buy_prices:
+                    logger.info("[딥바이] 직전 매수가 로드 완료: %s", 
+                               {k: f"{v:,.0f}" for k, v in self.last_buy_prices.items()})
             finally:
                 db.close()
         except Exception as e:
-            logger.warning("[딥바이] 최근 매도시각 로드 실패: %s", e)
+            logger.warning("[딥바이] DB 초기 로드 실패: %s", e)
 
 
     def load_all_targets_from_db(self):
         """DB에서 모든 딥바이 대상 종목 로드하여 trailing_state에 추가"""
         try:
-            from backend.database import SessionLocal
             from backend.models.deep_buy_target import DeepBuyTarget
             
-            db = SessionLocal()
+            db = self._services.session_factory()
             try:
                 targets = db.query(DeepBuyTarget).filter(DeepBuyTarget.is_active == True).all()
                 
@@ -285,10 +1936,9 @@ class SimpleDeepBuyStrategy:
     def _save_stock_mode_to_db(self, code: str, mode: str):
         """DB에 종목별 매도 모드 저장"""
         try:
-            from backend.database import SessionLocal
             from backend.models.deep_buy_target import DeepBuyTarget
             
-            db = SessionLocal()
+            db = self._services.session_factory()
             try:
                 target = db.query(DeepBuyTarget).filter(
                     DeepBuyTarget.stock_code == code
@@ -334,10 +1984,42 @@ class SimpleDeepBuyStrategy:
     def set_dip_buy_enabled(self, enabled: bool):
         self._dip_buy_enabled = enabled
         logger.info("[낙폭매수] %s", "활성화" if enabled else "비활성화")
+    
+    # === 섀도 평가 API ===
+    def set_shadow_grid(self, grid: Dict[str, List[float]]) -> Dict:
+        """섀도 평가 그리드 변경 (당일 누적은 초기화, 빈 dict면 중지)"""
+        try:
+            configs = self._shadow.configure(grid)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        if configs and self.running:
+            self._shadow.start()
+        return {"success": True, "configs": len(configs)}
+    
+    @staticmethod
+    def _load_shadow_grid_env() -> Dict[str, List[float]]:
+        """DEEP_BUY_SHADOW_GRID 환경변수 파싱 (형식 오류면 경고 후 빈 그리드 = 섀도 비활성화)"""
+        raw = os.getenv("DEEP_BUY_SHADOW_GRID", "").strip()
+        if not raw:
+            return {}
+        try:
+            grid = json.loads(raw)
+        except ValueError as e:
+            logger.warning("[섀도] 비활성화 (DEEP_BUY_SHADOW_GRID JSON 오류): %s", e)
+            return {}
+        if not isinstance(grid, dict):
+            logger.warning("[섀도] 비활성화 (DEEP_BUY_SHADOW_GRID는 {파라미터: [값, ...]} 형식이어야 함)")
+            return {}
+        return grid
+    
+    def get_shadow_report(self) -> Dict:
+        """섀도 조합별 당일 가상 손익"""
+        return self._shadow.report()
 
     def get_status(self) -> Dict:
         """전략 상태 조회"""
         return {
+            "name": self.name,
             "running": self.running,
             "sell_mode": self.get_mode(),
             "stock_sell_modes": self.get_all_stock_modes(),
@@ -347,6 +2029,17 @@ class SimpleDeepBuyStrategy:
             "trailing_state": self.get_trailing_status(),
             "pending_sells_count": len(self.pending_sells),
             "pending_sells": self.get_pending_sells(),
+            "tick_mailbox": self._tick_mailbox.get_stats(),
+            "quote_cache": self._quote_cache.get_stats(),
+            "scheduler": self._scheduler.get_stats(),
+            "orders": self._orders.get_stats(),
+            "tx_journal": self._journal.get_stats(),
+            "tick_recorder": self._tick_recorder.get_stats(),
+            "state_store": self._state_store.get_stats(),
+            "metrics": self._metrics.snapshot(),
+            "notifier": self._notifier.get_stats(),
+            "broadcast": self._broadcaster.get_stats(),
+            "shadow": {k: v for k, v in self._shadow.report().items() if k != "configs"},
             "settings": {
                 "buy_drop_pct": self.BUY_DROP_PCT,
                 "trailing_trigger": self.TRAILING_TRIGGER,
@@ -360,47 +2053,10 @@ class SimpleDeepBuyStrategy:
         }
     
     # === 보유 정보 캐시 ===
-    def _load_last_buy_prices_from_db(self):
-        """DB에서 보유 종목별 직전 매수가 로드"""
-        try:
-            from backend.database import SessionLocal
-            from backend.models.transaction import Transaction
-            from backend.models.holding import Holding
-            
-            db = SessionLocal()
-            try:
-                holdings = db.query(Holding).filter(Holding.quantity > 0).all()
-                held_codes = {h.stock_code for h in holdings}
-                
-                if not held_codes:
-                    return
-                
-                for code in held_codes:
-                    last_buy = db.query(Transaction).filter(
-                        Transaction.stock_code == code,
-                        Transaction.transaction_type == "BUY"
-                    ).order_by(Transaction.transaction_date.desc()).first()
-                    
-                    if last_buy:
-                        self.last_buy_prices[code] = last_buy.price
-                        logger.debug("[딥바이] %s 직전 매수가 로드: %s", code, last_buy.price)
-                
-                if self.last_buy_prices:
-                    logger.info("[딥바이] 직전 매수가 로드 완료: %s", 
-                               {k: f"{v:,.0f}" for k, v in self.last_buy_prices.items()})
-            finally:
-                db.close()
-        except Exception as e:
-            logger.warning("[딥바이] 직전 매수가 로드 실패: %s", e)
-
     def update_holdings_cache(self):
         """잔고 조회하여 캐시 업데이트"""
         try:
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
-            balance = self.kis.get_account_balance()
+            balance = self._get_kis().get_account_balance()
             if not balance:
                 return
             
@@ -422,106 +2078,240 @@ class SimpleDeepBuyStrategy:
             
             # 딥바이 대상 종목도 trailing_state에 추가
             self.load_all_targets_from_db()
-            
+            self._compile_tick_records()
+
         except Exception as e:
             logger.error("[딥바이v3.6] 보유 캐시 업데이트 실패: %s", e)
     
+    def _is_synced_account(self) -> bool:
+        """RealAccountService가 동기화하는 브로커가 이 인스턴스의 kis인지 (다른 계좌의 diff 차단)"""
+        try:
+            return self._services.real_account.broker() is self._get_kis()
+        except Exception:
+            return False
+    
+    def apply_holdings_diff(self, diff: Dict):
+        """sync_holdings diff 이벤트 증분 반영 (변경 종목만 캐시·틱 레코드 갱신)"""
+        if not self._is_synced_account():
+            return  # 동기화 중 브로커가 바뀐 경우 등 - 이 인스턴스 계좌의 diff가 아님
+        try:
+            cache = dict(self.holdings_cache)
+            changed = []
+            added = False
+            for code, h in diff.get("upserted", {}).items():
+                qty = h.get("quantity", 0)
+                avg_price = float(h.get("average_price", 0))
+                if qty > 0 and avg_price > 0:
+                    added = added or code not in cache
+                    cache[code] = {"qty": qty, "avg_price": avg_price, "name": h.get("stock_name", code)}
+                else:
+                    cache.pop(code, None)
+                changed.append(code)
+            for code in diff.get("removed", []):
+                cache.pop(code, None)
+                changed.append(code)
+            if not changed:
+                return
+            
+            self.holdings_cache = cache
+            if added:
+                # 신규 보유 종목이 딥바이 대상이면 trailing_state 준비
+                self.load_all_targets_from_db()
+            for code in changed:
+                self._recompile_tick(code)
+            logger.info("[딥바이v3.6] 보유 diff 반영: %s", changed)
+        except Exception as e:
+            logger.error("[딥바이v3.6] 보유 diff 반영 실패: %s", e)
+    
+    # === 실시간 틱 판정 레코드 ===
+    def _compile_tick_record(self, code: str) -> Optional[_TickRecord]:
+        """종목별 임계가 사전계산 (trailing 대상이 아니면 None)"""
+        holding = self.holdings_cache.get(code)
+        if not holding:
+            return None
+        mode = self.stock_sell_modes.get(code, self._sell_mode)
+        if mode in ("fixed", "virtual"):
+            return None
+
+        avg_price = holding["avg_price"]
+        qty = holding["qty"]
+        if avg_price <= 0 or qty <= 0:
+            return None
+
+        rec = _TickRecord(code, holding.get("name", code), qty, avg_price)
+        rec.trigger_price = avg_price * (1 + self.TRAILING_TRIGGER)
+        rec.deactivate_price = avg_price * (1 + 0.005)
+
+        # [FIX 2026-02-27] 매도 기록 있으면 항상 매도가 기준 (수익/손실 구분 제거)
+        last_sell = self.last_sell_prices.get(code, 0)
+        if last_sell > 0:
+            rec.buy_ref_price = last_sell
+            rec.buy_ref_label = "매도가"
+            rec.buy_price = last_sell * (1 - self.BUY_DROP_PCT_SELL_REF)
+            # 매도가 기준 매수 시 갭 체크: 평단가 < 현재가 ≤ 평단가 × 1.002 이면 매수 안 함
+            rec.gap_price = avg_price * (1 + 0.002)
+        else:
+            rec.buy_ref_price = avg_price
+            rec.buy_price = avg_price * (1 - self.BUY_DROP_PCT)
+
+        # [FIX 2026-02-24] 직전 매수가 이상이면 매수 블록
+        # [FIX 2026-02-25] 직전매수가-평단가 갭 1.5% 초과 시 블록 무시
+        last_buy_price = self.last_buy_prices.get(code, 0)
+        if last_buy_price > 0:
+            rec.last_buy_price = last_buy_price
+            rec.last_buy_gap = abs(avg_price - last_buy_price) / avg_price
+            if rec.last_buy_gap <= 0.015:
+                rec.last_buy_block_price = last_buy_price
+
+        state = self.trailing_state.get(code)
+        if state is not None:
+            rec.state = state
+            rec.active = bool(state.get("active"))
+            rec.peak_price = state.get("peak_price", 0) or 0
+            self._refresh_tick_sell_price(rec)
+        return rec
+
+    def _compile_tick_records(self):
+        """전체 틱 레코드 재계산 (새 테이블로 통째 교체 → 콜백 쪽 락 불필요)"""
+        records = {}
+        for code in list(self.holdings_cache):
+            rec = self._compile_tick_record(code)
+            if rec is not None:
+                records[code] = rec
+        self._tick_records = records
+
+    def _recompile_tick(self, code: str):
+        """단일 종목 틱 레코드 재계산"""
+        rec = self._compile_tick_record(code)
+        records = dict(self._tick_records)
+        if rec is None:
+            records.pop(code, None)
+        else:
+            records[code] = rec
+        self._tick_records = records
+
+    def _build_sell_ladder(self, code: str, peak: float, avg_price: float, qty: int) -> _SellLadder:
+        """분할매도 사다리 생성 (최소 수익 +0.5% 가격 아래 칸은 만들지 않음)"""
+        max_sell = qty - self.SAMSUNG_MIN_HOLD_QTY if code in self.SAMSUNG_CODES else None
+        return _SellLadder(peak, qty, self.TRAILING_SELL_START, self.TRAILING_SELL_STEP,
+                           floor_price=avg_price * (1 + 0.005), max_sell=max_sell)
+
+    def _refresh_tick_sell_price(self, rec: _TickRecord):
+        """다음 분할매도 칸 가격 (사다리는 고점·수량이 바뀐 경우에만 재생성)"""
+        if not rec.active or rec.peak_price <= 0:
+            rec.sell_price = 0.0
+            rec.ladder = None
+            return
+        ladder = rec.ladder
+        if ladder is None or ladder.peak != rec.peak_price or ladder.qty != rec.qty:
+            ladder = rec.ladder = self._build_sell_ladder(rec.code, rec.peak_price, rec.avg_price, rec.qty)
+        last_level = rec.state.get("last_sold_drop_level", 0) if rec.state else 0
+        i = ladder.next_index(last_level)
+        rec.sell_price = ladder.prices[i] if i < len(ladder.prices) else 0.0
+
+    def _tick_should_buy(self, rec: _TickRecord, current_price: float) -> bool:
+        """매수 우선 조건 (사전계산된 임계가 비교)"""
+        if current_price > rec.buy_price:
+            return False
+        if rec.gap_price and rec.avg_price < current_price <= rec.gap_price:
+            return False
+        if current_price >= rec.last_buy_block_price:
+            return False
+        if rec.last_buy_price > 0 and current_price >= rec.last_buy_price:
+            logger.info('[트레일링v4] %s 직전매수가-평단가 갭 %.1f%% > 1.5%% → 직전매수 블록 무시', rec.name, rec.last_buy_gap * 100)
+        return True
+
     # === 실시간 가격 업데이트 (웹소켓) ===
-    def on_realtime_price(self, code: str, current_price: float):
-        """실시간 가격 콜백 - trailing 모드 종목에서만 동작 (v4: 고점 대비 분할매도)"""
+    @_timed("on_realtime_price")
+    def on_realtime_price(self, code: str, current_price: float, volume: int = 0):
+        """실시간 가격 콜백 - 메일박스 경유 (웹소켓 스레드는 주문 대기 없이 즉시 반환)"""
+        arrived = time.perf_counter()
+        self._tick_recorder.record(code, current_price, volume)
+        self._shadow.on_tick(code, current_price)
+        if self._trading_halted or code not in self._tick_records:
+            return
+        if self._tick_mailbox.running:
+            self._tick_mailbox.submit(code, current_price, arrived)
+        else:
+            self._evaluate_tick(code, current_price, arrived)
+
+    @_timed("evaluate_tick")
+    def _evaluate_tick(self, code: str, current_price: float, arrived: float = None):
+        """틱 평가 - trailing 모드 종목에서만 동작 (v4: 고점 대비 분할매도)"""
         
         # 🛑 킬스위치 체크
         if self._trading_halted:
             return
         
-        # [FIX 2026-02-23] 종목별 모드 체크 (글로벌 모드가 trailing이어도 fixed/virtual 종목은 제외)
-        if self.get_mode(code) in ("fixed", "virtual"):
+        # [FIX 2026-02-23] fixed/virtual 종목·미보유 종목은 레코드 없음
+        rec = self._tick_records.get(code)
+        if rec is None:
             return
         
+        if arrived is not None:
+            self._metrics.record("tick_queue", (time.perf_counter() - arrived) * 1000)
+        self._tick_ctx.arrived = arrived
         try:
-            holding = self.holdings_cache.get(code)
-            if not holding:
-                return
-            
-            avg_price = holding["avg_price"]
-            qty = holding["qty"]
-            name = holding.get("name", code)
-            
-            if avg_price <= 0 or qty <= 0:
-                return
-            
-            state = self.trailing_state.get(code, self._create_default_state())
-            profit_pct = (current_price - avg_price) / avg_price
-            
             # 활성화 조건: 수익률 >= TRAILING_TRIGGER
-            if profit_pct >= self.TRAILING_TRIGGER:
-                if not state["active"]:
-                    # 트레일링 활성화
-                    state["active"] = True
-                    state["peak_price"] = current_price
-                    state["last_sold_drop_level"] = 0
-                    self.trailing_state[code] = state
-                    logger.info("[트레일링v4] 🎯 %s 활성화! 고점=%s (수익 +%.2f%%)", 
-                               name, format(int(current_price), ","), profit_pct * 100)
+            if current_price >= rec.trigger_price:
+                if not rec.active:
+                    self._activate_trailing(rec, current_price)
                 
-                elif current_price > state["peak_price"]:
+                elif current_price > rec.peak_price:
                     # 고점 갱신 → 매도 레벨 리셋
-                    old_peak = state["peak_price"]
-                    state["peak_price"] = current_price
-                    state["last_sold_drop_level"] = 0
-                    self.trailing_state[code] = state
+                    old_peak = rec.peak_price
+                    rec.peak_price = current_price
+                    rec.state["peak_price"] = current_price
+                    rec.state["last_sold_drop_level"] = 0
+                    self._refresh_tick_sell_price(rec)
                     if current_price > old_peak * 1.002:  # 0.2% 이상 갱신 시만 로그
                         logger.info("[트레일링v4] 📈 %s 고점 갱신! %s → %s", 
-                                   name, format(int(old_peak), ","), format(int(current_price), ","))
+                                   rec.name, format(int(old_peak), ","), format(int(current_price), ","))
                 
-                else:
-                    # [FIX 2026-02-27] 매도 기록 있으면 항상 매도가 기준 (수익/손실 구분 제거)
-                    last_sell = self.last_sell_prices.get(code, 0)
-                    is_profitable = current_price > avg_price
-                    if last_sell > 0:
-                        buy_ref_price = last_sell
-                        buy_ref_label = "매도가"
-                    else:
-                        buy_ref_price = avg_price
-                        buy_ref_label = "평단가"
-                    drop_from_ref = (buy_ref_price - current_price) / buy_ref_price if buy_ref_price > 0 else 0
-                    buy_drop_threshold = self.BUY_DROP_PCT_SELL_REF if buy_ref_label == "매도가" else self.BUY_DROP_PCT
-                    should_buy = drop_from_ref >= buy_drop_threshold
-
-                    # [FIX 2026-02-27] 매도가 기준 매수 시 갭 체크: 수익 중일 때만 적용
-                    # 손실 중(현재가 ≤ 평단가)이면 갭 체크 없이 물타기 허용
-                    if should_buy and buy_ref_label == "매도가" and current_price > avg_price:
-                        price_gap = (current_price - avg_price) / avg_price if avg_price > 0 else 0
-                        if price_gap <= 0.002:
-                            should_buy = False
-
-                    # [FIX 2026-02-24] 직전 매수가보다 현재가가 낮을 때만 매수
-                    # [FIX 2026-02-25] 직전매수가-평단가 갭 1.5% 초과 시 블록 무시
-                    if should_buy:
-                        last_buy_price = self.last_buy_prices.get(code, 0)
-                        if last_buy_price > 0 and current_price >= last_buy_price:
-                            buy_avg_gap = abs(avg_price - last_buy_price) / avg_price if avg_price > 0 else 0
-                            if buy_avg_gap > 0.015:
-                                logger.info('[트레일링v4] %s 직전매수가-평단가 갭 %.1f%% > 1.5%% → 직전매수 블록 무시', name, buy_avg_gap * 100)
-                            else:
-                                should_buy = False
-
-                    if should_buy:
-                        logger.info("[트레일링v4] %s 매수 조건 충족(%.2f%% 하락) → 트레일링 매도 스킵", name, drop_from_ref * 100)
+                elif current_price <= rec.sell_price:
+                    # 다음 매도 레벨 도달 시에만 매수 우선 조건 확인
+                    if self._tick_should_buy(rec, current_price):
+                        drop_from_ref = (rec.buy_ref_price - current_price) / rec.buy_ref_price
+                        logger.info("[트레일링v4] %s 매수 조건 충족(%.2f%% 하락) → 트레일링 매도 스킵", rec.name, drop_from_ref * 100)
                     else:
                         # 고점 대비 하락 체크 → 분할매도
-                        self._check_trailing_sell(code, name, current_price, avg_price, qty, state)
+                        self._check_trailing_sell(code, rec.name, current_price, rec.avg_price, rec.qty, rec.state)
+                        self._refresh_tick_sell_price(rec)
             
-            elif state.get("active") and profit_pct < 0.005:
+            elif rec.active and current_price < rec.deactivate_price:
                 # 수익률 0.5% 미만으로 떨어지면 트레일링 비활성화
-                state["active"] = False
-                state["peak_price"] = 0
-                state["last_sold_drop_level"] = 0
-                self.trailing_state[code] = state
-                logger.info("[트레일링v4] ❌ %s 비활성화 (수익 +%.2f%% < 0.5%%)", name, profit_pct * 100)
+                rec.active = False
+                rec.peak_price = 0.0
+                rec.sell_price = 0.0
+                rec.state["active"] = False
+                rec.state["peak_price"] = 0
+                rec.state["last_sold_drop_level"] = 0
+                profit_pct = (current_price - rec.avg_price) / rec.avg_price
+                logger.info("[트레일링v4] ❌ %s 비활성화 (수익 +%.2f%% < 0.5%%)", rec.name, profit_pct * 100)
                 
         except Exception as e:
             logger.error("[트레일링v4] 실시간 가격 처리 오류 (%s): %s", code, e)
+        finally:
+            self._tick_ctx.arrived = None
+
+    def _activate_trailing(self, rec: _TickRecord, current_price: float):
+        """트레일링 활성화 (상태 dict는 이때만 생성)"""
+        state = rec.state
+        if state is None:
+            state = self.trailing_state.get(rec.code)
+            if state is None:
+                state = self._create_default_state()
+                self.trailing_state[rec.code] = state
+            rec.state = state
+        state["active"] = True
+        state["peak_price"] = current_price
+        state["last_sold_drop_level"] = 0
+        rec.active = True
+        rec.peak_price = current_price
+        self._refresh_tick_sell_price(rec)
+        profit_pct = (current_price - rec.avg_price) / rec.avg_price
+        logger.info("[트레일링v4] 🎯 %s 활성화! 고점=%s (수익 +%.2f%%)", 
+                   rec.name, format(int(current_price), ","), profit_pct * 100)
     
     def _create_default_state(self) -> Dict:
         return {
@@ -534,6 +2324,7 @@ class SimpleDeepBuyStrategy:
             "last_sold_drop_level": 0,  # 마지막 매도 발생 하락 레벨
         }
     
+    @_timed("check_trailing_sell")
     def _check_trailing_sell(self, code: str, name: str, current_price: float,
                             avg_price: float, qty: int, state: dict):
         """고점 대비 하락폭 비례 분할매도 (v4 트레일링)"""
@@ -541,29 +2332,35 @@ class SimpleDeepBuyStrategy:
         if peak <= 0:
             return
         
-        drop_from_peak = (peak - current_price) / peak
+        # 사전계산 사다리 (틱 레코드와 고점·수량이 같으면 재사용)
+        rec = self._tick_records.get(code)
+        ladder = rec.ladder if rec is not None else None
+        if ladder is None or ladder.peak != peak or ladder.qty != qty:
+            ladder = self._build_sell_ladder(code, peak, avg_price, qty)
         
-        if drop_from_peak < self.TRAILING_SELL_START:
+        i = ladder.reached(current_price)
+        if i < 0:
             return
         
-        # 현재 하락 레벨 (0.5% 단위)
-        current_level = int(drop_from_peak / self.TRAILING_SELL_STEP)
+        # 현재 하락 레벨 (TRAILING_SELL_STEP 단위)
+        current_level = ladder.levels[i]
         last_level = state.get("last_sold_drop_level", 0)
         
         if current_level <= last_level:
             return  # 이미 이 레벨에서 매도함
         
-        # 매도 수량 계산: 하락폭 비례 (고점 대비 -1% → 보유의 10%)
-        sell_ratio = min(0.3, drop_from_peak * 10)
-        sell_qty = max(1, round(qty * sell_ratio))
+        drop_from_peak = (peak - current_price) / peak
+        
+        # 최소 보유 체크 (삼성 종목은 매도 가능 수량이 없으면 사다리 수량 0)
+        if ladder.qtys[i] <= 0:
+            logger.info("[트레일링v4] %s 최소 보유 유지 (현재 %d주)", name, qty)
+            return
         
-        # 최소 보유 체크 (삼성 종목)
+        # 매도 수량: 하락폭 비례 (고점 대비 -1% → 보유의 10%)
+        # 사다리 수량은 트리거가 기준 → 갭 하락으로 더 내려온 경우 실제 하락폭으로 계산
+        sell_qty = max(1, round(qty * min(0.3, drop_from_peak * 10)))
         if code in self.SAMSUNG_CODES:
-            max_sell = qty - self.SAMSUNG_MIN_HOLD_QTY
-            if max_sell <= 0:
-                logger.info("[트레일링v4] %s 최소 보유 유지 (현재 %d주)", name, qty)
-                return
-            sell_qty = min(sell_qty, max_sell)
+            sell_qty = min(sell_qty, qty - self.SAMSUNG_MIN_HOLD_QTY)
         
         # 수익 체크: 평단 대비 수익이 있을 때만 매도
         profit_pct = (current_price - avg_price) / avg_price
@@ -575,55 +2372,81 @@ class SimpleDeepBuyStrategy:
                    name, format(int(peak), ","), drop_from_peak * 100,
                    last_level, current_level, sell_qty)
         
-        # 매도 실행
-        self._execute_trailing_sell(code, name, current_price, avg_price, sell_qty, drop_from_peak)
+        # 매도 실행 (주문 진행 중이라 접수 못 했으면 레벨 유지 → 다음 틱에서 재시도)
+        if not self._execute_trailing_sell(code, name, current_price, avg_price, sell_qty, drop_from_peak):
+            return
         
         # 상태 업데이트
         state["last_sold_drop_level"] = current_level
         self.trailing_state[code] = state
     
     def _execute_trailing_sell(self, code: str, name: str, current_price: float,
-                               avg_price: float, sell_qty: int, drop_from_peak: float):
-        """트레일링 분할매도 실행"""
+                               avg_price: float, sell_qty: int, drop_from_peak: float) -> bool:
+        """트레일링 분할매도 주문 요청 (체결 확인 후 _on_sell_done에서 반영, 접수 여부 반환)"""
+        profit_pct = (current_price - avg_price) / avg_price
+        message = "📉 트레일링 매도: %s %d주 @ %s원 (고점 -%.1f%%, 수익 +%.1f%%)" % (
+            name, sell_qty, format(int(current_price), ","), drop_from_peak * 100, profit_pct * 100)
+        if not self._submit_sell(code, name, sell_qty, current_price, "trailing", message):
+            return False
+        logger.info("[트레일링v4] 📤 %s %d주 매도 주문 요청 (고점 대비 -%.1f%%, 수익 +%.2f%%)",
+                   name, sell_qty, drop_from_peak * 100, profit_pct * 100)
+        return True
+    
+    def _submit_sell(self, code: str, name: str, qty: int, ref_price: float,
+                     kind: str, message: str) -> bool:
+        """시장가 매도 주문을 파이프라인에 넣음 (같은 종목 주문 진행 중이면 False)"""
+        with self._sell_lock:
+            if code in self._selling_codes:
+                return False
+            self._selling_codes.add(code)
+        intent = _OrderIntent(code, name, "SELL", qty, ref_price, kind, message, self._on_sell_done)
+        intent.tick_at = getattr(self._tick_ctx, "arrived", None)
+        self._orders.submit(intent)
+        return True
+    
+    def _on_sell_done(self, intent: _OrderIntent):
+        """매도 주문 종료 콜백 - 체결 확인분으로 매도가/보유 캐시 갱신"""
+        code, name = intent.code, intent.name
         try:
-            with self._sell_lock:
-                if code in self._selling_codes:
-                    return
-                self._selling_codes.add(code)
+            if intent.status not in ("filled", "unconfirmed"):
+                logger.warning("[딥바이v3.6] ❌ %s 매도 실패: %s", name, intent.error)
+                return
             
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
+            if intent.status == "unconfirmed":
+                # 체결 확인 전에는 매도가·보유 캐시·거래 기록을 추정값으로 바꾸지 않음
+                # → 실제 잔고로 재동기화 (체결분은 잔고 diff 이벤트/거래내역 동기화로 반영)
+                logger.warning("[딥바이v3.6] ⚠️ %s 매도 체결 미확인 (%d초) → 잔고 재조회로 확인 (주문번호 %s)",
+                              name, self.ORDER_CONFIRM_TIMEOUT_SEC, intent.order_no)
+                self._send_notification_sync(intent.message + " [체결 미확인]")
+                self.update_holdings_cache()
+                self._broadcast_portfolio_sync()
+                return
             
-            result = self.kis.send_order(code, sell_qty, 0, "1", "01")  # 시장가 매도
+            sold_qty = intent.filled_qty
+            price = intent.fill_price or intent.ref_price
+            logger.info("[딥바이v3.6] ✅ %s %d주 매도 체결 @ %s원 (%s, 주문번호 %s)",
+                       name, sold_qty, format(int(price), ","), intent.kind, intent.order_no)
+            self._send_notification_sync(intent.message)
             
-            if result and result.get("order_no"):
-                profit_pct = (current_price - avg_price) / avg_price
-                logger.info("[트레일링v4] ✅ %s %d주 매도 완료 (고점 대비 -%.1f%%, 수익 +%.2f%%)",
-                           name, sell_qty, drop_from_peak * 100, profit_pct * 100)
-                
-                self._send_notification_sync(
-                    "📉 트레일링 매도: %s %d주 @ %s원 (고점 -%.1f%%, 수익 +%.1f%%)" %
-                    (name, sell_qty, format(int(current_price), ","), 
-                     drop_from_peak * 100, profit_pct * 100)
-                )
-                self._save_transaction(code, name, "SELL", sell_qty, current_price, order_no=result.get("order_no"))
-                self.last_sell_prices[code] = current_price
-                
-                # 보유 캐시 업데이트
-                if code in self.holdings_cache:
-                    self.holdings_cache[code]["qty"] -= sell_qty
-                
-                # 포트폴리오 업데이트 브로드캐스트
-                try:
-                    from backend.services.kis_api_service import kis_api_service
-                    kis_api_service.broadcast_portfolio_update()
-                except Exception:
-                    pass
-            else:
-                logger.warning("[트레일링v4] ❌ %s 매도 실패: %s", name, result)
-        except Exception as e:
-            logger.error("[트레일링v4] 매도 오류 (%s): %s", name, e)
+            self._save_transaction(code, name, "SELL", sold_qty, price, order_no=intent.order_no)
+            self.last_sell_prices[code] = price
+            
+            # [FIX 2026-02-25] 고정매도/트레일링매도 후 신고가 기준도 동기화
+            if code in self.trailing_state:
+                prev_peak_sell = self.trailing_state[code].get("last_peak_sell_price", 0)
+                self.trailing_state[code]["last_peak_sell_price"] = max(prev_peak_sell, price)
+            
+            # [FIX 2026-02-23] 매도 쿨다운 타임스탬프 기록 (고정매도/신고가매도, 체결 기준)
+            if intent.kind in ("fixed", "peak"):
+                self._last_sell_time[code] = self._clock()
+            
+            # 보유 캐시 업데이트
+            if code in self.holdings_cache:
+                self.holdings_cache[code]["qty"] -= sold_qty
+                if self.holdings_cache[code]["qty"] <= 0:
+                    del self.holdings_cache[code]
+            self._recompile_tick(code)
+            self._broadcast_portfolio_sync()
         finally:
             with self._sell_lock:
                 self._selling_codes.discard(code)
@@ -648,14 +2471,11 @@ class SimpleDeepBuyStrategy:
         self.trailing_state[code] = state
         return state
     
+    @_timed("shakeout_score")
     def _get_shakeout_score(self, code: str, name: str) -> int:
         """개미떨구기 점수 계산 (0~4점)"""
         try:
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
-            quote = self.kis.get_stock_quote(code)
+            quote = self._get_quote(code)
             if not quote:
                 return 0
             
@@ -852,8 +2672,7 @@ class SimpleDeepBuyStrategy:
             self.last_sell_prices[code] = current_price
             self.sell_block_count[code] = 0
 
-            import time as _time
-            self._last_sell_time[code] = _time.time()
+            self._last_sell_time[code] = self._clock()
 
             logger.info("[가상매도] 👻 %s: +%.2f%% @ %s원 → 매도가 갱신 (실제 매도 없음)",
                         name, profit_pct * 100, format(int(current_price), ","))
@@ -1005,19 +2824,16 @@ class SimpleDeepBuyStrategy:
                 # 트레일링 상태 초기화
                 if mode == "trailing":
                     self.trailing_state[code] = self._create_default_state()
+                    self._recompile_tick(code)
                 
                 return {"success": True, "quantity": sell_qty}
         
         return {"success": False, "message": "KIS API 없음"}
 
+    @_timed("execute_sell")
     def _execute_sell(self, code: str, name: str, current_price: float,
                        avg_price: float, qty: int, state: Dict, mode: str):
-        """동기 매도 (트레일링용)"""
-        with self._sell_lock:
-            if code in self._selling_codes:
-                return
-            self._selling_codes.add(code)
-        
+        """매도 주문 요청 (트레일링용, 체결 확인 후 _on_sell_done에서 반영)"""
         try:
             profit_pct = (current_price - avg_price) / avg_price
             
@@ -1031,100 +2847,61 @@ class SimpleDeepBuyStrategy:
                             sell_qty = 1  # 최소 1주 매도
             sell_qty = min(sell_qty, qty)
             
-            # 삼성전자/삼성전자우: 총자산의 10%는 유지
+            # 삼성전자/삼성전자우: 최소 보유 유지 (보유 캐시 기준, 캐시에 없을 때만 잔고 조회)
             if code in self.SAMSUNG_CODES:
-                # 최소 1주 보유
-                max_sell_qty = qty - self.SAMSUNG_MIN_HOLD_QTY
+                min_hold_qty = self.SAMSUNG_MIN_HOLD_QTY
+                holding_qty = self.holdings_cache.get(code, {}).get("qty", 0)
+                if holding_qty <= 0:
+                    try:
+                        balance = self._get_kis().get_account_balance() or {}
+                        for h in balance.get("holdings", []):
+                            if h.get("stock_code") == code:
+                                holding_qty = h.get("quantity", 0)
+                                break
+                    except Exception as e:
+                        logger.warning("[딥바이v3.6] 보유수량 조회 오류: %s", e)
+                    if holding_qty <= 0:
+                        holding_qty = qty
+                max_sell_qty = holding_qty - min_hold_qty
+                if max_sell_qty <= 0:
+                    logger.info("[딥바이v3.6] ⚠️ %s 매도 스킵: 최소 %d주 보유 (보유 %d주)", name, min_hold_qty, holding_qty)
+                    return
                 if sell_qty > max_sell_qty:
-                    logger.info("[딥바이v3.6] %s 최소 %d주 유지", name, self.SAMSUNG_MIN_HOLD_QTY)
                     sell_qty = max_sell_qty
-                if sell_qty <= 0:
-                    return
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
-            # 삼성전자/삼성전자우: 총자산의 10%는 유지
-            if code in self.SAMSUNG_CODES:
-                try:
-                    balance = self.kis.get_account_balance() if self.kis else None
-                    if balance and balance.get("total_asset"):
-                        total_asset = balance["total_asset"]
-                        min_hold_qty = self.SAMSUNG_MIN_HOLD_QTY
-
-                        # 수량 기반 최소 보유 체크 (실제 보유량 기준)
-                        holding_qty = self.holdings_cache.get(code, {}).get("qty", 0)
-                        if holding_qty <= 0:
-                            for h in balance.get("holdings", []):
-                                if h.get("stock_code") == code:
-                                    holding_qty = h.get("quantity", 0)
-                                    break
-                        remaining_qty = holding_qty - sell_qty
-                        if remaining_qty < min_hold_qty:
-                            max_sell_qty = holding_qty - min_hold_qty
-                            if max_sell_qty <= 0:
-                                logger.info("[딥바이v3.6] ⚠️ %s 매도 스킵: 최소 %d주 보유 (보유 %d주)", name, min_hold_qty, holding_qty)
-                                return
-                            sell_qty = max_sell_qty
-                            logger.info("[딥바이v3.6] %s 매도 수량 조정: %d주 (보유 %d주, 최소 %d주 유지)", name, sell_qty, holding_qty, min_hold_qty)
-                except Exception as e:
-                    logger.warning("[딥바이v3.6] 10%% 체크 오류: %s", e)
-            
-            result = self.kis.send_order(code, sell_qty, 0, "1", "01")
+                    logger.info("[딥바이v3.6] %s 매도 수량 조정: %d주 (보유 %d주, 최소 %d주 유지)", name, sell_qty, holding_qty, min_hold_qty)
             
-            if result and result.get("order_no"):
-                logger.info("[딥바이v3.6] ✅ %s 매도 완료: %d주, 수익 +%.2f%%", 
-                            name, sell_qty, profit_pct * 100)
-                
-                mode_emoji = "📉" if mode == "trailing" else "💰"
-                mode_text = "트레일링" if mode == "trailing" else "고정"
-                
-                self._send_notification_sync(
-                    "%s %s 익절: %s %d주 @ %s원 (수익 +%.1f%%)" % 
-                    (mode_emoji, mode_text, name, sell_qty, 
-                     format(int(current_price), ","), profit_pct * 100)
-                )
-                self._save_transaction(code, name, "SELL", sell_qty, current_price, order_no=result.get("order_no"))
-                self.last_sell_prices[code] = current_price  # 매도가 저장
-                logger.info("[딥바이v3.6] 📝 %s 매도가 저장: %s원", name, format(int(current_price), ","))
-
-                # [FIX 2026-02-25] 고정매도/트레일링매도 후 신고가 기준도 동기화
-                if code in self.trailing_state:
-                    prev_peak_sell = self.trailing_state[code].get("last_peak_sell_price", 0)
-                    self.trailing_state[code]["last_peak_sell_price"] = max(prev_peak_sell, current_price)
-                
-                if code in self.holdings_cache:
-                    self.holdings_cache[code]["qty"] -= sell_qty
-                    if self.holdings_cache[code]["qty"] <= 0:
-                        del self.holdings_cache[code]
+            mode_emoji = "📉" if mode == "trailing" else "💰"
+            mode_text = "트레일링" if mode == "trailing" else "고정"
+            message = "%s %s 익절: %s %d주 @ %s원 (수익 +%.1f%%)" % (
+                mode_emoji, mode_text, name, sell_qty, format(int(current_price), ","), profit_pct * 100)
+            if not self._submit_sell(code, name, sell_qty, current_price, mode, message):
+                return
+            logger.info("[딥바이v3.6] 📤 %s 매도 주문 요청: %d주, 수익 +%.2f%%", name, sell_qty, profit_pct * 100)
             
             # 트레일링 상태 초기화
             if mode == "trailing":
                 self.trailing_state[code] = self._create_default_state()
+                self._recompile_tick(code)
             
         except Exception as e:
             logger.error("[딥바이v3.6] 매도 오류 (%s): %s", name, e)
-        finally:
-            with self._sell_lock:
-                self._selling_codes.discard(code)
     
     async def _execute_sell_async(self, code: str, name: str, current_price: float,
                                    avg_price: float, qty: int, mode: str):
-        """비동기 매도 (고정 간격용)"""
+        """고정 간격 매도 주문 요청 (체결 확인 후 _on_sell_done에서 매도가/쿨다운/저널 반영)
+
+        Returns: 주문 요청 수량 (같은 종목 주문 진행 중·스킵이면 0)
+        """
         with self._sell_lock:
             if code in self._selling_codes:
-                return
-            self._selling_codes.add(code)
+                return 0
         
         try:
             profit_pct = (current_price - avg_price) / avg_price
             sell_qty = qty  # qty는 이미 계산된 매도 수량
             if sell_qty <= 0:
                             sell_qty = 1  # 최소 1주 매도
-            
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
+            self._get_kis()
             
             # 삼성전자/삼성전자우: 총자산의 10%는 유지
             if code in self.SAMSUNG_CODES:
@@ -1146,54 +2923,38 @@ class SimpleDeepBuyStrategy:
                             max_sell_qty = holding_qty - min_hold_qty
                             if max_sell_qty <= 0:
                                 logger.info("[딥바이v3.6] ⚠️ %s 매도 스킵: 최소 %d주 보유 (보유 %d주)", name, min_hold_qty, holding_qty)
-                                return
+                                return 0
                             sell_qty = max_sell_qty
                             logger.info("[딥바이v3.6] %s 매도 수량 조정: %d주 (보유 %d주, 최소 %d주 유지)", name, sell_qty, holding_qty, min_hold_qty)
                 except Exception as e:
                     logger.warning("[딥바이v3.6] 10%% 체크 오류: %s", e)
             
-            result = self.kis.send_order(code, sell_qty, 0, "1", "01")
-            
-            if result and result.get("order_no"):
-                logger.info("[딥바이v3.6] ✅ %s 고정매도 완료: %d주", name, sell_qty)
-                await self._send_notification(
-                    "💰 고정 익절: %s %d주 @ %s원 (수익 +%.1f%%)" % 
-                    (name, sell_qty, format(int(current_price), ","), profit_pct * 100)
-                )
-                self._save_transaction(code, name, "SELL", sell_qty, current_price, order_no=result.get("order_no"))
-                self.last_sell_prices[code] = current_price  # 매도가 저장
-                logger.info("[딥바이v3.6] 📝 %s 매도가 저장: %s원", name, format(int(current_price), ","))
-
-                # [FIX 2026-02-25] 고정매도 후 신고가 기준도 동기화
-                if code in self.trailing_state:
-                    prev_peak_sell = self.trailing_state[code].get("last_peak_sell_price", 0)
-                    self.trailing_state[code]["last_peak_sell_price"] = max(prev_peak_sell, current_price)
-                
-                # [FIX 2026-02-23] 매도 쿨다운 타임스탬프 기록
-                import time as _time
-                self._last_sell_time[code] = _time.time()
-                
-                self.update_holdings_cache()
-                await self._broadcast_holdings_update()
-                return sell_qty
-            return 0
+            message = "💰 고정 익절: %s %d주 @ %s원 (수익 +%.1f%%)" % (
+                name, sell_qty, format(int(current_price), ","), profit_pct * 100)
+            if not self._submit_sell(code, name, sell_qty, current_price, mode, message):
+                return 0
+            logger.info("[딥바이v3.6] 📤 %s 고정매도 주문 요청: %d주", name, sell_qty)
+            return sell_qty
                 
         except Exception as e:
             logger.error("[딥바이v3.6] 매도 오류: %s", e)
             return 0
-        finally:
-            with self._sell_lock:
-                self._selling_codes.discard(code)
     
 
+    def _get_kis(self):
+        if not self.kis:
+            self.kis = self._services.kis
+        return self.kis
+
+    def _get_quote(self, code: str) -> Optional[Dict]:
+        """시세 조회 (QUOTE_CACHE_TTL_SEC 내 재조회는 캐시 사용)"""
+        self._get_kis()
+        return self._quote_cache.get(code)
+
     def _get_samsung_holdings(self) -> list:
         """삼성전자/삼성전자우 보유 정보 가져오기"""
         try:
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
-            balance = self.kis.get_account_balance()
+            balance = self._get_kis().get_account_balance()
             if balance and balance.get("holdings"):
                 return [h for h in balance["holdings"] if h.get("pdno") in self.SAMSUNG_CODES]
         except Exception as e:
@@ -1203,11 +2964,7 @@ class SimpleDeepBuyStrategy:
     def _get_total_assets(self) -> float:
         """총자산 조회"""
         try:
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
-            balance = self.kis.get_account_balance()
+            balance = self._get_kis().get_account_balance()
             if balance:
                 return balance.get("total_asset", 0)
         except Exception as e:
@@ -1233,43 +2990,87 @@ class SimpleDeepBuyStrategy:
     
     # === 알림 ===
     def _send_notification_sync(self, message: str):
-        try:
-            import asyncio
-            from backend.services.telegram_service import TelegramService
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(
-                    TelegramService.send_message("[딥바이v3.6] " + message)
-                )
-            finally:
-                loop.close()
-        except Exception as e:
-            logger.warning("[딥바이v3.6] 알림 실패: %s", e)
+        """알림 큐에 넣고 즉시 반환 (전송은 알림 스레드)"""
+        self._notifier.send(message)
     
     async def _send_notification(self, message: str):
-        try:
-            from backend.services.telegram_service import TelegramService
-            await TelegramService.send_message("[딥바이v3.6] " + message)
-        except Exception as e:
-            logger.warning("[딥바이v3.6] 알림 실패: %s", e)
+        self._notifier.send(message)
+    
+    def _broadcast_portfolio_sync(self):
+        """포트폴리오 업데이트 브로드캐스트 요청 (병합기에 표시만, 주문 스레드용)"""
+        self._broadcaster.notify()
     
     async def _broadcast_holdings_update(self):
-        """잔고 변경 WebSocket 브로드캐스트"""
-        try:
-            from backend.main import broadcast_portfolio_update
-            await broadcast_portfolio_update()
-            logger.info("[딥바이v3.6] 📡 잔고 변경 브로드캐스트 전송")
-        except Exception as e:
-            logger.warning("[딥바이v3.6] 브로드캐스트 실패: %s", e)
+        """잔고 변경 WebSocket 브로드캐스트 요청 (병합기에 표시만)"""
+        self._broadcaster.notify()
+    
+    def _portfolio_snapshot(self) -> Dict[str, Dict]:
+        """delta 비교용 보유 스냅샷 (종목코드 → 표시 필드)"""
+        return {
+            code: {"name": h.get("name", code), "qty": h["qty"], "avg_price": round(h["avg_price"], 2),
+                   "last_sell_price": self.last_sell_prices.get(code, 0)}
+            for code, h in list(self.holdings_cache.items())
+        }
+    
+    def _push_full_portfolio(self):
+        """전체 포트폴리오 WebSocket 브로드캐스트 (브로드캐스터 스레드 → 앱 이벤트 루프에서 실행)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # start() 전 (동기 호출 경로) - 기존처럼 KIS 서비스 브로드캐스트만 시도
+            try:
+                self._services.kis.broadcast_portfolio_update()
+            except Exception:
+                pass
+            return
+        future = asyncio.run_coroutine_threadsafe(self._services.broadcast(), loop)
+        future.result(timeout=5.0)  # 실패는 브로드캐스터가 경고 로그
+    
+    def subscribe_portfolio(self, callback):
+        """잔고 delta 구독 (callback(message), 브로드캐스터 스레드에서 호출)
+        
+        프로세스 내 호출자 전용 - WebSocket 계층에는 아직 연결되지 않음 (대시보드는 전체 브로드캐스트 사용)
+        
+        message: {"type": "portfolio_delta", "seq", "base_seq", "upserted": {code: {...}}, "removed": [code]}
+        클라이언트는 seq != 직전 seq + 1 이면 resync_portfolio(직전 seq) 요청
+        """
+        self._broadcaster.subscribe(callback)
+    
+    def unsubscribe_portfolio(self, callback):
+        self._broadcaster.unsubscribe(callback)
+    
+    def resync_portfolio(self, last_seq: Optional[int] = None) -> List[Dict]:
+        """누락 delta 또는 전체 스냅샷 ({"type": "portfolio_snapshot", "seq", "holdings"})"""
+        return self._broadcaster.resync(last_seq)
     
     # === 메인 루프 ===
     async def start(self):
         """스케줄러 시작"""
-        from backend.services.kis_api_service import kis_api_service
-        self.kis = kis_api_service
+        self._services.resolve()
+        self.kis = self._services.kis
+        self._loop = asyncio.get_running_loop()
         self.running = True
+        self._notifier.start()
+        self._broadcaster.start()
+        self._tick_mailbox.start()
+        self._orders.start()
+        self._state_store.start()
+        if self.RECORD_TICKS:
+            self._tick_recorder.start()
+        if not self._shadow.enabled:
+            grid = self.SHADOW_GRID or self._load_shadow_grid_env()
+            if grid:
+                try:
+                    self._shadow.configure(grid)
+                except (ValueError, TypeError) as e:
+                    logger.warning("[섀도] 비활성화 (그리드 오류): %s", e)
+        self._shadow.start()
+        try:
+            if self._is_synced_account():
+                self._services.real_account.subscribe_holdings(self.apply_holdings_diff)
+            else:
+                logger.info("[딥바이v3.6] 보유 종목 diff 구독 생략 (동기화 계좌와 다른 브로커)")
+        except Exception as e:
+            logger.warning("[딥바이v3.6] 보유 종목 diff 구독 실패: %s", e)
         
         mode = self.get_mode()
         logger.info("[딥바이v3.6] 시작 - 매도 모드: %s", mode)
@@ -1281,29 +3082,50 @@ class SimpleDeepBuyStrategy:
         
         self.update_holdings_cache()
         
-        while self.running:
-            try:
-                now = datetime.now()
-                
-                if not self._is_market_hours(now):
-                    await asyncio.sleep(60)
-                    continue
-                
-                if now.minute % self.CHECK_INTERVAL == 0 and now.second < 5:
-                    self.update_holdings_cache()
-                    await self._run_cycle(now)
-                    await asyncio.sleep(60)
-                else:
-                    await asyncio.sleep(5)
-                    
-            except Exception as e:
-                logger.error("[딥바이v3.6] 오류: %s", e)
-                await asyncio.sleep(30)
+        if not self._scheduler.has_job("cycle"):
+            self._scheduler.add_job("cycle", self.CHECK_INTERVAL * 60, self._scheduled_cycle)
+        if not self._scheduler.has_job("metrics_log"):
+            self._scheduler.add_job("metrics_log", self.METRICS_LOG_SEC, self._log_metrics)
+        await self._scheduler.run()
+    
+    async def _scheduled_cycle(self, due: datetime):
+        """정시 사이클 (보유 갱신 → 매수/매도 사이클)"""
+        self.update_holdings_cache()
+        await self._run_cycle(due)
+        self._shadow.on_cycle(due)
+        if (due.hour, due.minute) == tuple(self.MARKET_CLOSE) and self._shadow.enabled:
+            summary = self._shadow.summary()
+            logger.info("[섀도] %s", summary)
+            self._send_notification_sync("🧪 섀도 평가: " + summary)
+    
+    async def _log_metrics(self, due: datetime):
+        """핫패스 계측 요약 로그 (누적, p50/p99/max ms)"""
+        summary = self._metrics.summary()
+        if summary:
+            logger.info("[계측] %s", summary)
+    
+    def add_periodic_job(self, name: str, interval_sec: int, func,
+                         market_hours: bool = True, overlap: str = "skip"):
+        """사이클 스케줄러에 주기 작업 추가 (보유 갱신, DB 동기화 등)"""
+        return self._scheduler.add_job(name, interval_sec, func, market_hours=market_hours, overlap=overlap)
     
     def stop(self):
         self.running = False
+        self._scheduler.stop()
+        self._tick_mailbox.stop()
+        self._orders.stop()
+        self._tick_recorder.stop()
+        self._state_store.stop()
+        self._notifier.stop()
+        self._broadcaster.stop()
+        self._shadow.stop()
+        try:
+            self._services.real_account.unsubscribe_holdings(self.apply_holdings_diff)
+        except Exception:
+            pass
         logger.info("[딥바이v3.6] 중지")
     
+    @_timed("run_cycle")
     async def _run_cycle(self, now: datetime):
         """매수 + (fixed 모드일 때) 매도 사이클"""
         # 🛑 킬스위치 체크
@@ -1321,16 +3143,19 @@ class SimpleDeepBuyStrategy:
         
         cash = balance.get("orderable_cash", 0)
         
-        for holding in balance.get("holdings", []):
+        holdings = [
+            h for h in balance.get("holdings", [])
+            if h.get("quantity", 0) > 0 and float(h.get("avg_price", 0)) > 0
+        ]
+        quotes = await self._fetch_quote_snapshot([h.get("stock_code", "") for h in holdings])
+        
+        for holding in holdings:
             code = holding.get("stock_code", "")
             name = holding.get("stock_name", code)
             qty = holding.get("quantity", 0)
             avg_price = float(holding.get("avg_price", 0))
             
-            if qty <= 0 or avg_price <= 0:
-                continue
-            
-            quote = self.kis.get_stock_quote(code)
+            quote = quotes.get(code)
             if not quote:
                 continue
             
@@ -1391,10 +3216,9 @@ class SimpleDeepBuyStrategy:
                 sold_in_cycle = 0
                 
                 # [FIX 2026-02-23] 종목별 매도 쿨다운 체크 (연속 매도 방지)
-                import time as _time
                 _last_sell = self._last_sell_time.get(code, 0)
-                if _time.time() - _last_sell < self.SELL_COOLDOWN_SEC:
-                    _remaining = int(self.SELL_COOLDOWN_SEC - (_time.time() - _last_sell))
+                if self._clock() - _last_sell < self.SELL_COOLDOWN_SEC:
+                    _remaining = int(self.SELL_COOLDOWN_SEC - (self._clock() - _last_sell))
                     logger.info("[딥바이v3.6] %s 매도 쿨다운 중 (%d초 남음) → 매도 스킵", name, _remaining)
                     continue
                 
@@ -1481,81 +3305,147 @@ class SimpleDeepBuyStrategy:
                                 format(int(cash), ","),
                                 buy_qty,
                             )
+
+    async def _fetch_quote_snapshot(self, codes: List[str]) -> Dict[str, Dict]:
+        """보유 종목 시세 일괄 조회 (QUOTE_CONCURRENCY 개씩 동시 조회)
+
+        Returns: {종목코드: quote} - 조회 실패 종목은 제외
+        """
+        sem = asyncio.Semaphore(self.QUOTE_CONCURRENCY)
+        
+        async def fetch(code: str):
+            async with sem:
+                try:
+                    return code, await asyncio.to_thread(self._get_quote, code)
+                except Exception as e:
+                    logger.warning("[딥바이v3.6] %s 시세 조회 실패: %s", code, e)
+                    return code, None
+        
+        started = time.monotonic()
+        results = await asyncio.gather(*(fetch(code) for code in dict.fromkeys(codes)))
+        snapshot = {code: quote for code, quote in results if quote}
+        logger.info("[딥바이v3.6] 시세 스냅샷: %d/%d종목 (%.2f초)",
+                    len(snapshot), len(results), time.monotonic() - started)
+        return snapshot
+
     async def _execute_buy(self, code: str, name: str, price: float, qty: int, reason: str = ""):
+        """매수 주문 요청 (체결 확인 후 _on_buy_done에서 직전 매수가/저널/보유 반영)"""
         logger.info("[딥바이v3.6] 📈 매수: %s %d주 @ %s", name, qty, format(int(price), ","))
-
+        if not self._submit_buy(code, name, qty, price, reason if reason else "추가매수"):
+            logger.info("[딥바이v3.6] %s 매수 주문 진행 중 → 스킵", name)
+    
+    def _submit_buy(self, code: str, name: str, qty: int, ref_price: float, reason: str) -> bool:
+        """시장가 매수 주문을 파이프라인에 넣음 (같은 종목 매수 진행 중이면 False)"""
+        with self._sell_lock:
+            if code in self._buying_codes:
+                return False
+            self._buying_codes.add(code)
+        message = "📈 매수: %s %d주 @ %s원 (%s)" % (name, qty, format(int(ref_price), ","), reason)
+        intent = _OrderIntent(code, name, "BUY", qty, ref_price, reason, message, self._on_buy_done)
+        intent.tick_at = getattr(self._tick_ctx, "arrived", None)
+        self._orders.submit(intent)
+        return True
+    
+    def _on_buy_done(self, intent: _OrderIntent):
+        """매수 주문 종료 콜백 - 체결 확인분으로 직전 매수가/보유 캐시 갱신"""
+        code, name = intent.code, intent.name
+        retry = False
         try:
-            result = self.kis.send_order(code, qty, 0, "2", "01")
-            if result and result.get("order_no"):
-                self.last_buy_prices[code] = price  # 직전 매수가 업데이트
-                await self._send_notification("📈 매수: %s %d주 @ %s원 (%s)" % (name, qty, format(int(price), ","), reason if reason else "추가매수"))
-                self._save_transaction(code, name, "BUY", qty, price, order_no=result.get("order_no"))
+            if intent.status == "rejected":
+                err = intent.error or ""
+                # [NEW] 주문 API에서 자금 부족 발생 시 1주 fallback 재시도
+                if "주문가능금액" in err and "초과" in err and intent.qty > 1:
+                    logger.warning("[딥바이v3.6] %s 주문가능금액 부족으로 1주 fallback 재시도 (%d주→1주)", name, intent.qty)
+                    retry = True
+                else:
+                    logger.error("[딥바이v3.6] 매수 오류: %s (%s, %d주)", err, name, intent.qty)
+                return
+            
+            if intent.status == "unconfirmed":
+                # 체결 확인 전에는 직전 매수가·거래 기록을 바꾸지 않고 실제 잔고로 재동기화
+                logger.warning("[딥바이v3.6] ⚠️ %s 매수 체결 미확인 (%d초) → 잔고 재조회로 확인 (주문번호 %s)",
+                              name, self.ORDER_CONFIRM_TIMEOUT_SEC, intent.order_no)
+                self._send_notification_sync(intent.message + " [체결 미확인]")
                 self.update_holdings_cache()
-                await self._broadcast_holdings_update()
+                self._broadcast_portfolio_sync()
                 return
-
-            logger.error("[딥바이v3.6] 매수 오류: 주문 응답 없음 (%s, %d주)", name, qty)
-
-        except Exception as e:
-            err_msg = str(e)
-            is_insufficient_cash = ("주문가능금액" in err_msg and "초과" in err_msg)
-
-            # [NEW] 주문 API에서 자금 부족 발생 시 1주 fallback 재시도
-            if is_insufficient_cash and qty > 1:
-                logger.warning("[딥바이v3.6] %s 주문가능금액 부족으로 1주 fallback 재시도 (%d주→1주)", name, qty)
-                try:
-                    fallback_qty = 1
-                    fallback_result = self.kis.send_order(code, fallback_qty, 0, "2", "01")
-                    if fallback_result and fallback_result.get("order_no"):
-                        self.last_buy_prices[code] = price
-                        await self._send_notification(
-                            "📈 매수: %s %d주 @ %s원 (%s, 1주 fallback)" % (
-                                name,
-                                fallback_qty,
-                                format(int(price), ","),
-                                reason if reason else "추가매수",
-                            )
-                        )
-                        self._save_transaction(code, name, "BUY", fallback_qty, price, order_no=fallback_result.get("order_no"))
-                        self.update_holdings_cache()
-                        await self._broadcast_holdings_update()
-                        logger.info("[딥바이v3.6] %s 1주 fallback 매수 성공", name)
-                        return
-                except Exception as fallback_e:
-                    logger.error("[딥바이v3.6] %s 1주 fallback 매수 실패: %s", name, fallback_e)
-
-            logger.error("[딥바이v3.6] 매수 오류: %s", e)
+            
+            bought_qty = intent.filled_qty
+            price = intent.fill_price or intent.ref_price
+            logger.info("[딥바이v3.6] ✅ %s %d주 매수 체결 @ %s원 (주문번호 %s)",
+                       name, bought_qty, format(int(price), ","), intent.order_no)
+            self.last_buy_prices[code] = price  # 직전 매수가 업데이트
+            self._send_notification_sync("📈 매수: %s %d주 @ %s원 (%s)" % (
+                name, bought_qty, format(int(price), ","), intent.kind))
+            self._save_transaction(code, name, "BUY", bought_qty, price, order_no=intent.order_no)
+            self.update_holdings_cache()
+            self._broadcast_portfolio_sync()
+        finally:
+            with self._sell_lock:
+                self._buying_codes.discard(code)
+            if retry:
+                self._submit_buy(code, name, 1, intent.ref_price, intent.kind + ", 1주 fallback")
     
     def _save_transaction(self, code: str, name: str, tx_type: str, qty: int, price: float, order_no: str = None):
+        """거래 기록 (저널 append만 수행, DB 반영은 _commit_journal_batch)"""
         try:
-            from backend.database import SessionLocal
-            from backend.models.transaction import Transaction
-            from backend.models.holding import Holding
-            from backend.services.real_account_service import RealAccountService
-            from datetime import timedelta
-            
-            db = SessionLocal()
-            try:
-                portfolio = RealAccountService.get_or_create_real_portfolio(db)
+            self._journal.append({
+                "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "code": code,
+                "name": name,
+                "type": tx_type,
+                "qty": qty,
+                "price": price,
+                "order_no": str(order_no) if order_no else None,
+            })
+        except Exception as e:
+            logger.error("[딥바이v3.6] 거래 저널 기록 실패: %s", e)
 
-                # [FIX] 중복 방지: 같은 종목/타입/수량/근접시간(3초) 거래가 있으면 스킵
-                now = datetime.now()
-                dup = db.query(Transaction).filter(
+    def _commit_journal_batch(self, entries: List[Dict]) -> int:
+        """저널 항목 DB 일괄 커밋 (거래일+주문번호 기준 멱등). Returns: 중복으로 스킵한 건수"""
+        from backend.models.transaction import Transaction
+        from backend.models.holding import Holding
+        from backend.services.real_account_service import RealAccountService
+        
+        db = self._services.session_factory()
+        try:
+            portfolio = RealAccountService.get_or_create_real_portfolio(db)
+            
+            # [FIX] 중복 방지: 같은 날 같은 주문번호가 이미 기록돼 있으면 스킵 (sync_transactions와 같은 memo 형식)
+            # KIS 주문번호는 거래일마다 새로 시작 → 다른 날의 같은 번호는 별개 주문
+            entries = [(e, datetime.strptime(e["ts"], "%Y-%m-%d %H:%M:%S.%f")) for e in entries]
+            keyed = [(e, at) for e, at in entries if e.get("order_no")]
+            seen = set()
+            if keyed:
+                day_floor = datetime.combine(min(at for _, at in keyed).date(), datetime.min.time())
+                seen = {(at.date(), m) for (m, at) in db.query(Transaction.memo, Transaction.transaction_date).filter(
                     Transaction.portfolio_id == portfolio.id,
-                    Transaction.stock_code == code,
-                    Transaction.transaction_type == tx_type,
-                    Transaction.quantity == qty,
-                    Transaction.transaction_date >= now - timedelta(seconds=3)
-                ).order_by(Transaction.transaction_date.desc()).first()
-                if dup:
-                    logger.info("[딥바이v3.6] 중복 거래 기록 스킵: %s %s %d주", name, tx_type, qty)
-                    return
+                    Transaction.memo.in_({f"주문번호: {e['order_no']}" for e, _ in keyed}),
+                    Transaction.transaction_date >= day_floor
+                )}
+            
+            codes = {e["code"] for e, _ in entries}
+            holdings = {h.stock_code: h for h in db.query(Holding).filter(
+                Holding.portfolio_id == portfolio.id,
+                Holding.stock_code.in_(codes)
+            )}
+            
+            duplicates = 0
+            for e, at in entries:
+                code, name, tx_type, qty, price = e["code"], e["name"], e["type"], e["qty"], e["price"]
+                memo = f"주문번호: {e['order_no']}" if e.get("order_no") else None
+                key = (at.date(), memo)
+                if memo and key in seen:
+                    logger.info("[딥바이v3.6] 중복 거래 기록 스킵: %s %s %d주 (%s)", name, tx_type, qty, memo)
+                    duplicates += 1
+                    continue
+                if memo:
+                    seen.add(key)
                 
                 commission = price * qty * 0.00015 if tx_type == "BUY" else 0
                 tax = price * qty * 0.0018 if tx_type == "SELL" else 0
-                memo = f"주문번호: {order_no}" if order_no else None
                 
-                tx = Transaction(
+                db.add(Transaction(
                     portfolio_id=portfolio.id,
                     stock_code=code,
                     stock_name=name,
@@ -1564,18 +3454,13 @@ class SimpleDeepBuyStrategy:
                     price=price,
                     total_amount=price * qty,
                     fee=commission,
-                    transaction_date=now,
+                    transaction_date=at,
                     tax=tax,
                     memo=memo,
-                )
-                db.add(tx)
+                ))
 
                 # Holding 업데이트 (avg_price 컬럼 사용)
-                holding = db.query(Holding).filter(
-                    Holding.portfolio_id == portfolio.id,
-                    Holding.stock_code == code
-                ).first()
-                
+                holding = holdings.get(code)
                 if tx_type == "BUY":
                     if holding:
                         total_cost = holding.avg_price * holding.quantity + price * qty
@@ -1591,38 +3476,51 @@ class SimpleDeepBuyStrategy:
                             avg_price=price,
                         )
                         db.add(holding)
+                        holdings[code] = holding
                 elif tx_type == "SELL" and holding:
                     holding.quantity = holding.quantity - qty
                     if holding.quantity <= 0:
                         db.delete(holding)
-
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                logger.error("[딥바이v3.6] DB 오류: %s", e)
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error("[딥바이v3.6] DB 저장 실패: %s", e)
+                        del holdings[code]
+
+            db.commit()
+            # Holding을 직접 바꿨으므로 다음 sync_holdings가 해시 스킵 없이 API와 대조하도록
+            RealAccountService.invalidate_holdings_snapshot(portfolio.id)
+            return duplicates
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
     def _is_market_hours(self, now: datetime) -> bool:
         if now.weekday() >= 5:
             return False
-        if now.hour < 9:
-            return False
-        if now.hour > 15 or (now.hour == 15 and now.minute > 20):
-            return False
-        return True
+        return self.MARKET_OPEN <= (now.hour, now.minute) <= self.MARKET_CLOSE
+    
+    def _next_market_open(self, now: datetime) -> datetime:
+        """now 이후 다음 장 시작 시각 (주말 제외)"""
+        nxt = now.replace(hour=self.MARKET_OPEN[0], minute=self.MARKET_OPEN[1], second=0, microsecond=0)
+        if nxt <= now:
+            nxt += timedelta(days=1)
+        while nxt.weekday() >= 5:
+            nxt += timedelta(days=1)
+        return nxt
     
     def get_trailing_status(self) -> Dict:
         result = {}
+        records = self._tick_records
         for code, state in self.trailing_state.items():
             holding = self.holdings_cache.get(code, {})
+            rec = records.get(code)
+            ladder = rec.ladder if rec is not None else None
             result[code] = {
                 **state,
                 "name": holding.get("name", code),
                 "qty": holding.get("qty", 0),
-                "avg_price": holding.get("avg_price", 0)
+                "avg_price": holding.get("avg_price", 0),
+                # 분할매도 사다리 (활성 종목만): 칸별 트리거가·수량, 매도 완료/다음 칸 표시
+                "ladder": ladder.rows(state.get("last_sold_drop_level", 0)) if ladder else [],
             }
 
         return result
@@ -1654,51 +3552,104 @@ class SimpleDeepBuyStrategy:
                 )
                 return
             
-            with self._sell_lock:
-                if code in self._selling_codes:
-                    return
-                self._selling_codes.add(code)
-            
-            if not self.kis:
-                from backend.services.kis_api_service import kis_api_service
-                self.kis = kis_api_service
-            
             # virtual 모드: 실제 매도 없이 매도가만 갱신
             if self.get_mode(code) == "virtual":
+                with self._sell_lock:
+                    if code in self._selling_codes:
+                        return
                 self.last_sell_prices[code] = current_price
                 logger.info("[삼성신고점] 👻 %s 가상매도 (신고가) @ %s원 → 매도가 갱신", name, format(int(current_price), ","))
-                import time as _time
-                self._last_sell_time[code] = _time.time()
+                self._last_sell_time[code] = self._clock()
             else:
-                result = self.kis.send_order(code, 1, 0, "1", "01")
-                
-                if result and result.get("order_no"):
-                    profit_pct = (current_price - avg_price) / avg_price
-                    logger.info("[삼성신고점] ✅ %s 1주 매도 완료 (수익 +%.2f%%)", name, profit_pct * 100)
-                    
-                    self._send_notification_sync(
-                        "🎯 삼성 신고점 매도: %s 1주 @ %s원 (수익 +%.1f%%)" % 
-                        (name, format(int(current_price), ","), profit_pct * 100)
-                    )
-                    self._save_transaction(code, name, "SELL", 1, current_price, order_no=result.get("order_no"))
-                    self.last_sell_prices[code] = current_price
-
-                if code in self.trailing_state:
-                    prev_peak_sell = self.trailing_state[code].get("last_peak_sell_price", 0)
-                    self.trailing_state[code]["last_peak_sell_price"] = max(prev_peak_sell, current_price)
-                
-                # [FIX 2026-02-23] 매도 쿨다운 타임스탬프 기록
-                import time as _time
-                self._last_sell_time[code] = _time.time()
-                
-                if code in self.holdings_cache:
-                    self.holdings_cache[code]["qty"] -= 1
+                profit_pct = (current_price - avg_price) / avg_price
+                message = "🎯 삼성 신고점 매도: %s 1주 @ %s원 (수익 +%.1f%%)" % (
+                    name, format(int(current_price), ","), profit_pct * 100)
+                if not self._submit_sell(code, name, 1, current_price, "peak", message):
+                    return
+                # 신고가 기준(last_peak_sell_price)·쿨다운은 체결 확인 후 _on_sell_done에서 반영
+                logger.info("[삼성신고점] 📤 %s 1주 매도 주문 요청 (수익 +%.2f%%)", name, profit_pct * 100)
         except Exception as e:
             logger.error("[삼성신고점] 매도 오류 (%s): %s", name, e)
-        finally:
-            with self._sell_lock:
-                self._selling_codes.discard(code)
 
+class StrategyRunner:
+    """전략 인스턴스 여러 개를 한 프로세스에서 실행 (웹소켓 틱 팬아웃·시세 캐시 공유)
+
+    - primary(기존 싱글톤)의 시세 캐시를 모든 인스턴스가 공유 → 같은 종목 시세는 KIS 1회 호출
+    - 실시간 틱은 on_realtime_price 한 번으로 전 인스턴스에 전달 (틱 기록은 primary만)
+    - 인스턴스별 보유/트레일링 상태, 락, 메일박스, 주문 파이프라인, 저널은 모두 분리
+    """
+
+    def __init__(self, primary: SimpleDeepBuyStrategy):
+        self.primary = primary
+        self._strategies: Dict[str, SimpleDeepBuyStrategy] = {primary.name: primary}
+        self._fanout = (primary,)  # 틱 콜백용 (추가/제거 시 통째로 교체)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self.running = False
+
+    def create(self, name: str, services: _Services = None, params: Dict = None) -> SimpleDeepBuyStrategy:
+        """인스턴스 추가 (다른 계좌는 services, 파라미터 A/B는 params로 지정)"""
+        with self._lock:
+            if name in self._strategies:
+                raise ValueError(f"Strategy already exists: {name}")
+            params = dict(params or {})
+            params.setdefault("RECORD_TICKS", False)
+            strategy = SimpleDeepBuyStrategy(services=services, name=name, params=params,
+                                             quote_cache=self.primary._quote_cache)
+            self._strategies[name] = strategy
+            self._fanout = tuple(self._strategies.values())
+        logger.info("[러너] 전략 추가: %s (params=%s)", name, params)
+        if self.running and self._loop:
+            self._loop.call_soon_threadsafe(self._launch, strategy)
+        return strategy
+
+    def remove(self, name: str):
+        if name == self.primary.name:
+            raise ValueError("Cannot remove the primary strategy")
+        with self._lock:
+            strategy = self._strategies.pop(name)
+            self._fanout = tuple(self._strategies.values())
+        strategy.stop()
+        logger.info("[러너] 전략 제거: %s", name)
+
+    def get(self, name: str) -> Optional[SimpleDeepBuyStrategy]:
+        return self._strategies.get(name)
+
+    def on_realtime_price(self, code: str, current_price: float, volume: int = 0):
+        """실시간 가격 콜백 (웹소켓에는 이것 하나만 등록)"""
+        for strategy in self._fanout:
+            strategy.on_realtime_price(code, current_price, volume)
+
+    def _launch(self, strategy: SimpleDeepBuyStrategy):
+        def on_exit(task: asyncio.Task):
+            if not task.cancelled() and task.exception():
+                logger.error("[러너] %s 종료 (오류: %s)", strategy.name, task.exception())
+        asyncio.ensure_future(strategy.start()).add_done_callback(on_exit)
+
+    async def start(self):
+        """전체 인스턴스 시작 (각자 스케줄러로 사이클 실행, stop()까지 대기)"""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self.running = True
+        for strategy in self._fanout:
+            self._launch(strategy)
+        await self._stopped.wait()
+
+    def stop(self):
+        self.running = False
+        for strategy in self._fanout:
+            strategy.stop()
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    def get_status(self) -> Dict:
+        return {
+            "running": self.running,
+            "quote_cache": self.primary._quote_cache.get_stats(),
+            "strategies": {name: s.get_status() for name, s in self._strategies.items()},
+        }
 
 # 싱글톤
 simple_deep_buy = SimpleDeepBuyStrategy()
+strategy_runner = StrategyRunner(simple_deep_buy)
@@ -0,0 +1,397 @@
+"""
+실시간 틱 레코더 (일자별 컬럼 세그먼트)
+
+on_realtime_price로 들어오는 틱을 일자별 디렉토리에 컬럼 파일로 append 한다.
+  {root}/{YYYYMMDD}/
+    ts.f64       float64  수신 시각 (epoch 초)
+    code.u16     uint16   codes.txt 줄 번호
+    price.f64    float64  체결가
+    volume.i64   int64    체결량 (없으면 0)
+    codes.txt    종목코드 사전 (등장 순)
+    index.u32 / index.json   종목별 행 번호 (세그먼트 마감 시 생성, 없으면 리더가 code 컬럼 스캔)
+
+고정폭 리틀엔디언 배열이라 mmap + memoryview.cast 로 복사 없이 읽는다 (numpy.frombuffer 도 가능).
+비정상 종료로 컬럼 길이가 어긋나면 가장 짧은 컬럼 기준으로 잘라서 쓴다.
+
+사용 예:
+  python -m backend.services.tick_recorder info 20260302
+  python -m backend.services.tick_recorder csv 20260302 > ticks.csv
+"""
+
+import argparse
+import array
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (컬럼명, array 타입코드, 파일 확장자)
+COLUMNS = (
+    ("ts", "d", "f64"),
+    ("code", "H", "u16"),
+    ("price", "d", "f64"),
+    ("volume", "q", "i64"),
+)
+_SWAP = sys.byteorder != "little"  # 파일은 항상 리틀엔디언
+
+Tick = Tuple[float, str, float, int]
+
+
+def _column_path(seg_dir: str, name: str, ext: str) -> str:
+    return os.path.join(seg_dir, "%s.%s" % (name, ext))
+
+
+def _segment_rows(seg_dir: str) -> int:
+    """컬럼 중 가장 짧은 행 수 (부분 기록 보정)"""
+    rows = None
+    for name, tc, ext in COLUMNS:
+        path = _column_path(seg_dir, name, ext)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        n = size // array.array(tc).itemsize
+        rows = n if rows is None else min(rows, n)
+    return rows or 0
+
+
+def _read_codes(seg_dir: str) -> List[str]:
+    path = os.path.join(seg_dir, "codes.txt")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+class TickRecorder:
+    """틱 레코더 (콜백은 deque append만, 파일 쓰기는 백그라운드 스레드)"""
+
+    def __init__(self, root: str, flush_sec: float = 1.0, max_buffer: int = 200_000):
+        self.root = root
+        self.flush_sec = flush_sec
+        self.max_buffer = max_buffer
+        self._buf: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.running = False
+
+        # 현재 세그먼트 (writer 스레드 전용)
+        self._day: Optional[str] = None
+        self._dir: Optional[str] = None
+        self._files: Dict[str, object] = {}
+        self._codes_file = None
+        self._codes: Dict[str, int] = {}
+        self._rows = 0
+        self._index: Dict[int, array.array] = {}
+
+        self.recorded = 0
+        self.dropped = 0
+        self.segments = 0
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        self._stop.clear()
+        self.running = True
+        self._thread = threading.Thread(target=self._writer, name="tick-recorder", daemon=True)
+        self._thread.start()
+        logger.info("[틱기록] 시작: %s", self.root)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        logger.info("[틱기록] 중지 (기록 %d건, 드롭 %d건)", self.recorded, self.dropped)
+
+    def record(self, code: str, price: float, volume: int = 0):
+        """틱 1건 기록 요청 (실시간 콜백 스레드에서 호출)"""
+        if not self.running:
+            return
+        if len(self._buf) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._buf.append((time.time(), code, price, volume))
+
+    def _writer(self):
+        while not self._stop.wait(self.flush_sec):
+            self._safe_flush()
+        self._safe_flush()
+        try:
+            self._seal()
+        except Exception as e:
+            logger.error("[틱기록] 세그먼트 마감 실패: %s", e)
+
+    def _safe_flush(self):
+        try:
+            self._flush()
+        except Exception as e:
+            logger.error("[틱기록] 기록 실패: %s", e)
+
+    def _flush(self):
+        n = len(self._buf)
+        if not n:
+            return
+        cols = self._new_columns()
+        for _ in range(n):
+            ts, code, price, volume = self._buf.popleft()
+            day = datetime.fromtimestamp(ts).strftime("%Y%m%d")
+            if day != self._day:
+                self._write(cols)
+                cols = self._new_columns()
+                self._open(day)
+            idx = self._codes.get(code)
+            if idx is None:
+                idx = self._add_code(code)
+            cols["ts"].append(ts)
+            cols["code"].append(idx)
+            cols["price"].append(price)
+            cols["volume"].append(int(volume or 0))
+            self._index[idx].append(self._rows + len(cols["ts"]) - 1)
+        self._write(cols)
+
+    @staticmethod
+    def _new_columns() -> Dict[str, array.array]:
+        return {name: array.array(tc) for name, tc, _ in COLUMNS}
+
+    def _write(self, cols: Dict[str, array.array]):
+        count = len(cols["ts"])
+        if not count:
+            return
+        self._codes_file.flush()  # 사전이 컬럼보다 먼저 디스크에
+        for name, _, _ in COLUMNS:
+            col = cols[name]
+            if _SWAP:
+                col.byteswap()
+            self._files[name].write(col.tobytes())
+            self._files[name].flush()
+        self._rows += count
+        self.recorded += count
+
+    def _add_code(self, code: str) -> int:
+        idx = len(self._codes)
+        self._codes[code] = idx
+        self._index[idx] = array.array("I")
+        self._codes_file.write(code + "\n")
+        return idx
+
+    def _open(self, day: str):
+        """일자 세그먼트 열기 (같은 날 재시작이면 이어쓰기)"""
+        self._seal()
+        seg_dir = os.path.join(self.root, day)
+        os.makedirs(seg_dir, exist_ok=True)
+
+        rows = _segment_rows(seg_dir)
+        codes = _read_codes(seg_dir)
+        self._codes = {code: i for i, code in enumerate(codes)}
+        self._index = {i: array.array("I") for i in range(len(codes))}
+        if rows:
+            # 기존 행 인덱스 복원 (부분 기록된 꼬리는 잘라냄)
+            with TickSegment(seg_dir) as seg:
+                for row, idx in enumerate(seg.column("code")):
+                    self._index[idx].append(row)
+        for name, tc, ext in COLUMNS:
+            path = _column_path(seg_dir, name, ext)
+            f = open(path, "ab")
+            f.truncate(rows * array.array(tc).itemsize)
+            self._files[name] = f
+        self._codes_file = open(os.path.join(seg_dir, "codes.txt"), "a", encoding="utf-8")
+        for stale in ("index.u32", "index.json"):
+            try:
+                os.remove(os.path.join(seg_dir, stale))
+            except FileNotFoundError:
+                pass
+
+        self._day, self._dir, self._rows = day, seg_dir, rows
+        self.segments += 1
+        logger.info("[틱기록] 세그먼트 %s (기존 %d행)", day, rows)
+
+    def _seal(self):
+        """세그먼트 마감: 종목별 행 인덱스 기록 후 파일 닫기"""
+        if not self._dir:
+            return
+        offsets = {}
+        rows = array.array("I")
+        for code, idx in self._codes.items():
+            offsets[code] = [len(rows), len(self._index[idx])]
+            rows.extend(self._index[idx])
+        if _SWAP:
+            rows.byteswap()
+        with open(os.path.join(self._dir, "index.u32"), "wb") as f:
+            f.write(rows.tobytes())
+        with open(os.path.join(self._dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"rows": self._rows, "codes": offsets}, f)
+
+        for f in self._files.values():
+            f.close()
+        self._codes_file.close()
+        self._files, self._codes_file = {}, None
+        self._day = self._dir = None
+        self._index = {}
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "day": self._day,
+            "rows": self._rows,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "buffered": len(self._buf),
+            "segments": self.segments,
+        }
+
+
+class TickSegment:
+    """일자 세그먼트 리더 (컬럼 mmap, 읽기 전용)"""
+
+    def __init__(self, seg_dir: str):
+        self.path = seg_dir
+        self.codes = _read_codes(seg_dir)
+        self.rows = _segment_rows(seg_dir)
+        self._maps: List[mmap.mmap] = []
+        self._cols: Dict[str, memoryview] = {}
+        for name, tc, ext in COLUMNS:
+            self._cols[name] = self._map(_column_path(seg_dir, name, ext), tc)
+        self._index: Optional[Dict[str, memoryview]] = None
+
+    def _map(self, path: str, tc: str) -> memoryview:
+        nbytes = self.rows * array.array(tc).itemsize
+        if not nbytes:
+            return memoryview(array.array(tc))
+        if _SWAP:
+            with open(path, "rb") as f:
+                col = array.array(tc, f.read(nbytes))
+            col.byteswap()
+            return memoryview(col)
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return memoryview(mm)[:nbytes].cast(tc)
+
+    def column(self, name: str) -> memoryview:
+        """컬럼 뷰 (ts / code / price / volume)"""
+        return self._cols[name]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _load_index(self) -> Dict[str, memoryview]:
+        if self._index is not None:
+            return self._index
+        index = {}
+        meta_path = os.path.join(self.path, "index.json")
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta and meta.get("rows") == self.rows:
+            with open(os.path.join(self.path, "index.u32"), "rb") as f:
+                rows = array.array("I", f.read())
+            if _SWAP:
+                rows.byteswap()
+            view = memoryview(rows)
+            for code, (start, count) in meta["codes"].items():
+                index[code] = view[start:start + count]
+        else:
+            # 마감 전 세그먼트 (장중/비정상 종료) → code 컬럼 스캔
+            buckets = [array.array("I") for _ in self.codes]
+            for row, idx in enumerate(self._cols["code"]):
+                buckets[idx].append(row)
+            index = {code: memoryview(buckets[i]) for i, code in enumerate(self.codes)}
+        self._index = index
+        return index
+
+    def rows_for(self, code: str) -> memoryview:
+        """종목 행 번호 (시각 순)"""
+        return self._load_index().get(code, memoryview(array.array("I")))
+
+    def iter_ticks(self, codes: List[str] = None) -> Iterator[Tick]:
+        """(ts, code, price, volume) 시각 순 순회"""
+        ts, code_col = self._cols["ts"], self._cols["code"]
+        price, volume = self._cols["price"], self._cols["volume"]
+        if codes is None:
+            rows = range(self.rows)
+        else:
+            rows = sorted(row for code in codes for row in self.rows_for(code))
+        for row in rows:
+            yield ts[row], self.codes[code_col[row]], price[row], volume[row]
+
+    def close(self):
+        self._index = None
+        for view in self._cols.values():
+            view.release()
+        self._cols = {}
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_days(root: str) -> List[str]:
+    """기록된 일자 목록 (YYYYMMDD)"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if d.isdigit() and len(d) == 8 and os.path.exists(os.path.join(root, d, "ts.f64")))
+
+
+def replay(segment: TickSegment, handler: Callable[[str, float], None], speed: float = 1.0,
+           codes: List[str] = None, sleep: Callable[[float], None] = time.sleep) -> int:
+    """세그먼트 틱을 handler(code, price)로 N배속 재생 (speed <= 0 이면 대기 없이). Returns: 재생 건수"""
+    count = 0
+    first_ts = None
+    started = time.monotonic()
+    for ts, code, price, _ in segment.iter_ticks(codes):
+        if speed > 0:
+            if first_ts is None:
+                first_ts = ts
+            delay = (ts - first_ts) / speed - (time.monotonic() - started)
+            if delay > 0:
+                sleep(delay)
+        handler(code, price)
+        count += 1
+    return count
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="틱 세그먼트 조회")
+    parser.add_argument("command", choices=("list", "info", "csv"))
+    parser.add_argument("day", nargs="?", help="YYYYMMDD")
+    parser.add_argument("--root", default=os.path.join(os.getenv("DEEP_BUY_DATA_DIR", "data/deep_buy"), "ticks"))
+    parser.add_argument("--code", action="append", help="종목코드 (반복 지정)")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for day in list_days(args.root):
+            print(day, _segment_rows(os.path.join(args.root, day)))
+        return
+    if not args.day:
+        parser.error("day 필요")
+
+    with TickSegment(os.path.join(args.root, args.day)) as seg:
+        if args.command == "info":
+            print("%s: %d행, %d종목" % (args.day, len(seg), len(seg.codes)))
+            for code in seg.codes:
+                print("  %s %d" % (code, len(seg.rows_for(code))))
+        else:
+            out = sys.stdout
+            out.write("ts,code,price,volume\n")
+            for ts, code, price, volume in seg.iter_ticks(args.code):
+                out.write("%.6f,%s,%.10g,%d\n" % (ts, code, price, volume))
+
+
+if __name__ == "__main__":
+    main()